@@ -1,29 +1,131 @@
+import asyncio
 import logging
+from fnmatch import fnmatchcase
+
+import voluptuous as vol
+from homeassistant.components.climate import ATTR_HVAC_MODE, HVACMode
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from .const import DOMAIN, PLATFORMS
+from homeassistant.const import ATTR_ENTITY_ID, ATTR_TEMPERATURE
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from .const import (
+    ATTR_ZONES,
+    DATA_ENGINE,
+    DATA_SENSOR_HUB,
+    DOMAIN,
+    PLATFORMS,
+    SERVICE_DUMP_STATS,
+    SERVICE_SET_ZONES,
+    SIGNAL_OPTIONS_UPDATED,
+)
+from .engine import PIDEngine
+from .hub import SensorHub
+from .models import PIDEntryData
 
 _LOGGER = logging.getLogger(__name__)
 
+# Each zone targets one or more climate entities by entity_id or glob pattern
+# ("climate.*_bedroom"); later zones override earlier ones for the same entity.
+SET_ZONES_SCHEMA = vol.Schema({
+    vol.Required(ATTR_ZONES): vol.All(
+        cv.ensure_list,
+        [
+            vol.All(
+                {
+                    vol.Required(ATTR_ENTITY_ID): vol.All(cv.ensure_list, [cv.string]),
+                    vol.Optional(ATTR_TEMPERATURE): vol.Coerce(float),
+                    vol.Optional(ATTR_HVAC_MODE): vol.In([HVACMode.HEAT, HVACMode.OFF]),
+                },
+                cv.has_at_least_one_key(ATTR_TEMPERATURE, ATTR_HVAC_MODE),
+            )
+        ],
+    ),
+})
+
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up integration domain."""
+
+    async def async_dump_stats(_call: ServiceCall) -> ServiceResponse:
+        """Return the runtime counters of every loaded entry."""
+        return {
+            entry_id: {"title": entry_data.entry.title, **entry_data.stats.as_dict()}
+            for entry_id, entry_data in hass.data.get(DOMAIN, {}).items()
+            if isinstance(entry_data, PIDEntryData)
+        }
+
+    async def async_set_zones(call: ServiceCall) -> None:
+        """Apply setpoints and modes to many controllers, then recompute them in one batch."""
+        controllers = {
+            entry_data.controller.entity_id: entry_data.controller
+            for entry_data in hass.data.get(DOMAIN, {}).values()
+            if isinstance(entry_data, PIDEntryData) and entry_data.controller is not None
+        }
+
+        # Resolve every zone before touching any controller, so a typo changes nothing.
+        targets = {}
+        for zone in call.data[ATTR_ZONES]:
+            for pattern in zone[ATTR_ENTITY_ID]:
+                matched = [entity_id for entity_id in controllers if fnmatchcase(entity_id, pattern)]
+                if not matched:
+                    raise HomeAssistantError(f"No PID Heat Compensation climate entity matches {pattern}")
+                for entity_id in matched:
+                    target = targets.setdefault(entity_id, {})
+                    for key in (ATTR_TEMPERATURE, ATTR_HVAC_MODE):
+                        if key in zone:
+                            target[key] = zone[key]
+
+        updates = []
+        for entity_id, target in targets.items():
+            controller = controllers[entity_id]
+            if controller.async_apply_targets(target.get(ATTR_TEMPERATURE), target.get(ATTR_HVAC_MODE)):
+                updates.append(controller.async_update_now())
+        # The update loops only queue their PID steps; evaluate them all in one engine
+        # pass now, which also publishes their results.
+        if updates:
+            await asyncio.gather(*updates)
+            hass.data[DOMAIN][DATA_ENGINE].flush()
+        # Zones that didn't step (OFF, fixed-rate, waiting for sensors) still show their new targets.
+        for entity_id in targets:
+            controllers[entity_id].async_write_state_if_changed()
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_DUMP_STATS, async_dump_stats, supports_response=SupportsResponse.ONLY
+    )
+    hass.services.async_register(DOMAIN, SERVICE_SET_ZONES, async_set_zones, schema=SET_ZONES_SCHEMA)
     return True
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set PID Heat Compensation from a Config Entry."""
 
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = entry
+    # One engine steps the PID of every entry in a single batched pass.
+    if DATA_ENGINE not in hass.data[DOMAIN]:
+        hass.data[DOMAIN][DATA_ENGINE] = PIDEngine(hass.loop)
+    # One listener per sensor entity, shared by every entry that uses it.
+    if DATA_SENSOR_HUB not in hass.data[DOMAIN]:
+        hass.data[DOMAIN][DATA_SENSOR_HUB] = SensorHub(hass)
+    hass.data[DOMAIN][entry.entry_id] = PIDEntryData(entry)
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    # Options are applied in place by the climate entity instead of reloading the entry.
+    entry.async_on_unload(entry.add_update_listener(async_options_updated))
+
     return True
 
+async def async_options_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Hand changed options to the running climate controller."""
+    async_dispatcher_send(
+        hass, SIGNAL_OPTIONS_UPDATED.format(entry.entry_id), entry.options or entry.data
+    )
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload PID Heat Compensation config entry."""
 
-    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS) 
-    
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
 
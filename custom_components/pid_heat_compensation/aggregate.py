@@ -0,0 +1,114 @@
+"""Incremental aggregation of several indoor temperature sensors.
+
+The climate controller feeds every indoor state change into
+`IndoorAggregate.update`, which adjusts a running weighted sum and a sorted
+list of readings, so reading the mean, minimum or median never re-reads the
+sensors. Sensors that went unavailable are removed at once; sensors that
+stopped reporting are dropped by `expire`, which only has to look at the
+least recently updated sensor.
+"""
+from bisect import bisect_left, insort
+from collections.abc import Callable
+
+AGGREGATE_MEAN = "mean"
+AGGREGATE_MIN = "min"
+AGGREGATE_MEDIAN = "median"
+AGGREGATE_METHODS = (AGGREGATE_MEAN, AGGREGATE_MIN, AGGREGATE_MEDIAN)
+
+
+class IndoorAggregate:
+    """Weighted mean, minimum or weighted median of the valid indoor readings."""
+
+    __slots__ = (
+        "_method", "_weights", "_stale_after", "_values", "_updated", "_sorted", "_weighted_sum", "_weight_total"
+    )
+
+    def __init__(self, method=AGGREGATE_MEAN, weights=None, stale_after=0):
+        """`weights` maps entity_id to weight (default 1); `stale_after` is in seconds, 0 never expires."""
+        self._method = method
+        self._weights = dict(weights or {})
+        self._stale_after = stale_after
+        self._values = {}
+        # entity_id -> timestamp of the last reading, least recently updated first.
+        self._updated = {}
+        self._sorted = []
+        self._weighted_sum = 0.0
+        self._weight_total = 0.0
+
+    def __len__(self):
+        """Number of sensors currently contributing."""
+        return len(self._values)
+
+    def update(self, entity_id, value, timestamp):
+        """Record a reading; a value of None removes the sensor until it reports again."""
+        self.remove(entity_id)
+        if value is None:
+            return
+
+        weight = self._weights.get(entity_id, 1.0)
+        self._values[entity_id] = value
+        self._updated[entity_id] = timestamp
+        insort(self._sorted, (value, entity_id))
+        self._weighted_sum += weight * value
+        self._weight_total += weight
+
+    def remove(self, entity_id):
+        """Drop a sensor from the aggregate."""
+        value = self._values.pop(entity_id, None)
+        if value is None:
+            return
+
+        del self._updated[entity_id]
+        del self._sorted[bisect_left(self._sorted, (value, entity_id))]
+        if not self._values:
+            # Start from exact zeros again instead of accumulating rounding errors.
+            self._weighted_sum = self._weight_total = 0.0
+            return
+        weight = self._weights.get(entity_id, 1.0)
+        self._weighted_sum -= weight * value
+        self._weight_total -= weight
+
+    def expire(self, now, refresh: Callable[[str], tuple[float | None, float] | None]):
+        """Drop sensors that have not reported for `stale_after` seconds.
+
+        A sensor that keeps reporting the same value doesn't produce state
+        changes, so before a sensor is dropped `refresh(entity_id)` is asked
+        for its current (value, timestamp); None drops it.
+        """
+        if not self._stale_after:
+            return
+
+        while self._updated:
+            entity_id, timestamp = next(iter(self._updated.items()))
+            if now - timestamp < self._stale_after:
+                return
+            current = refresh(entity_id)
+            if current is None or now - current[1] >= self._stale_after:
+                self.remove(entity_id)
+            else:
+                self.update(entity_id, *current)
+
+    @property
+    def value(self) -> float | None:
+        """The aggregated indoor temperature, or None without any valid sensor."""
+        if not self._sorted:
+            return None
+        if self._method == AGGREGATE_MIN:
+            return self._sorted[0][0]
+        if self._method == AGGREGATE_MEDIAN:
+            return self._weighted_median()
+        if self._weight_total <= 0:
+            return None
+        return self._weighted_sum / self._weight_total
+
+    def _weighted_median(self):
+        """Median where every reading counts with its weight; averages at an exact split."""
+        half = self._weight_total / 2
+        cumulative = 0.0
+        for index, (value, entity_id) in enumerate(self._sorted):
+            cumulative += self._weights.get(entity_id, 1.0)
+            if cumulative > half:
+                return value
+            if cumulative == half and index + 1 < len(self._sorted):
+                return (value + self._sorted[index + 1][0]) / 2
+        return self._sorted[-1][0]
@@ -0,0 +1,143 @@
+"""Åström–Hägglund relay-feedback autotuner.
+
+The controller hands every indoor reading to `RelayAutotuner.update`, which
+returns the relay offset to add to the real outdoor temperature. Readings
+are kept in a fixed-size ring buffer, and each half-cycle is analysed when
+the relay switches, so the work per reading is bounded and small.
+"""
+import math
+from array import array
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class AutotuneResult:
+    """Ultimate gain/period and the Ziegler–Nichols PID gains derived from them."""
+
+    ultimate_gain: float
+    ultimate_period: float
+    kp: float
+    ki: float
+    kd: float
+
+
+class RelayAutotuner:
+    """Runs a relay experiment on T_comp and measures the indoor oscillation."""
+
+    def __init__(
+        self, setpoint, relay_amplitude, hysteresis=0.1, cycles=3, rule="pi", buffer_size=2048, gain_limits=None
+    ):
+        self._setpoint = setpoint
+        self._rule = rule
+        self._amplitude = relay_amplitude
+        self._hysteresis = hysteresis
+        self._cycles = cycles
+        # {"kp": (min, max), ...}; a result outside these ranges fails the experiment.
+        self._gain_limits = gain_limits or {}
+
+        # Ring buffer of indoor readings.
+        self._size = buffer_size
+        self._values = array("d", bytes(8 * buffer_size))
+        self._count = 0
+
+        self._output = None
+        self._segment_start = 0
+        self._switches = 0
+        self._cooling_switch_times = []
+        self._peaks = []
+        self._troughs = []
+
+        self.result: AutotuneResult | None = None
+        self.error: str | None = None
+
+    @property
+    def done(self) -> bool:
+        """True once the experiment produced a result or failed."""
+        return self.result is not None or self.error is not None
+
+    def update(self, now, indoor) -> float:
+        """Record a reading and return the relay offset to apply to T_comp."""
+        index = self._count % self._size
+        self._values[index] = indoor
+        self._count += 1
+
+        if self._output is None:
+            # Indoor too cold: a negative offset lowers T_comp and makes the heat pump work harder.
+            self._output = -self._amplitude if indoor <= self._setpoint else self._amplitude
+            self._segment_start = self._count - 1
+            return self._output
+
+        error = self._setpoint - indoor
+        output = self._output
+        if error > self._hysteresis:
+            output = -self._amplitude
+        elif error < -self._hysteresis:
+            output = self._amplitude
+
+        if output != self._output and not self.done:
+            self._on_switch(now, output)
+        return self._output
+
+    def _on_switch(self, now, output):
+        """Close the half-cycle that just ended and evaluate once enough cycles were seen."""
+        # The half-cycle covers the readings since the last switch, excluding the current one.
+        start, end = self._segment_start, self._count - 1
+        self._segment_start = end
+        self._output = output
+        self._switches += 1
+
+        if end - start > self._size:
+            self.error = "Oscillation is too slow for the reading buffer"
+            return
+
+        # The first half-cycle is the transient from wherever the experiment started.
+        if self._switches > 1 and end > start:
+            segment = [self._values[i % self._size] for i in range(start, end)]
+            if output < 0:
+                # Leaving the cooling half-cycle: the indoor temperature peaked in it.
+                self._peaks.append(max(segment))
+            else:
+                self._troughs.append(min(segment))
+
+        if output > 0:
+            self._cooling_switch_times.append(now)
+
+        if (
+            len(self._peaks) >= self._cycles
+            and len(self._troughs) >= self._cycles
+            and len(self._cooling_switch_times) > self._cycles
+        ):
+            self._evaluate()
+
+    def _evaluate(self):
+        """Compute the ultimate gain and period, then Ziegler–Nichols PI or PID gains."""
+        peaks = self._peaks[-self._cycles:]
+        troughs = self._troughs[-self._cycles:]
+        switch_times = self._cooling_switch_times[-(self._cycles + 1):]
+
+        oscillation = (sum(peaks) / len(peaks) - sum(troughs) / len(troughs)) / 2
+        period = (switch_times[-1] - switch_times[0]) / self._cycles
+        if oscillation <= 0 or period <= 0:
+            self.error = "No measurable oscillation"
+            return
+
+        ultimate_gain = 4 * self._amplitude / (math.pi * oscillation)
+        if self._rule == "pid":
+            kp = 0.6 * ultimate_gain
+            ki = 2 * kp / period
+            kd = kp * period / 8
+        else:
+            kp = 0.45 * ultimate_gain
+            ki = 1.2 * kp / period
+            kd = 0.0
+
+        # Raising T_comp lowers the indoor temperature, so the process is
+        # reverse acting and the gains are negative (like the default Kp).
+        gains = {"kp": -kp, "ki": -ki, "kd": -kd}
+        for key, value in gains.items():
+            low, high = self._gain_limits.get(key, (-math.inf, math.inf))
+            if not low <= value <= high:
+                self.error = f"Autotuned {key}={value:.6g} is outside the allowed range {low:g}..{high:g}"
+                return
+
+        self.result = AutotuneResult(ultimate_gain=ultimate_gain, ultimate_period=period, **gains)
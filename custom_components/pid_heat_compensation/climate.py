@@ -1,19 +1,79 @@
 import logging
-from simple_pid import PID
-from homeassistant.core import HomeAssistant, State
+import math
+import time
+from datetime import timedelta
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, State, callback
 from homeassistant.components.climate import ClimateEntity, ClimateEntityFeature, HVACMode
-from homeassistant.helpers.restore_state import RestoreEntity
-from homeassistant.helpers import entity_registry as er
-from homeassistant.const import ATTR_TEMPERATURE, STATE_UNAVAILABLE, STATE_UNKNOWN, UnitOfTemperature
+from homeassistant.helpers.restore_state import RestoreEntity, RestoredExtraData
+from homeassistant.const import ATTR_TEMPERATURE, UnitOfTemperature
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.helpers.event import async_track_state_change_event
-
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv, entity_platform
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.dispatcher import async_dispatcher_connect, async_dispatcher_send
+from homeassistant.helpers.event import (
+    async_call_later,
+    async_track_time_interval,
+)
+from homeassistant.util import dt as dt_util
+
+from .aggregate import IndoorAggregate
+from .autotune import RelayAutotuner
+from .forecast import ForecastTable
+from .output import async_create_output, output_settings
+from .schedule import GAIN_KEYS, GainSchedule
+from .steplog import async_get_step_log
 from .const import (
     ATTR_COMPENSATED_TEMP,
+    ATTR_CYCLES,
+    ATTR_HYSTERESIS,
+    ATTR_MAX_DURATION,
+    ATTR_RELAY_AMPLITUDE,
+    ATTR_RULE,
+    CONF_FORECAST_ENTITY,
+    CONF_FORECAST_GAIN,
+    CONF_FORECAST_HORIZON,
+    CONF_GAIN_SCHEDULE,
+    CONF_INDOOR_AGGREGATE,
     CONF_INDOOR_SENSOR,
+    CONF_INDOOR_STALE_AFTER,
+    CONF_INDOOR_WEIGHTS,
+    CONF_MIN_UPDATE_INTERVAL,
     CONF_OUTDOOR_SENSOR,
+    CONF_OUTPUT_LIMIT,
+    CONF_PID_FORM,
+    CONF_PUBLISH_DEADBAND,
+    CONF_PUBLISH_HEARTBEAT,
+    CONF_SAMPLE_PERIOD,
+    CONF_STEP_LOG,
+    DATA_ENGINE,
+    DATA_FORECASTS,
+    DATA_SENSOR_HUB,
+    DEFAULT_AUTOTUNE_CYCLES,
+    DEFAULT_AUTOTUNE_HYSTERESIS,
+    DEFAULT_AUTOTUNE_MAX_DURATION,
+    DEFAULT_AUTOTUNE_RELAY_AMPLITUDE,
+    DEFAULT_FORECAST_GAIN,
+    DEFAULT_FORECAST_HORIZON,
+    DEFAULT_INDOOR_AGGREGATE,
+    DEFAULT_INDOOR_STALE_AFTER,
+    DEFAULT_MIN_UPDATE_INTERVAL,
+    DEFAULT_OUTPUT_LIMIT,
+    DEFAULT_PID_FORM,
+    DEFAULT_PUBLISH_DEADBAND,
+    DEFAULT_PUBLISH_HEARTBEAT,
+    DEFAULT_SAMPLE_PERIOD,
     DOMAIN,
-    MAX_TEMP_DIFFERENCE
+    FORECAST_REFRESH_INTERVAL,
+    MAX_TEMP_DIFFERENCE,
+    PARAMETER_RANGES,
+    PID_FORM_VELOCITY,
+    SERVICE_AUTOTUNE,
+    SIGNAL_COMPENSATED_TEMP_UPDATED,
+    SIGNAL_OPTIONS_UPDATED,
+    SIGNAL_PID_TERMS_UPDATED,
+    WARM_START_MAX_AGE,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -24,11 +84,29 @@ TEMP_CELSIUS = UnitOfTemperature.CELSIUS
 async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry, async_add_entities):
     """Set up the climate platform from a Config Entry (UI)."""
 
-    config = config_entry.data
     pid_climate = PIDClimateController(hass, config_entry)
 
     async_add_entities([pid_climate])
 
+    platform = entity_platform.async_get_current_platform()
+    platform.async_register_entity_service(
+        SERVICE_AUTOTUNE,
+        {
+            vol.Optional(ATTR_RELAY_AMPLITUDE, default=DEFAULT_AUTOTUNE_RELAY_AMPLITUDE): vol.All(
+                vol.Coerce(float), vol.Range(min=0.5, max=MAX_TEMP_DIFFERENCE)
+            ),
+            vol.Optional(ATTR_HYSTERESIS, default=DEFAULT_AUTOTUNE_HYSTERESIS): vol.All(
+                vol.Coerce(float), vol.Range(min=0.0, max=2.0)
+            ),
+            vol.Optional(ATTR_CYCLES, default=DEFAULT_AUTOTUNE_CYCLES): vol.All(
+                vol.Coerce(int), vol.Range(min=2, max=10)
+            ),
+            vol.Optional(ATTR_RULE, default="pi"): vol.In(["pi", "pid"]),
+            vol.Optional(ATTR_MAX_DURATION, default=DEFAULT_AUTOTUNE_MAX_DURATION): cv.positive_time_period,
+        },
+        "async_autotune",
+    )
+
 class PIDClimateController(ClimateEntity, RestoreEntity):
     """Represents a PID-based Climate entity for heating compensation."""
 
@@ -40,33 +118,66 @@ class PIDClimateController(ClimateEntity, RestoreEntity):
     _attr_supported_features = ClimateEntityFeature.TARGET_TEMPERATURE
     _attr_temperature_unit = TEMP_CELSIUS
 
+    # Slow-changing tuning and diagnostic attributes are left out of every recorded state row;
+    # the PID error and term contributions have their own measurement sensors.
+    _unrecorded_attributes = frozenset(
+        {
+            "PID_Kp", "PID_Ki", "PID_Kd", "PID_setpoint", "weather_factor",
+            "forecast_feedforward", "indoor_sensors_used",
+        }
+    )
+
     def __init__(self, hass, config_entry):
         """Initialize the PID Climate entity."""
         self.hass = hass
         self._config_entry = config_entry
         self._config_entry_id = config_entry.entry_id
+        self._entry_data = hass.data[DOMAIN][config_entry.entry_id]
 
-        # Read config (prioritizes options over initial config data)
-        config = config_entry.options if config_entry.options else config_entry.data
-
-        prefix = "number." + config.get("name").lower().replace(" ", "_")
-        # Fallback IDs for backward compatibility if entity registry lookup fails.
-        self._fallback_kp_entity_id = f"{prefix}_kp"
-        self._fallback_ki_entity_id = f"{prefix}_ki"
-        self._fallback_kd_entity_id = f"{prefix}_kd"
-        self._fallback_weather_factor_entity_id = f"{prefix}_weather_factor"
+        # Read config. The options flow stores the complete form, so its options replace
+        # the initial config data as a whole; optional keys cleared there stay cleared.
+        config = config_entry.options or config_entry.data
 
-        # PID Entity IDs are resolved via entity registry (unique_id), with fallback above.
-        self._kp_entity_id = self._fallback_kp_entity_id
-        self._ki_entity_id = self._fallback_ki_entity_id
-        self._kd_entity_id = self._fallback_kd_entity_id
-        self._weather_factor_entity_id = self._fallback_weather_factor_entity_id
+        # PID parameters are pushed here by the number entities (Kp, Ki, Kd, Weather Factor).
+        self._parameters = self._entry_data.parameters
+        self._stats = self._entry_data.stats
 
         # Configuration
-        self._attr_name = config.get("name")
-        self._indoor_sensor = config[CONF_INDOOR_SENSOR]
+        self._attr_name = config_entry.data.get("name")
+        # One or more indoor sensors, aggregated incrementally from their state changes.
+        self._set_indoor_config(self._indoor_settings(config))
         self._outdoor_sensor = config[CONF_OUTDOOR_SENSOR]
 
+        # Publishing policy: only write state when T_comp moved by the deadband, another
+        # attribute changed, or the heartbeat interval has passed since the last write.
+        self._publish_deadband = config.get(CONF_PUBLISH_DEADBAND, DEFAULT_PUBLISH_DEADBAND)
+        self._publish_heartbeat = config.get(CONF_PUBLISH_HEARTBEAT, DEFAULT_PUBLISH_HEARTBEAT)
+        self._last_write_time = None
+        self._last_write_signature = None
+        # True while a PID step is queued in the engine; its result writes the state.
+        self._step_queued = False
+
+        # Optional fixed-rate sampling (seconds); 0 keeps the event-driven mode.
+        self._sample_period = config.get(CONF_SAMPLE_PERIOD, DEFAULT_SAMPLE_PERIOD)
+        self._remove_sensor_listener = None
+        self._remove_sample_timer = None
+
+        # Optional forecast feedforward from a weather entity's hourly forecast.
+        self._forecast_entity, self._forecast_horizon, self._forecast_gain = self._forecast_settings(config)
+        self._remove_forecast_timer = None
+        self._feedforward = 0.0
+
+        # Optional streaming of every PID step to the shared step log file.
+        self._step_log = async_get_step_log(hass) if config.get(CONF_STEP_LOG) else None
+
+        # Optional Kp/Ki/Kd schedule on the real outdoor temperature; while it has
+        # breakpoints it replaces the gains of the number entities.
+        self._gain_schedule = GainSchedule.from_config(config.get(CONF_GAIN_SCHEDULE))
+
+        # Optional direct output of T_comp to the heat pump (MQTT topic or Modbus register).
+        self._output_settings = output_settings(config)
+        self._output = None
+
         # State variables
         self._attr_target_temperature = self.DEFAULT_TARGET_TEMP
         self._attr_current_temperature = None
@@ -76,14 +187,33 @@ class PIDClimateController(ClimateEntity, RestoreEntity):
         # weather_factor is initialized here, dynamically updated in _async_update_loop
         self._weather_factor = 1.0 
         self._waiting_for_valid_sensors = False
-
-        # PID-instance (Anti-Windup limits set dynamically)
-        self.pid = PID(
-            Kp=0, Ki=0, Kd=0, 
-            output_limits=(-self.MAX_TEMP_DIFFERENCE, self.MAX_TEMP_DIFFERENCE)
+        # Wall clock time of the last PID step, persisted for the warm start.
+        self._last_step_time = None
+        # Relay autotune experiment, only set while one is running.
+        self._autotuner = None
+        self._autotune_deadline = None
+
+        # PID state lives in the shared engine; this entity only owns its slot.
+        self._engine = hass.data[DOMAIN][DATA_ENGINE]
+        # Sensor states are tracked and parsed once per domain and fanned out to every zone.
+        self._hub = hass.data[DOMAIN][DATA_SENSOR_HUB]
+        output_limit = config.get(CONF_OUTPUT_LIMIT, DEFAULT_OUTPUT_LIMIT)
+        self._slot = self._engine.allocate((-output_limit, output_limit))
+        self._engine.set_form(
+            self._slot, config.get(CONF_PID_FORM, DEFAULT_PID_FORM) == PID_FORM_VELOCITY
         )
         self._LOGGER = logging.getLogger(f"{__name__}.{self._attr_name}")
 
+        # Coalesce sensor and gain bursts: run at once, then at most one trailing
+        # run per min_update_interval no matter how many events arrived.
+        self._update_debouncer = Debouncer(
+            hass,
+            self._LOGGER,
+            cooldown=config.get(CONF_MIN_UPDATE_INTERVAL, DEFAULT_MIN_UPDATE_INTERVAL),
+            immediate=True,
+            function=self._async_update_loop,
+        )
+
     @property
     def unique_id(self):
         return f"{self._config_entry_id}_pid_climate"
@@ -124,79 +254,378 @@ class PIDClimateController(ClimateEntity, RestoreEntity):
             self._attr_target_temperature = self.DEFAULT_TARGET_TEMP
 
         # Set PID setpoint
-        self.pid.setpoint = self._attr_target_temperature
+        self._engine.set_setpoint(self._slot, self._attr_target_temperature)
+
+        # Warm-start the integrator so a restart doesn't have to wind it up again.
+        await self._async_restore_pid_state()
+
+        # Apply the PID parameters the number entities have published so far and
+        # get every later change pushed straight to the engine.
+        if not self._gain_schedule:
+            self._apply_parameter_gains()
+        self.async_on_remove(self._parameters.async_add_listener(self._async_parameter_updated))
+
+        self._async_subscribe_inputs()
+        self._async_start_forecast()
+        self._async_start_output()
+        # Options flow changes are applied in place, without reloading the entry.
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_OPTIONS_UPDATED.format(self._config_entry_id),
+                self._async_options_updated,
+            )
+        )
+
+        self._entry_data.controller = self
+        self.async_on_remove(self._async_detach_controller)
+
+        # Manually call update loop once to initialize T_comp immediately on startup.   
+        # We pass None as event since it's a manual call.
+        await self._async_update_loop(None)
 
-        # Resolve number entity_ids from registry to survive renames/customized IDs.
-        self._resolve_pid_number_entity_ids()
-        tracked_pid_entities = list(
+    @property
+    def extra_restore_state_data(self):
+        """PID integrator, last error/output and step time, persisted across restarts."""
+        last_output = float(self._engine.last_output[self._slot])
+        return RestoredExtraData(
             {
-                self._kp_entity_id,
-                self._ki_entity_id,
-                self._kd_entity_id,
-                self._weather_factor_entity_id,
-                self._fallback_kp_entity_id,
-                self._fallback_ki_entity_id,
-                self._fallback_kd_entity_id,
-                self._fallback_weather_factor_entity_id,
+                "integral": float(self._engine.integral[self._slot]),
+                "last_error": float(self._engine.last_error[self._slot]),
+                "last_output": None if math.isnan(last_output) else last_output,
+                "last_step": self._last_step_time.isoformat() if self._last_step_time else None,
             }
         )
 
-        # Set up listeners for PID Input Numbers (Kp, Ki, Kd)
-        self.async_on_remove(
-            async_track_state_change_event(
-                self.hass, 
-                tracked_pid_entities,
-                self._update_pid_k_values
+    async def _async_restore_pid_state(self) -> None:
+        """Restores the persisted PID state unless it is missing or stale."""
+        extra_data = await self.async_get_last_extra_data()
+        if extra_data is None:
+            return
+
+        data = extra_data.as_dict()
+        last_step = dt_util.parse_datetime(data.get("last_step") or "")
+        if last_step is None or dt_util.utcnow() - last_step > WARM_START_MAX_AGE:
+            self._LOGGER.debug("Persisted PID state missing or stale, starting cold")
+            return
+
+        try:
+            self._engine.restore(
+                self._slot,
+                float(data["integral"]),
+                float(data["last_error"]),
+                None if data.get("last_output") is None else float(data["last_output"]),
             )
+        except (KeyError, TypeError, ValueError):
+            self._LOGGER.warning("Could not restore persisted PID state: %s", data)
+            return
+
+        self._last_step_time = last_step
+        self._LOGGER.debug("PID warm start: integral=%.3f from %s", data["integral"], last_step)
+
+    @callback
+    def _async_detach_controller(self):
+        self._entry_data.controller = None
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Release this zone's slot in the shared PID engine."""
+        self._update_debouncer.async_cancel()
+        self._async_unsubscribe_inputs()
+        self._async_stop_forecast()
+        self._async_stop_output()
+        self._engine.release(self._slot)
+
+    @staticmethod
+    def _indoor_settings(config):
+        """Indoor sensors and how they are aggregated, comparable between option changes."""
+        return (
+            tuple(cv.ensure_list(config[CONF_INDOOR_SENSOR])),
+            config.get(CONF_INDOOR_AGGREGATE, DEFAULT_INDOOR_AGGREGATE),
+            dict(config.get(CONF_INDOOR_WEIGHTS) or {}),
+            config.get(CONF_INDOOR_STALE_AFTER, DEFAULT_INDOOR_STALE_AFTER),
         )
 
-        # Set up listeners for primary sensors (Indoor and Outdoor temp)
-        self.async_on_remove(
-            async_track_state_change_event(
-                self.hass, [self._indoor_sensor, self._outdoor_sensor], self._async_update_loop
+    def _set_indoor_config(self, indoor_config):
+        """Starts a new, empty indoor aggregate for these settings."""
+        self._indoor_config = indoor_config
+        self._indoor_sensors, method, weights, stale_after = indoor_config
+        self._indoor = IndoorAggregate(method, weights, stale_after)
+
+    @callback
+    def _async_subscribe_inputs(self):
+        """Starts whatever drives the update loop: sensor changes or the sampling timer."""
+        self._engine.set_sample_period(self._slot, self._sample_period)
+
+        # Indoor readings feed the aggregate from state changes in both modes.
+        self._remove_sensor_listener = self._hub.async_subscribe(
+            [*self._indoor_sensors, self._outdoor_sensor], self._async_sensor_changed
+        )
+        for entity_id in self._indoor_sensors:
+            self._async_update_indoor(entity_id, self._hub.reading(entity_id))
+
+        if self._sample_period:
+            # Fixed-rate mode: sample the latest sensor states on a fixed period with a
+            # fixed dt, staggered so many zones don't all run at the same instant.
+            self._remove_sample_timer = async_call_later(
+                self.hass, self._sample_phase(), self._async_start_sampling
             )
+
+    @callback
+    def _async_unsubscribe_inputs(self):
+        """Stops the sensor listener and the sampling timer."""
+        if self._remove_sensor_listener is not None:
+            self._remove_sensor_listener()
+            self._remove_sensor_listener = None
+        if self._remove_sample_timer is not None:
+            self._remove_sample_timer()
+            self._remove_sample_timer = None
+
+    @callback
+    def _async_options_updated(self, config):
+        """Applies changed options in place; the PID state and the other platforms are kept."""
+        indoor_config = self._indoor_settings(config)
+        outdoor_sensor = config[CONF_OUTDOOR_SENSOR]
+        sample_period = config.get(CONF_SAMPLE_PERIOD, DEFAULT_SAMPLE_PERIOD)
+        if (indoor_config, outdoor_sensor, sample_period) != (
+            self._indoor_config, self._outdoor_sensor, self._sample_period
+        ):
+            self._async_unsubscribe_inputs()
+            if indoor_config != self._indoor_config:
+                self._set_indoor_config(indoor_config)
+            self._outdoor_sensor, self._sample_period = outdoor_sensor, sample_period
+            self._async_subscribe_inputs()
+
+        forecast_settings = self._forecast_settings(config)
+        if forecast_settings != (self._forecast_entity, self._forecast_horizon, self._forecast_gain):
+            self._async_stop_forecast()
+            self._forecast_entity, self._forecast_horizon, self._forecast_gain = forecast_settings
+            self._async_start_forecast()
+
+        self._step_log = async_get_step_log(self.hass) if config.get(CONF_STEP_LOG) else None
+
+        settings = output_settings(config)
+        if settings != self._output_settings:
+            self._async_stop_output()
+            self._output_settings = settings
+            self._async_start_output()
+
+        # The next update looks the gains up in the new schedule; without one, the
+        # number entities' gains apply again. Both switches are bumpless.
+        self._gain_schedule = GainSchedule.from_config(config.get(CONF_GAIN_SCHEDULE))
+        self._entry_data.scheduled_gains = None
+        if not self._gain_schedule:
+            self._apply_parameter_gains()
+
+        output_limit = config.get(CONF_OUTPUT_LIMIT, DEFAULT_OUTPUT_LIMIT)
+        self._engine.set_output_limits(self._slot, (-output_limit, output_limit))
+        self._engine.set_form(
+            self._slot, config.get(CONF_PID_FORM, DEFAULT_PID_FORM) == PID_FORM_VELOCITY
+        )
+        self._update_debouncer.cooldown = config.get(CONF_MIN_UPDATE_INTERVAL, DEFAULT_MIN_UPDATE_INTERVAL)
+        self._publish_deadband = config.get(CONF_PUBLISH_DEADBAND, DEFAULT_PUBLISH_DEADBAND)
+        self._publish_heartbeat = config.get(CONF_PUBLISH_HEARTBEAT, DEFAULT_PUBLISH_HEARTBEAT)
+
+        self._LOGGER.debug("Options applied: %s", config)
+        # Publish the result of the new configuration even if T_comp is unchanged.
+        self._last_write_signature = None
+        self._async_schedule_update()
+
+    @callback
+    def _async_start_output(self):
+        """Opens the configured output and writes the current T_comp to it."""
+        if self._output_settings is None:
+            return
+        self._output = self._entry_data.output = async_create_output(
+            self.hass, self._output_settings, self._attr_name
+        )
+        if self._compensated_temp_value is not None:
+            self._output.async_publish(self._compensated_temp_value)
+
+    @callback
+    def _async_stop_output(self):
+        """Closes the output; a pooled Modbus connection is kept while others use it."""
+        if self._output is not None:
+            self._output.async_close()
+            self._output = self._entry_data.output = None
+
+    @staticmethod
+    def _forecast_settings(config):
+        """Forecast entity, look-ahead (seconds) and feedforward gain."""
+        return (
+            config.get(CONF_FORECAST_ENTITY) or None,
+            config.get(CONF_FORECAST_HORIZON, DEFAULT_FORECAST_HORIZON) * 3600,
+            config.get(CONF_FORECAST_GAIN, DEFAULT_FORECAST_GAIN),
         )
 
-        # Initialize PID K-values from Input Numbers
-        self._update_pid_k_values()
+    @callback
+    def _async_start_forecast(self):
+        """Fetches the forecast now and then every FORECAST_REFRESH_INTERVAL."""
+        if self._forecast_entity is None:
+            return
+        self._remove_forecast_timer = async_track_time_interval(
+            self.hass, self._async_refresh_forecast, FORECAST_REFRESH_INTERVAL
+        )
+        self.hass.async_create_task(self._async_refresh_forecast())
+
+    @callback
+    def _async_stop_forecast(self):
+        """Stops refreshing the forecast and drops the feedforward term."""
+        if self._remove_forecast_timer is not None:
+            self._remove_forecast_timer()
+            self._remove_forecast_timer = None
+        self._feedforward = 0.0
+
+    async def _async_refresh_forecast(self, _now=None):
+        """Fetches the hourly forecast into the table shared by every zone using it."""
+        forecasts = self.hass.data[DOMAIN].setdefault(DATA_FORECASTS, {})
+        table = forecasts.get(self._forecast_entity)
+        now = time.time()
+        if table is not None and now - table.fetched < FORECAST_REFRESH_INTERVAL.total_seconds() / 2:
+            # Another zone using the same weather entity just fetched it.
+            return
 
-        # Manually call update loop once to initialize T_comp immediately on startup.   
-        # We pass None as event since it's a manual call.
-        await self._async_update_loop(None)
+        try:
+            response = await self.hass.services.async_call(
+                "weather",
+                "get_forecasts",
+                {"entity_id": self._forecast_entity, "type": "hourly"},
+                blocking=True,
+                return_response=True,
+            )
+        except HomeAssistantError as err:
+            self._LOGGER.warning("Could not fetch the forecast of %s: %s", self._forecast_entity, err)
+            return
+
+        forecast = response.get(self._forecast_entity, {}).get("forecast", [])
+        forecasts[self._forecast_entity] = table = ForecastTable.from_forecast(forecast, now)
+        self._LOGGER.debug("Forecast of %s refreshed: %d points", self._forecast_entity, len(table))
+
+    def _forecast_feedforward(self, T_real_outdoor):
+        """Share of the outdoor change the forecast expects within the look-ahead horizon."""
+        if self._forecast_entity is None:
+            return 0.0
+        table = self.hass.data[DOMAIN].get(DATA_FORECASTS, {}).get(self._forecast_entity)
+        if table is None:
+            return 0.0
+        T_ahead = table.at(time.time() + self._forecast_horizon)
+        if T_ahead is None:
+            return 0.0
+        return self._forecast_gain * (T_ahead - T_real_outdoor)
+
+    def _sample_phase(self):
+        """Offset of this zone within the sample period, spread evenly by engine slot."""
+        # Golden ratio spacing keeps consecutive slots far apart for any number of zones.
+        return (self._slot * 0.6180339887) % 1.0 * self._sample_period
+
+    @callback
+    def _async_start_sampling(self, _now):
+        """Starts the fixed-rate timer once this zone's phase offset has passed."""
+        self._remove_sample_timer = async_track_time_interval(
+            self.hass, self._async_sample, timedelta(seconds=self._sample_period)
+        )
+
+    async def _async_sample(self, _now):
+        """Runs one fixed-rate PID evaluation."""
+        self._stats.triggers["sample"] += 1
+        await self._async_update_loop()
+
+    @callback
+    def _async_sensor_changed(self, entity_id, reading):
+        """Handles an indoor or outdoor sensor reading parsed by the sensor hub."""
+        if entity_id in self._indoor_sensors:
+            self._async_update_indoor(entity_id, reading)
+        if not self._sample_period:
+            self._stats.triggers["sensor"] += 1
+            self._async_schedule_update()
+
+    @callback
+    def _async_update_indoor(self, entity_id, reading):
+        """Feeds one indoor sensor reading into the aggregate."""
+        if reading is None:
+            self._indoor.remove(entity_id)
+        else:
+            self._indoor.update(entity_id, *reading)
+
+    @callback
+    def _async_schedule_update(self, event=None):
+        """Requests a coalesced run of the update loop."""
+        self._update_debouncer.async_schedule_call()
+
+    @callback
+    def _async_write_state(self):
+        """Writes the entity state and counts it for the diagnostics."""
+        self._stats.state_writes += 1
+        self._last_write_time = time.monotonic()
+        self._last_write_signature = self._state_signature()
+        self.async_write_ha_state()
 
-    async def _async_update_loop(self, event):
-        """Main loop: Runs PID calculation, applies constraints, and updates attributes."""
+    def _state_signature(self):
+        """Everything besides T_comp that ends up in the state or its attributes.
+
+        Indoor and outdoor temperatures are quantized to the publish deadband
+        (0.1 °C without one), so sensor noise alone doesn't force a state
+        write; the heartbeat still writes their current values.
+        """
+        step = self._publish_deadband or 0.1
+        return (
+            self._attr_hvac_mode,
+            None if self._attr_current_temperature is None else round(self._attr_current_temperature / step),
+            self._attr_target_temperature,
+            None if self._real_outdoor_temp_value is None else round(self._real_outdoor_temp_value / step),
+            self._weather_factor,
+            round(self._feedforward, 2),
+            self._parameters.kp,
+            self._parameters.ki,
+            self._parameters.kd,
+        )
+
+    @callback
+    def _async_publish_step(self, T_comp):
+        """Publishes a new T_comp and writes state according to the publishing policy."""
+        value = round(T_comp, 1)
+        previous = self._compensated_temp_value
+        t_comp_changed = previous is None or (
+            value != previous and abs(value - previous) >= self._publish_deadband
+        )
+        if t_comp_changed:
+            self._async_publish_compensated_temp(value)
+
+        if (
+            t_comp_changed
+            or self._state_signature() != self._last_write_signature
+            or self._last_write_time is None
+            or time.monotonic() - self._last_write_time >= self._publish_heartbeat
+        ):
+            self._async_write_state()
+            async_dispatcher_send(
+                self.hass, SIGNAL_PID_TERMS_UPDATED.format(self._config_entry_id)
+            )
+
+    async def _async_update_loop(self, _event=None):
+        """Main loop: Runs the update up to queuing the PID step and records its duration."""
+        start = time.perf_counter_ns()
+        try:
+            await self._async_run_update()
+        finally:
+            self._stats.record("queue", time.perf_counter_ns() - start)
+
+    async def _async_run_update(self):
+        """Runs PID calculation, applies constraints, and updates attributes."""
         
         # 1. Check availability and fetch sensor values
-        T_indoor = self._get_float_state(self._indoor_sensor)
-        T_real_outdoor = self._get_float_state(self._outdoor_sensor)
-        weather_factor = self._get_float_state(self._weather_factor_entity_id)
+        self._indoor.expire(time.time(), self._hub.refresh)
+        T_indoor = self._indoor.value
+        T_real_outdoor = self._hub.value(self._outdoor_sensor)
+        weather_factor = self._parameters.weather_factor
 
         self._weather_factor = weather_factor if weather_factor is not None else 1.0
 
         # Update real outdoor temperature attribute (for monitoring)
         self._real_outdoor_temp_value = T_real_outdoor
 
-        # --- RESTORING LOGIC FOR NONE VALUES (Fixes startup warnings/aborts) ---
-
-        if T_indoor is None:
-            last_state = self.hass.states.get(self._indoor_sensor)
-            if last_state and last_state.state not in (STATE_UNAVAILABLE, STATE_UNKNOWN, None):
-                try:
-                    T_indoor = float(last_state.state)
-                except ValueError:
-                    pass 
-
-        if T_real_outdoor is None:
-            last_state = self.hass.states.get(self._outdoor_sensor)
-            if last_state and last_state.state not in (STATE_UNAVAILABLE, STATE_UNKNOWN, None):
-                try:
-                    T_real_outdoor = float(last_state.state)
-                except ValueError:
-                    pass
-
-        # If T_indoor/T_real_outdoor are STILL None after attempted restoration, abort.
+        # If T_indoor/T_real_outdoor are not valid (yet), abort.
         if T_indoor is None or T_real_outdoor is None:
+            self._stats.skipped_waiting += 1
             if not self._waiting_for_valid_sensors:
                 self._LOGGER.debug(
                     "Waiting for valid temperature values for PID calculation (sensors still loading)."
@@ -214,61 +643,216 @@ class PIDClimateController(ClimateEntity, RestoreEntity):
             # If system is OFF, T_comp is set to T_real_outdoor (or a high value) 
             # to ensure the heat pump does not heat.
             T_comp = T_real_outdoor
-            self._compensated_temp_value = round(T_comp, 1)
-            self.async_write_ha_state()
+            self._async_publish_step(T_comp)
             return
 
-        try:
-            # 3. Calculate the raw correction (Delta T)
-            delta_T = self.pid(T_indoor)
+        # While autotuning, the relay drives T_comp instead of the PID.
+        if self._autotuner is not None and self._async_autotune_step(T_indoor, T_real_outdoor):
+            return
 
-            # 4. Calculate raw T_comp, applying the weather factor
-            T_comp = T_real_outdoor + (delta_T * self._weather_factor)
+        # The forecast feedforward shifts T_comp, so the heat pump starts ramping before
+        # a forecast cold front (or warm spell) actually arrives. The freezing clamp
+        # still follows the real outdoor temperature.
+        self._feedforward = self._forecast_feedforward(T_real_outdoor)
+
+        if self._gain_schedule:
+            self._apply_scheduled_gains(T_real_outdoor)
+
+        # 3. Queue the PID step; zones updating in the same loop iteration are batched.
+        self._step_queued = True
+        self._engine.request_step(
+            self._slot,
+            T_indoor,
+            T_real_outdoor,
+            self._weather_factor,
+            self._async_handle_step_result,
+            feedforward=self._feedforward,
+        )
+
+    @callback
+    def _async_handle_step_result(self, delta_T, T_comp):
+        """Applies this zone's slot of a batched engine step."""
+        self._step_queued = False
+        if not self._is_on:
+            # Switched OFF while the step was queued; switching OFF ran the update loop,
+            # whose OFF branch published T_real_outdoor instead of this result.
+            return
 
-            # --- IMPLEMENTATION OF SAFETY CONSTRAINTS (Clamping) ---
+        start = time.perf_counter_ns()
+        self._last_step_time = dt_util.utcnow()
 
-            # Rule: If it is freezing outside, the simulated value must not be positive.
-            if T_real_outdoor < 0:
-                # T_comp must not be greater than 0.0
-                T_comp = min(0.0, T_comp)
+        try:
+            # 4. Update state and attributes (weather factor and freezing clamp applied by the engine)
+            pid_terms = self._entry_data.pid_terms = {
+                "error": float(self._engine.last_error[self._slot]),
+                "p_term": float(self._engine.p_term[self._slot]),
+                "i_term": float(self._engine.integral[self._slot]),
+                "d_term": float(self._engine.d_term[self._slot]),
+            }
+            step = (
+                self._last_step_time.timestamp(),
+                self._attr_current_temperature,
+                self._real_outdoor_temp_value,
+                self._attr_target_temperature,
+                pid_terms["p_term"],
+                pid_terms["i_term"],
+                pid_terms["d_term"],
+                self._weather_factor,
+                self._feedforward,
+                T_comp,
+                bool(self._engine.freezing_clamp[self._slot]),
+            )
+            self._entry_data.history.record(*step)
+            if self._step_log is not None:
+                self._step_log.append(self._config_entry_id, step)
+            self._async_publish_step(T_comp)
 
-            # 5. Update state and attributes
-            self._compensated_temp_value = round(T_comp, 1)
-            self.async_write_ha_state()
-            
             self._LOGGER.debug(
-                f"PID: T_setpoint={self._attr_target_temperature:.1f}, "
-                f"T_current={T_indoor:.1f}, Delta_T={delta_T:.2f}, "
-                f"Factor={self._weather_factor}, "
-                f"T_real_out={T_real_outdoor:.1f}, T_comp={T_comp:.1f}"
+                "PID: T_setpoint=%.1f, T_current=%.1f, Delta_T=%.2f, Factor=%s, T_real_out=%.1f, T_comp=%.1f",
+                self._attr_target_temperature,
+                self._attr_current_temperature,
+                delta_T,
+                self._weather_factor,
+                self._real_outdoor_temp_value,
+                T_comp,
             )
 
         except Exception as e:
-            self._LOGGER.error(f"Error during PID calculation or update: {e}")
+            self._LOGGER.error("Error during PID calculation or update: %s", e)
+        finally:
+            # The zone's share of the engine step, then applying, publishing and writing it.
+            self._stats.record("step", self._engine.step_ns + time.perf_counter_ns() - start)
+
+    @callback
+    def _async_publish_compensated_temp(self, T_comp):
+        """Stores T_comp and hands it straight to the companion sensor."""
+        self._compensated_temp_value = round(T_comp, 1)
+        self._entry_data.compensated_temp = self._compensated_temp_value
+        if self._stats.startup_s is None:
+            self._stats.startup_s = time.monotonic() - self._entry_data.setup_time
+            self._LOGGER.debug("First T_comp %.1f published %.3fs after setup", T_comp, self._stats.startup_s)
+        async_dispatcher_send(
+            self.hass,
+            SIGNAL_COMPENSATED_TEMP_UPDATED.format(self._config_entry_id),
+            self._compensated_temp_value,
+        )
+        # Rate limited and skipped when the target already holds this value.
+        if self._output is not None:
+            self._output.async_publish(self._compensated_temp_value)
+
+    async def async_autotune(self, relay_amplitude, hysteresis, cycles, rule, max_duration):
+        """Starts an Åström–Hägglund relay experiment around the current setpoint."""
+        if not self._is_on:
+            raise HomeAssistantError("Autotune needs the controller in HEAT mode")
+
+        self._autotuner = RelayAutotuner(
+            self._attr_target_temperature, relay_amplitude, hysteresis, cycles, rule,
+            # The gains are written to the number entities, so they must fit their ranges.
+            gain_limits={key: PARAMETER_RANGES[key][1:3] for key in GAIN_KEYS},
+        )
+        self._autotune_deadline = time.monotonic() + max_duration.total_seconds()
+        self._LOGGER.info(
+            "Autotune started: relay ±%.1f around %.1f, %d cycles", relay_amplitude,
+            self._attr_target_temperature, cycles,
+        )
+        await self._async_update_loop()
+
+    @callback
+    def _async_autotune_step(self, T_indoor, T_real_outdoor):
+        """Feeds the autotuner one reading; returns False once normal PID control should resume."""
+        now = time.monotonic()
+        offset = self._autotuner.update(now, T_indoor)
+
+        if self._autotuner.result is not None:
+            result = self._autotuner.result
+            self._LOGGER.info(
+                "Autotune finished: Ku=%.3f, Tu=%.0fs -> Kp=%.4f, Ki=%.6f, Kd=%.4f",
+                result.ultimate_gain, result.ultimate_period, result.kp, result.ki, result.kd,
+            )
+            self._autotuner = None
+            # Restart the integrator so the new gains start bumpless from here.
+            self._engine.reset(self._slot)
+            # Writing into the parameter store updates the number entities and the engine.
+            for key in ("kp", "ki", "kd"):
+                self._parameters.async_set(key, round(getattr(result, key), 6))
+            if self._gain_schedule:
+                self._LOGGER.warning(
+                    "Autotuned gains were written to the number entities, but the gain schedule stays in control"
+                )
+            return False
+
+        if self._autotuner.error is not None or now > self._autotune_deadline:
+            self._LOGGER.warning(
+                "Autotune aborted: %s", self._autotuner.error or "maximum duration exceeded"
+            )
+            self._autotuner = None
+            return False
+
+        T_comp = T_real_outdoor + offset
+        # Rule: If it is freezing outside, the simulated value must not be positive.
+        if T_real_outdoor < 0:
+            T_comp = min(0.0, T_comp)
+
+        self._async_publish_step(T_comp)
+        return True
 
     async def async_set_temperature(self, **kwargs):
         """Sets the new target setpoint (Target Temperature)."""
         target_temp = kwargs.get(ATTR_TEMPERATURE)
         if target_temp is not None:
-            self._attr_target_temperature = target_temp
-            self.pid.setpoint = target_temp
-
-            await self._async_update_loop(
-                {"data": {"new_state": self.hass.states.get(self._indoor_sensor)}}
-            )
+            await self._async_apply_targets_and_update(temperature=target_temp)
 
     async def async_set_hvac_mode(self, hvac_mode: HVACMode):
         """Sets the operating mode (HEAT/OFF)."""
-        if hvac_mode == HVACMode.HEAT:
-            self._is_on = True
-            await self._async_update_loop(
-                {"data": {"new_state": self.hass.states.get(self._indoor_sensor)}}
-            )
-        else:
-            self._is_on = False
-
-        self._attr_hvac_mode = hvac_mode
-        self.async_write_ha_state()
+        await self._async_apply_targets_and_update(hvac_mode=hvac_mode)
+
+    async def _async_apply_targets_and_update(self, **targets):
+        """Applies new targets, runs the loop if needed and writes the state once.
+
+        A queued PID step writes the state together with its result. Otherwise
+        (OFF, fixed-rate sampling, waiting for sensors) the state is written here.
+        Switching OFF always writes, even if a step queued earlier is dropped.
+        """
+        if self.async_apply_targets(**targets):
+            await self._async_update_loop()
+        if not self._step_queued:
+            self.async_write_state_if_changed()
+
+    @callback
+    def async_apply_targets(self, temperature=None, hvac_mode=None) -> bool:
+        """Sets the setpoint and/or HVAC mode without running the loop or writing state.
+
+        Returns True if the update loop should run now to act on the change.
+        """
+        run_update = False
+        if temperature is not None:
+            self._stats.triggers["setpoint"] += 1
+            self._attr_target_temperature = temperature
+            self._engine.set_setpoint(self._slot, temperature)
+            run_update = not self._sample_period
+        if hvac_mode is not None:
+            self._stats.triggers["mode"] += 1
+            self._is_on = hvac_mode == HVACMode.HEAT
+            if not self._is_on:
+                self._autotuner = None
+                # A step queued before is dropped by its result handler, so nothing
+                # waits for it; the OFF branch of the update loop publishes T_real_outdoor
+                # and the cleared signature makes the next write unconditional.
+                self._step_queued = False
+                self._last_write_signature = None
+            self._attr_hvac_mode = hvac_mode
+            run_update = True
+        return run_update
+
+    async def async_update_now(self):
+        """Runs the update loop at once, bypassing the debouncer; the PID step itself is batched."""
+        await self._async_update_loop()
+
+    @callback
+    def async_write_state_if_changed(self):
+        """Writes state unless the last write already holds the current targets and values."""
+        if self._state_signature() != self._last_write_signature:
+            self._async_write_state()
 
     @property
     def extra_state_attributes(self):
@@ -280,77 +864,44 @@ class PIDClimateController(ClimateEntity, RestoreEntity):
         # Collect all attributes
         attributes = {
             ATTR_COMPENSATED_TEMP: compensated_temp, # The compensated temperature (T_comp)
-            "PID_Kp": self.pid.Kp,
-            "PID_Ki": self.pid.Ki,
-            "PID_Kd": self.pid.Kd,
-            "PID_setpoint": self.pid.setpoint,
+            "PID_Kp": float(self._engine.kp[self._slot]),
+            "PID_Ki": float(self._engine.ki[self._slot]),
+            "PID_Kd": float(self._engine.kd[self._slot]),
+            "PID_setpoint": float(self._engine.setpoint[self._slot]),
             "real_outdoor_temperature": real_outdoor_temperature,
+            "indoor_sensors_used": len(self._indoor),
+            "forecast_feedforward": round(self._feedforward, 2),
             "weather_factor": self._weather_factor,
         }
         return attributes
 
-    def _get_float_state(self, entity_id):
-        """Fetches and converts an entity's state to float safely."""
-        from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN 
-
-        state = self.hass.states.get(entity_id)
-        if state and state.state not in (STATE_UNAVAILABLE, STATE_UNKNOWN, None):
-            try:
-                return float(state.state)
-            except ValueError:
-                self._LOGGER.error(f"Could not convert state '{state.state}' for {entity_id} to float.")
-        return None # Returns None if value is invalid or missing
-
-    def _update_pid_k_values(self, event=None):
-        """Reads the latest K values from Input Numbers and updates the PID instance."""
-        # Re-resolve IDs so renamed entities still work without reconfiguring.
-        self._resolve_pid_number_entity_ids()
-
-        kp = self._get_k_value(self._kp_entity_id)
-        ki = self._get_k_value(self._ki_entity_id)
-        kd = self._get_k_value(self._kd_entity_id)
-
-        # Only update PID instance if values are valid (not None)
-        if kp is not None and ki is not None and kd is not None:
-            self.pid.Kp = kp
-            self.pid.Ki = ki
-            self.pid.Kd = kd
-            self._LOGGER.debug(f"PID parameters updated: Kp={kp}, Ki={ki}, Kd={kd}")
-
-        # If called by an Input Number change, trigger a Climate entity update via main loop
-        if event:
-            # This callback can run from a non-event-loop thread, so schedule thread-safe.
-            self.hass.add_job(self._async_update_loop(event))
-
-    def _get_k_value(self, entity_id):
-        """Fetches the current float value for an Input Number entity."""
-        try:
-            state = self.hass.states.get(entity_id)
-            if state and state.state not in (STATE_UNAVAILABLE, STATE_UNKNOWN):
-                return float(state.state)
-        except (ValueError, TypeError):
-            self._LOGGER.error(f"Could not convert state for {entity_id} to float.")
-            return None # Returns None on error
-
-    def _resolve_pid_number_entity_ids(self) -> None:
-        """Resolve PID number entity_ids from the entity registry using unique_ids."""
-        entity_registry = er.async_get(self.hass)
-        resolved_kp = entity_registry.async_get_entity_id(
-            "number", DOMAIN, f"{self._config_entry_id}_kp"
-        )
-        resolved_ki = entity_registry.async_get_entity_id(
-            "number", DOMAIN, f"{self._config_entry_id}_ki"
-        )
-        resolved_kd = entity_registry.async_get_entity_id(
-            "number", DOMAIN, f"{self._config_entry_id}_kd"
-        )
-        resolved_weather_factor = entity_registry.async_get_entity_id(
-            "number", DOMAIN, f"{self._config_entry_id}_weather_factor"
-        )
+    def _apply_parameter_gains(self):
+        """Writes the gains published by the number entities into the engine slot."""
+        for key in GAIN_KEYS:
+            self._apply_pid_gain(key, getattr(self._parameters, key))
 
-        self._kp_entity_id = resolved_kp or self._fallback_kp_entity_id
-        self._ki_entity_id = resolved_ki or self._fallback_ki_entity_id
-        self._kd_entity_id = resolved_kd or self._fallback_kd_entity_id
-        self._weather_factor_entity_id = (
-            resolved_weather_factor or self._fallback_weather_factor_entity_id
-        )
+    def _apply_scheduled_gains(self, T_real_outdoor):
+        """Switches to the scheduled gains for this outdoor temperature, bumpless via the engine."""
+        gains = dict(zip(GAIN_KEYS, self._gain_schedule.at(T_real_outdoor)))
+        if gains == self._entry_data.scheduled_gains:
+            return
+        for key, value in gains.items():
+            self._engine.set_gain(self._slot, key, value)
+        self._entry_data.scheduled_gains = gains
+
+    def _apply_pid_gain(self, key, value):
+        """Writes one gain (kp, ki or kd) into this zone's engine slot."""
+        if value is None:
+            return
+        self._engine.set_gain(self._slot, key, value)
+        self._LOGGER.debug("PID parameter updated: %s=%s", key, value)
+
+    @callback
+    def _async_parameter_updated(self, key, value):
+        """Applies a parameter pushed by a number entity and re-runs the loop."""
+        self._stats.triggers["gain"] += 1
+        # The gain schedule, when configured, owns Kp, Ki and Kd.
+        if key != "weather_factor" and not self._gain_schedule:
+            self._apply_pid_gain(key, value)
+        if not self._sample_period:
+            self._async_schedule_update()
@@ -1,28 +1,169 @@
 import logging
+import math
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.const import CONF_NAME
+from homeassistant.core import callback
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.selector import selector
 
+from .aggregate import AGGREGATE_METHODS
 from .const import (
+    CONF_FORECAST_ENTITY,
+    CONF_FORECAST_GAIN,
+    CONF_FORECAST_HORIZON,
+    CONF_GAIN_SCHEDULE,
+    CONF_INDOOR_AGGREGATE,
     CONF_INDOOR_SENSOR,
+    CONF_INDOOR_STALE_AFTER,
+    CONF_INDOOR_WEIGHTS,
+    CONF_MIN_UPDATE_INTERVAL,
     CONF_OUTDOOR_SENSOR,
+    CONF_OUTPUT_LIMIT,
+    CONF_OUTPUT_MIN_INTERVAL,
+    CONF_OUTPUT_MODBUS_HOST,
+    CONF_OUTPUT_MODBUS_PORT,
+    CONF_OUTPUT_MODBUS_REGISTER,
+    CONF_OUTPUT_MODBUS_SCALE,
+    CONF_OUTPUT_MODBUS_UNIT,
+    CONF_OUTPUT_MQTT_TOPIC,
+    CONF_OUTPUT_TYPE,
+    CONF_PID_FORM,
+    CONF_PUBLISH_DEADBAND,
+    CONF_PUBLISH_HEARTBEAT,
+    CONF_SAMPLE_PERIOD,
+    CONF_STEP_LOG,
+    DEFAULT_FORECAST_GAIN,
+    DEFAULT_FORECAST_HORIZON,
+    DEFAULT_INDOOR_AGGREGATE,
+    DEFAULT_INDOOR_STALE_AFTER,
+    DEFAULT_MIN_UPDATE_INTERVAL,
+    DEFAULT_OUTPUT_LIMIT,
+    DEFAULT_OUTPUT_MIN_INTERVAL,
+    DEFAULT_OUTPUT_MODBUS_PORT,
+    DEFAULT_OUTPUT_MODBUS_SCALE,
+    DEFAULT_OUTPUT_MODBUS_UNIT,
+    DEFAULT_OUTPUT_TYPE,
+    DEFAULT_PID_FORM,
+    DEFAULT_PUBLISH_DEADBAND,
+    DEFAULT_PUBLISH_HEARTBEAT,
+    DEFAULT_SAMPLE_PERIOD,
     DEFAULT_NAME,
-    DOMAIN
+    DOMAIN,
+    MAX_TEMP_DIFFERENCE,
+    OUTPUT_MODBUS,
+    OUTPUT_MQTT,
+    OUTPUT_NONE,
+    PID_FORM_POSITIONAL,
+    PID_FORM_VELOCITY,
 )
+from .schedule import GainSchedule
 
 _LOGGER = logging.getLogger(__name__)
 
-STEP_USER_DATA_SCHEMA = vol.Schema({
-    vol.Required(CONF_NAME, default=DEFAULT_NAME): str,
+# Sensors; set up in the user step and changeable later in the options flow.
+SENSOR_SCHEMA = vol.Schema({
     vol.Required(CONF_INDOOR_SENSOR): selector(
-        {"entity": {"domain": "sensor", "device_class": "temperature"}}
+        {"entity": {"domain": "sensor", "device_class": "temperature", "multiple": True}}
     ),
     vol.Required(CONF_OUTDOOR_SENSOR): selector(
         {"entity": {"domain": "sensor", "device_class": "temperature"}}
     ),
 })
 
+# Sensors plus everything that has a default; only offered in the options flow, which the
+# climate entity applies in place.
+CONTROLLER_SCHEMA = SENSOR_SCHEMA.extend({
+    vol.Optional(CONF_INDOOR_AGGREGATE, default=DEFAULT_INDOOR_AGGREGATE): selector(
+        {"select": {"options": list(AGGREGATE_METHODS)}}
+    ),
+    # Mapping of indoor entity_id to weight; sensors not listed weigh 1.
+    vol.Optional(CONF_INDOOR_WEIGHTS, default={}): selector({"object": {}}),
+    vol.Optional(CONF_INDOOR_STALE_AFTER, default=DEFAULT_INDOOR_STALE_AFTER): selector(
+        {"number": {"min": 0, "max": 86400, "step": 60, "unit_of_measurement": "s", "mode": "box"}}
+    ),
+    vol.Optional(CONF_FORECAST_ENTITY): selector({"entity": {"domain": "weather"}}),
+    vol.Optional(CONF_FORECAST_HORIZON, default=DEFAULT_FORECAST_HORIZON): selector(
+        {"number": {"min": 1, "max": 24, "step": 1, "unit_of_measurement": "h", "mode": "box"}}
+    ),
+    vol.Optional(CONF_FORECAST_GAIN, default=DEFAULT_FORECAST_GAIN): selector(
+        {"number": {"min": 0, "max": 1, "step": 0.05, "mode": "box"}}
+    ),
+    vol.Optional(CONF_OUTPUT_LIMIT, default=DEFAULT_OUTPUT_LIMIT): selector(
+        {"number": {
+            "min": 0.5, "max": 2 * MAX_TEMP_DIFFERENCE, "step": 0.5, "unit_of_measurement": "°C", "mode": "box",
+        }}
+    ),
+    vol.Optional(CONF_MIN_UPDATE_INTERVAL, default=DEFAULT_MIN_UPDATE_INTERVAL): selector(
+        {"number": {"min": 0, "max": 300, "step": 1, "unit_of_measurement": "s", "mode": "box"}}
+    ),
+    vol.Optional(CONF_PUBLISH_DEADBAND, default=DEFAULT_PUBLISH_DEADBAND): selector(
+        {"number": {"min": 0, "max": 2, "step": 0.1, "unit_of_measurement": "°C", "mode": "box"}}
+    ),
+    vol.Optional(CONF_PUBLISH_HEARTBEAT, default=DEFAULT_PUBLISH_HEARTBEAT): selector(
+        {"number": {"min": 60, "max": 3600, "step": 60, "unit_of_measurement": "s", "mode": "box"}}
+    ),
+    vol.Optional(CONF_SAMPLE_PERIOD, default=DEFAULT_SAMPLE_PERIOD): selector(
+        {"number": {"min": 0, "max": 3600, "step": 1, "unit_of_measurement": "s", "mode": "box"}}
+    ),
+    vol.Optional(CONF_PID_FORM, default=DEFAULT_PID_FORM): selector(
+        {"select": {"options": [PID_FORM_POSITIONAL, PID_FORM_VELOCITY]}}
+    ),
+    vol.Optional(CONF_STEP_LOG, default=False): selector({"boolean": {}}),
+    # List of {outdoor, kp, ki, kd} breakpoints; while set, it replaces the Kp/Ki/Kd number entities.
+    vol.Optional(CONF_GAIN_SCHEDULE, default=[]): selector({"object": {}}),
+    # Optional direct output of T_comp to the heat pump.
+    vol.Optional(CONF_OUTPUT_TYPE, default=DEFAULT_OUTPUT_TYPE): selector(
+        {"select": {"options": [OUTPUT_NONE, OUTPUT_MQTT, OUTPUT_MODBUS]}}
+    ),
+    vol.Optional(CONF_OUTPUT_MQTT_TOPIC): selector({"text": {}}),
+    vol.Optional(CONF_OUTPUT_MODBUS_HOST): selector({"text": {}}),
+    vol.Optional(CONF_OUTPUT_MODBUS_PORT, default=DEFAULT_OUTPUT_MODBUS_PORT): selector(
+        {"number": {"min": 1, "max": 65535, "step": 1, "mode": "box"}}
+    ),
+    vol.Optional(CONF_OUTPUT_MODBUS_UNIT, default=DEFAULT_OUTPUT_MODBUS_UNIT): selector(
+        {"number": {"min": 0, "max": 255, "step": 1, "mode": "box"}}
+    ),
+    vol.Optional(CONF_OUTPUT_MODBUS_REGISTER): selector(
+        {"number": {"min": 0, "max": 65535, "step": 1, "mode": "box"}}
+    ),
+    vol.Optional(CONF_OUTPUT_MODBUS_SCALE, default=DEFAULT_OUTPUT_MODBUS_SCALE): selector(
+        {"number": {"min": 0.01, "max": 1000, "step": 0.01, "mode": "box"}}
+    ),
+    vol.Optional(CONF_OUTPUT_MIN_INTERVAL, default=DEFAULT_OUTPUT_MIN_INTERVAL): selector(
+        {"number": {"min": 0, "max": 3600, "step": 1, "unit_of_measurement": "s", "mode": "box"}}
+    ),
+})
+
+
+def _validate_controller_input(user_input):
+    """Return form errors for input the schema selectors can't check."""
+    errors = {}
+    weights = user_input.get(CONF_INDOOR_WEIGHTS) or {}
+    if not isinstance(weights, dict) or not all(
+        isinstance(weight, (int, float)) and not isinstance(weight, bool) and 0 <= weight < math.inf
+        for weight in weights.values()
+    ):
+        errors[CONF_INDOOR_WEIGHTS] = "invalid_indoor_weights"
+
+    try:
+        GainSchedule.from_config(user_input.get(CONF_GAIN_SCHEDULE))
+    except ValueError:
+        errors[CONF_GAIN_SCHEDULE] = "invalid_gain_schedule"
+
+    output_type = user_input.get(CONF_OUTPUT_TYPE)
+    if output_type == OUTPUT_MQTT and not user_input.get(CONF_OUTPUT_MQTT_TOPIC):
+        errors[CONF_OUTPUT_MQTT_TOPIC] = "output_target_required"
+    elif output_type == OUTPUT_MODBUS:
+        for key in (CONF_OUTPUT_MODBUS_HOST, CONF_OUTPUT_MODBUS_REGISTER):
+            if user_input.get(key) in (None, ""):
+                errors[key] = "output_target_required"
+    return errors
+
+STEP_USER_DATA_SCHEMA = vol.Schema({
+    vol.Required(CONF_NAME, default=DEFAULT_NAME): str,
+}).extend(SENSOR_SCHEMA.schema)
+
 class PIDHeatCompensationConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
 
@@ -36,3 +177,28 @@ class PIDHeatCompensationConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             data_schema=STEP_USER_DATA_SCHEMA,
             errors={},
         )
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(_config_entry):
+        return PIDHeatCompensationOptionsFlow()
+
+
+class PIDHeatCompensationOptionsFlow(config_entries.OptionsFlow):
+    """Changes sensors, output limits and update policy of a running entry."""
+
+    async def async_step_init(self, user_input=None):
+        errors = {}
+        if user_input is not None:
+            errors = _validate_controller_input(user_input)
+            if not errors:
+                return self.async_create_entry(data=user_input)
+
+        config = {**(self.config_entry.options or self.config_entry.data), **(user_input or {})}
+        # Entries created before multiple indoor sensors stored a single entity_id.
+        config[CONF_INDOOR_SENSOR] = cv.ensure_list(config[CONF_INDOOR_SENSOR])
+        return self.async_show_form(
+            step_id="init",
+            data_schema=self.add_suggested_values_to_schema(CONTROLLER_SCHEMA, config),
+            errors=errors,
+        )
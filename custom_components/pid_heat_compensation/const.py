@@ -1,4 +1,5 @@
 import logging
+from datetime import timedelta
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -6,12 +7,91 @@ _LOGGER = logging.getLogger(__name__)
 DOMAIN = "pid_heat_compensation"
 PLATFORMS = ["climate", "number", "sensor"]
 HA_DATA_KEY = "pid_compensation_data"
+DATA_ENGINE = "engine"
+DATA_FORECASTS = "forecasts"
+DATA_STEP_LOG = "step_log"
+DATA_SENSOR_HUB = "sensor_hub"
+DATA_MODBUS_POOL = "modbus_pool"
 ATTR_COMPENSATED_TEMP = "compensated_outdoor_temperature"
 
+# Services and their fields
+SERVICE_AUTOTUNE = "autotune"
+SERVICE_DUMP_STATS = "dump_stats"
+SERVICE_SET_ZONES = "set_zones"
+ATTR_ZONES = "zones"
+ATTR_RELAY_AMPLITUDE = "relay_amplitude"
+ATTR_HYSTERESIS = "hysteresis"
+ATTR_CYCLES = "cycles"
+ATTR_RULE = "rule"
+ATTR_MAX_DURATION = "max_duration"
+
+# Dispatcher signals (formatted with the config entry id)
+SIGNAL_COMPENSATED_TEMP_UPDATED = f"{DOMAIN}_compensated_temp_updated_{{}}"
+SIGNAL_PID_TERMS_UPDATED = f"{DOMAIN}_pid_terms_updated_{{}}"
+SIGNAL_OPTIONS_UPDATED = f"{DOMAIN}_options_updated_{{}}"
+
 # Configuration keys for the PID controller
 CONF_INDOOR_SENSOR = "indoor_temp_entity"
+CONF_INDOOR_AGGREGATE = "indoor_aggregate"
+CONF_INDOOR_WEIGHTS = "indoor_weights"
+CONF_INDOOR_STALE_AFTER = "indoor_stale_after"
 CONF_OUTDOOR_SENSOR = "outdoor_temp_entity"
+CONF_MIN_UPDATE_INTERVAL = "min_update_interval"
+CONF_PUBLISH_DEADBAND = "publish_deadband"
+CONF_PUBLISH_HEARTBEAT = "publish_heartbeat"
+CONF_SAMPLE_PERIOD = "sample_period"
+CONF_PID_FORM = "pid_form"
+CONF_OUTPUT_LIMIT = "output_limit"
+CONF_FORECAST_ENTITY = "forecast_entity"
+CONF_FORECAST_HORIZON = "forecast_horizon"
+CONF_FORECAST_GAIN = "forecast_gain"
+CONF_STEP_LOG = "step_log"
+CONF_GAIN_SCHEDULE = "gain_schedule"
+CONF_OUTPUT_TYPE = "output_type"
+CONF_OUTPUT_MQTT_TOPIC = "output_mqtt_topic"
+CONF_OUTPUT_MODBUS_HOST = "output_modbus_host"
+CONF_OUTPUT_MODBUS_PORT = "output_modbus_port"
+CONF_OUTPUT_MODBUS_UNIT = "output_modbus_unit"
+CONF_OUTPUT_MODBUS_REGISTER = "output_modbus_register"
+CONF_OUTPUT_MODBUS_SCALE = "output_modbus_scale"
+CONF_OUTPUT_MIN_INTERVAL = "output_min_interval"
 
 # Default values
 DEFAULT_NAME = "PID Heat Compensation"
 MAX_TEMP_DIFFERENCE = 10.0
+DEFAULT_MIN_UPDATE_INTERVAL = 5  # seconds between coalesced PID evaluations
+DEFAULT_PUBLISH_DEADBAND = 0.0  # °C change in T_comp needed before it is published
+DEFAULT_PUBLISH_HEARTBEAT = 900  # seconds; state is written at least this often
+DEFAULT_INDOOR_AGGREGATE = "mean"  # weighted mean, "min" or "median" of the indoor sensors
+DEFAULT_INDOOR_STALE_AFTER = 3600  # seconds without a report before an indoor sensor is ignored
+DEFAULT_OUTPUT_LIMIT = MAX_TEMP_DIFFERENCE  # °C; Delta T is limited to ± this value
+DEFAULT_FORECAST_HORIZON = 3  # hours the feedforward looks ahead in the forecast
+DEFAULT_FORECAST_GAIN = 0.5  # share of the forecast outdoor change added to T_comp ahead of time
+FORECAST_REFRESH_INTERVAL = timedelta(minutes=30)
+DEFAULT_SAMPLE_PERIOD = 0  # seconds; 0 = run on sensor events instead of a fixed rate
+PID_FORM_POSITIONAL = "positional"
+PID_FORM_VELOCITY = "velocity"
+DEFAULT_PID_FORM = PID_FORM_POSITIONAL
+OUTPUT_NONE = "none"
+OUTPUT_MQTT = "mqtt"
+OUTPUT_MODBUS = "modbus"
+DEFAULT_OUTPUT_TYPE = OUTPUT_NONE  # T_comp only reaches the heat pump through the sensor
+DEFAULT_OUTPUT_MODBUS_PORT = 502
+DEFAULT_OUTPUT_MODBUS_UNIT = 1
+DEFAULT_OUTPUT_MODBUS_SCALE = 10  # register value = T_comp × scale, e.g. -5.3 °C -> -53
+DEFAULT_OUTPUT_MIN_INTERVAL = 30  # seconds between writes to the output target
+WARM_START_MAX_AGE = timedelta(hours=2)  # persisted PID state older than this is discarded
+DEFAULT_AUTOTUNE_RELAY_AMPLITUDE = 3.0
+DEFAULT_AUTOTUNE_HYSTERESIS = 0.1
+DEFAULT_AUTOTUNE_CYCLES = 3
+DEFAULT_AUTOTUNE_MAX_DURATION = timedelta(hours=72)
+
+# (initial value, min, max, step) of the PID parameter number entities. Ki is per
+# second and Kd in seconds, so gains fitting a house's hours-long time constants
+# (and autotune results) are tiny for Ki and large for Kd.
+PARAMETER_RANGES = {
+    "kp": (-2.0, -10.0, 10.0, 0.01),
+    "ki": (0.0, -5.0, 5.0, 0.000001),
+    "kd": (0.0, -20000.0, 20000.0, 0.1),
+    "weather_factor": (1.0, -2.0, 2.0, 0.01),
+}
@@ -0,0 +1,24 @@
+"""Diagnostics support for PID Heat Compensation."""
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DATA_STEP_LOG, DOMAIN
+from .models import PARAMETER_KEYS
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return the configuration, runtime counters and recent PID steps of an entry."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    return {
+        "config": dict(entry.options or entry.data),
+        "parameters": {key: getattr(entry_data.parameters, key) for key in PARAMETER_KEYS},
+        "compensated_temp": entry_data.compensated_temp,
+        "pid_terms": entry_data.pid_terms,
+        "scheduled_gains": entry_data.scheduled_gains,
+        "stats": entry_data.stats.as_dict(),
+        "steps": entry_data.history.as_list(),
+        "output": entry_data.output.as_dict() if entry_data.output else None,
+        "step_log": step_log.as_dict() if (step_log := hass.data[DOMAIN].get(DATA_STEP_LOG)) else None,
+    }
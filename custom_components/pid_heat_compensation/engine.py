@@ -0,0 +1,386 @@
+"""Batched PID engine shared by every PID Heat Compensation zone.
+
+All controllers' gains, setpoints, integrators and last errors live in one
+NumPy array with a row per zone slot and a column per field. Each slot runs either the positional form
+(with back-calculation anti-windup) or the velocity form of the PID, and
+gain changes are bumpless in both. Zones that request a step during the same
+event loop iteration are evaluated together in one vectorized pass, and each
+climate entity only reads back its own slot.
+
+The module only depends on NumPy and the standard library so the exact same
+control law can be driven outside Home Assistant.
+"""
+import math
+import time
+
+import numpy as np
+
+# simple_pid used this as dt when two calls landed on the same clock tick.
+_MIN_DT = 1e-16
+
+
+def _clamp(value, low, high):
+    """min(max(value, low), high) for floats, without the builtins' call overhead."""
+    return low if value < low else high if value > high else value
+
+
+def _first(value):
+    """A scalar, or the only element of a one-element array, as a float."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    return float(np.asarray(value).reshape(-1)[0])
+
+
+class PIDEngine:
+    """Vectorized PID state for many zones."""
+
+    _FIELDS = (
+        "kp",
+        "ki",
+        "kd",
+        "setpoint",
+        "integral",
+        "last_error",
+        "last_input",
+        "prev_input",
+        "last_output",
+        "last_time",
+        "p_term",
+        "d_term",
+        "sample_dt",
+        "velocity",
+        "out_min",
+        "out_max",
+        "delta_t",
+        "t_comp",
+        "freezing_clamp",
+    )
+
+    def __init__(self, loop=None, capacity=8):
+        """Initialize the engine with room for `capacity` zones."""
+        self._loop = loop
+        self._capacity = 0
+        self._free = []
+        self._used = np.zeros(0, dtype=bool)
+        # Per-slot state: one float64 row per slot with a column per field. Each
+        # field (self.kp, self.integral, ...) is a view of its column, rebound by
+        # _grow(), so a single slot's state is read and written as a whole row.
+        self._state = np.zeros((0, len(self._FIELDS)), dtype=np.float64)
+        self._grow(max(1, capacity))
+
+        # Pending inputs for the next batched step, keyed by slot.
+        self._pending = {}
+        self._flush_handle = None
+        # Per-zone share of the last flush's PID step in nanoseconds, for the stats.
+        self.step_ns = 0
+
+    def _grow(self, capacity):
+        """Resize every state array to `capacity` slots."""
+        extra = capacity - self._capacity
+        self._state = np.concatenate((self._state, np.zeros((extra, len(self._FIELDS)))))
+        for column, field in enumerate(self._FIELDS):
+            setattr(self, field, self._state[:, column])
+        self._used = np.concatenate((self._used, np.zeros(extra, dtype=bool)))
+        self._free.extend(range(capacity - 1, self._capacity - 1, -1))
+        self._capacity = capacity
+
+    def allocate(self, output_limits):
+        """Reserve a slot for a new zone and return its index."""
+        if not self._free:
+            self._grow(self._capacity * 2)
+
+        slot = self._free.pop()
+        self._used[slot] = True
+        self.kp[slot] = self.ki[slot] = self.kd[slot] = 0.0
+        self.setpoint[slot] = 0.0
+        self.out_min[slot], self.out_max[slot] = output_limits
+        self.sample_dt[slot] = self.velocity[slot] = 0.0
+        self.delta_t[slot] = self.t_comp[slot] = np.nan
+        self.freezing_clamp[slot] = 0.0
+        self.reset(slot)
+        return slot
+
+    def release(self, slot):
+        """Return a slot to the free list."""
+        self._pending.pop(slot, None)
+        if self._used[slot]:
+            self._used[slot] = False
+            self._free.append(slot)
+
+    def reset(self, slot):
+        """Clear the integrator and history of a slot, like PID.reset()."""
+        self.integral[slot] = 0.0
+        self.last_error[slot] = 0.0
+        self.last_input[slot] = self.prev_input[slot] = np.nan
+        self.last_output[slot] = np.nan
+        self.last_time[slot] = time.monotonic()
+        self.p_term[slot] = self.d_term[slot] = 0.0
+
+    def restore(self, slot, integral, last_error, last_output):
+        """Warm-start a slot from persisted state; the clock restarts now."""
+        self.integral[slot] = min(max(integral, self.out_min[slot]), self.out_max[slot])
+        self.last_error[slot] = last_error
+        self.last_output[slot] = np.nan if last_output is None else last_output
+        # No derivative kick: the first step after a restart has no previous input.
+        self.last_input[slot] = self.prev_input[slot] = np.nan
+        self.last_time[slot] = time.monotonic()
+
+    def set_gains(self, slot, kp, ki, kd):
+        """Set the tunings of a slot."""
+        self.set_gain(slot, "kp", kp)
+        self.set_gain(slot, "ki", ki)
+        self.set_gain(slot, "kd", kd)
+
+    def set_gain(self, slot, name, value):
+        """Set a single tuning ("kp", "ki" or "kd") of a slot, bumpless once it has stepped.
+
+        The velocity form only integrates output increments, so it is bumpless
+        by itself. In the positional form the integrator absorbs the jump the
+        new Kp or Kd would cause in the P or D term; Ki needs nothing because
+        the integral already holds Ki * error * dt. Before the first step
+        (fresh, reset or warm-started slot) gains are simply set.
+        """
+        gains = getattr(self, name)
+        old = gains[slot]
+        gains[slot] = value
+        if self.velocity[slot] or np.isnan(self.last_input[slot]):
+            return
+
+        if name == "kp":
+            self.integral[slot] += (old - value) * self.last_error[slot]
+        elif name == "kd" and old != 0:
+            self.integral[slot] += self.d_term[slot] * (1 - value / old)
+            self.d_term[slot] *= value / old
+        else:
+            return
+        self.integral[slot] = min(max(self.integral[slot], self.out_min[slot]), self.out_max[slot])
+
+    def set_form(self, slot, velocity):
+        """Select the velocity (True) or positional (False) form for a slot."""
+        self.velocity[slot] = float(velocity)
+
+    def set_output_limits(self, slot, output_limits):
+        """Change the output limits of a slot, clamping its integral and last output."""
+        out_min, out_max = self.out_min[slot], self.out_max[slot] = output_limits
+        self.integral[slot] = min(max(self.integral[slot], out_min), out_max)
+        if not np.isnan(self.last_output[slot]):
+            self.last_output[slot] = min(max(self.last_output[slot], out_min), out_max)
+
+    def set_sample_period(self, slot, period):
+        """Use a fixed dt for a slot (fixed-rate sampling); 0 measures dt from the clock."""
+        self.sample_dt[slot] = period
+
+    def set_setpoint(self, slot, setpoint):
+        """Set the setpoint of a slot."""
+        self.setpoint[slot] = setpoint
+
+    def step(self, slots, indoor, outdoor, weather_factor, now=None, dt=None, feedforward=0.0):
+        """Run one PID step for `slots` and return (delta_T, T_comp) arrays.
+
+        Both forms use proportional on error and derivative on measurement,
+        like simple_pid 2.0.1. The positional form clamps the integral to the
+        output limits and additionally tracks the saturated output with
+        back-calculation (tracking time constant Ti = Kp / Ki). The velocity
+        form adds the increment of the PID output to the previous output and
+        clamps the result, so it cannot wind up. The weather factor and the
+        freezing clamp are applied afterwards.
+
+        `outdoor` is the real outdoor temperature; `feedforward` (e.g. from a
+        forecast) shifts T_comp but never decides whether it is freezing.
+
+        `dt` overrides the measured time since the last step (e.g. for fixed
+        rate sampling or simulation); slots with a sample period always use it.
+        A single slot takes a scalar path with the same math on Python floats,
+        because NumPy's per-call overhead dominates a one-element step. The batched path
+        allocates a few dozen temporary arrays per call, so its per-zone cost
+        only stays flat when many zones share one step (one flush).
+        """
+        if now is None:
+            now = time.monotonic()
+        if len(slots) == 1:
+            delta_t, t_comp = self._step_one(
+                int(slots[0]),
+                _first(indoor),
+                _first(outdoor),
+                _first(weather_factor),
+                now,
+                None if dt is None else _first(dt),
+                _first(feedforward),
+            )
+            return np.array([delta_t]), np.array([t_comp])
+
+        slots = np.asarray(slots, dtype=np.intp)
+        indoor = np.asarray(indoor, dtype=np.float64)
+        outdoor = np.asarray(outdoor, dtype=np.float64)
+        weather_factor = np.asarray(weather_factor, dtype=np.float64)
+        feedforward = np.asarray(feedforward, dtype=np.float64)
+
+        if dt is None:
+            dt = now - self.last_time[slots]
+        dt = np.where(dt > 0, dt, _MIN_DT)
+        sample_dt = self.sample_dt[slots]
+        dt = np.where(sample_dt > 0, sample_dt, dt)
+
+        kp = self.kp[slots]
+        ki = self.ki[slots]
+        kd = self.kd[slots]
+        out_min = self.out_min[slots]
+        out_max = self.out_max[slots]
+        last_input = np.where(np.isnan(self.last_input[slots]), indoor, self.last_input[slots])
+        prev_input = np.where(np.isnan(self.prev_input[slots]), last_input, self.prev_input[slots])
+
+        error = self.setpoint[slots] - indoor
+        d_input = indoor - last_input
+        proportional = kp * error
+        derivative = -kd * d_input / dt
+
+        # Positional form with back-calculation anti-windup.
+        integral = np.clip(self.integral[slots] + ki * error * dt, out_min, out_max)
+        unsaturated = proportional + integral + derivative
+        positional = np.clip(unsaturated, out_min, out_max)
+        tracking = np.divide(ki, kp, out=np.zeros_like(ki), where=kp != 0)
+        integral = np.clip(
+            integral + np.clip(tracking * dt, 0.0, 1.0) * (positional - unsaturated), out_min, out_max
+        )
+
+        # Velocity form: previous output plus the PID increment.
+        last_output = np.nan_to_num(self.last_output[slots])
+        increment = (
+            kp * (error - self.last_error[slots])
+            + ki * error * dt
+            - kd * (d_input - (last_input - prev_input)) / dt
+        )
+        incremental = np.clip(last_output + increment, out_min, out_max)
+
+        velocity = self.velocity[slots] > 0
+        delta_t = np.where(velocity, incremental, positional)
+        # The velocity form has no integrator of its own; keep the implied I term so
+        # diagnostics, the warm start and switching forms all see a consistent value.
+        integral = np.where(
+            velocity, np.clip(incremental - proportional - derivative, out_min, out_max), integral
+        )
+
+        t_comp = outdoor + feedforward + delta_t * weather_factor
+        # If it is freezing outside, the simulated value must not be positive.
+        freezing_clamp = (outdoor < 0) & (t_comp > 0)
+        t_comp = np.where(freezing_clamp, 0.0, t_comp)
+
+        self.integral[slots] = integral
+        self.last_error[slots] = error
+        self.prev_input[slots] = last_input
+        self.last_input[slots] = indoor
+        self.last_output[slots] = delta_t
+        self.last_time[slots] = now
+        self.p_term[slots] = proportional
+        self.d_term[slots] = derivative
+        self.delta_t[slots] = delta_t
+        self.t_comp[slots] = t_comp
+        self.freezing_clamp[slots] = freezing_clamp
+
+        return delta_t, t_comp
+
+    def _step_one(self, slot, indoor, outdoor, weather_factor, now, dt, feedforward):
+        """`step` for one slot with Python floats; returns (delta_T, T_comp).
+
+        The slot's row is read once as a list of floats and written back in one
+        assignment; indexing the NumPy field arrays one scalar at a time would
+        cost more than the control law itself.
+        """
+        (
+            kp, ki, kd, setpoint, integral, last_error, last_input, prev_input, last_output,
+            last_time, _p_term, _d_term, sample_dt, velocity, out_min, out_max, *_,
+        ) = self._state[slot].tolist()
+
+        if sample_dt > 0:
+            dt = sample_dt
+        elif dt is None:
+            dt = now - last_time
+        if not dt > 0:
+            dt = _MIN_DT
+
+        if math.isnan(last_input):
+            last_input = indoor
+        if math.isnan(prev_input):
+            prev_input = last_input
+
+        error = setpoint - indoor
+        d_input = indoor - last_input
+        proportional = kp * error
+        derivative = -kd * d_input / dt
+
+        if velocity > 0:
+            if math.isnan(last_output):
+                last_output = 0.0
+            increment = (
+                kp * (error - last_error)
+                + ki * error * dt
+                - kd * (d_input - (last_input - prev_input)) / dt
+            )
+            delta_t = _clamp(last_output + increment, out_min, out_max)
+            integral = _clamp(delta_t - proportional - derivative, out_min, out_max)
+        else:
+            integral = _clamp(integral + ki * error * dt, out_min, out_max)
+            unsaturated = proportional + integral + derivative
+            delta_t = _clamp(unsaturated, out_min, out_max)
+            tracking = ki / kp if kp != 0 else 0.0
+            integral = _clamp(
+                integral + _clamp(tracking * dt, 0.0, 1.0) * (delta_t - unsaturated), out_min, out_max
+            )
+
+        t_comp = outdoor + feedforward + delta_t * weather_factor
+        # If it is freezing outside, the simulated value must not be positive.
+        freezing_clamp = outdoor < 0 < t_comp
+        if freezing_clamp:
+            t_comp = 0.0
+
+        self._state[slot] = (
+            kp, ki, kd, setpoint, integral, error, indoor, last_input, delta_t,
+            now, proportional, derivative, sample_dt, velocity, out_min, out_max,
+            delta_t, t_comp, float(freezing_clamp),
+        )
+        return delta_t, t_comp
+
+    def request_step(self, slot, indoor, outdoor, weather_factor, on_result, feedforward=0.0):
+        """Queue a step for `slot`; all queued slots run together on the next loop iteration.
+
+        `on_result(delta_T, T_comp)` is called with the slot's result once the
+        batch has been evaluated. A newer request for the same slot replaces
+        an older one that has not run yet.
+        """
+        self._pending[slot] = (indoor, outdoor, weather_factor, feedforward, on_result)
+        if self._flush_handle is None:
+            self._flush_handle = self._loop.call_soon(self.flush)
+
+    def flush(self):
+        """Evaluate every pending slot in one batched step; may also be called directly.
+
+        `step_ns` holds each zone's share of the step's duration while the
+        results are handed out.
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        self._flush_handle = None
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, {}
+        start = time.perf_counter_ns()
+        if len(pending) == 1:
+            ((slot, (indoor, outdoor, weather_factor, feedforward, on_result)),) = pending.items()
+            result = self._step_one(
+                slot, float(indoor), float(outdoor), float(weather_factor), time.monotonic(), None,
+                float(feedforward),
+            )
+            self.step_ns = time.perf_counter_ns() - start
+            on_result(*result)
+            return
+
+        slots = list(pending)
+        inputs = np.array([pending[slot][:4] for slot in slots], dtype=np.float64)
+        delta_t, t_comp = self.step(
+            slots, inputs[:, 0], inputs[:, 1], inputs[:, 2], feedforward=inputs[:, 3]
+        )
+        self.step_ns = (time.perf_counter_ns() - start) // len(slots)
+
+        for index, slot in enumerate(slots):
+            pending[slot][4](float(delta_t[index]), float(t_comp[index]))
@@ -0,0 +1,54 @@
+"""Outdoor temperature forecast table for the feedforward term.
+
+An hourly forecast is fetched occasionally and turned into two sorted
+arrays (timestamp, temperature). The update loop only interpolates in that
+table, which is a bisect plus one linear interpolation.
+"""
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterable
+from datetime import datetime
+
+
+class ForecastTable:
+    """Piecewise linear outdoor temperature over time."""
+
+    __slots__ = ("fetched", "_times", "_temperatures")
+
+    def __init__(self, points: Iterable[tuple[float, float]], fetched: float):
+        """`points` are (timestamp, temperature) pairs; `fetched` is when the forecast was fetched."""
+        self.fetched = fetched
+        self._times = array("d")
+        self._temperatures = array("d")
+        for timestamp, temperature in sorted(points):
+            self._times.append(timestamp)
+            self._temperatures.append(temperature)
+
+    @classmethod
+    def from_forecast(cls, forecast: list[dict], fetched: float) -> "ForecastTable":
+        """Build the table from a weather entity's forecast list, skipping incomplete items."""
+        points = []
+        for item in forecast:
+            try:
+                timestamp = datetime.fromisoformat(item["datetime"]).timestamp()
+                temperature = float(item["temperature"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            points.append((timestamp, temperature))
+        return cls(points, fetched)
+
+    def __len__(self):
+        return len(self._times)
+
+    def at(self, timestamp) -> float | None:
+        """Forecast temperature at `timestamp`; None outside the forecast range."""
+        times = self._times
+        if not times or timestamp < times[0] or timestamp > times[-1]:
+            return None
+
+        index = bisect_right(times, timestamp)
+        if index == len(times):
+            return self._temperatures[-1]
+        start, end = times[index - 1], times[index]
+        fraction = (timestamp - start) / (end - start)
+        return self._temperatures[index - 1] + fraction * (self._temperatures[index] - self._temperatures[index - 1])
@@ -0,0 +1,95 @@
+"""Domain-wide sensor state fan-out.
+
+Every sensor a controller depends on is tracked once for the whole domain,
+however many zones use it. A state change is parsed to a float once and the
+reading is handed to every subscribed controller, and the latest reading of
+each sensor is cached for controllers that sample instead of reacting.
+"""
+import math
+from collections.abc import Callable, Iterable
+
+from homeassistant.core import Event, HomeAssistant, State, callback
+from homeassistant.helpers.event import async_track_state_change_event
+
+# (value, last reported timestamp); value is None when the state isn't a finite number.
+Reading = tuple[float | None, float]
+ReadingCallback = Callable[[str, Reading | None], None]
+
+
+def parse_state(state: State | None) -> Reading | None:
+    """Parse a sensor state once; None if the entity has no state at all."""
+    if state is None:
+        return None
+    try:
+        value = float(state.state)
+    except ValueError:
+        value = None
+    else:
+        # "nan" and "inf" parse as floats, but would poison the PID integrator.
+        if not math.isfinite(value):
+            value = None
+    return value, state.last_reported_timestamp
+
+
+class SensorHub:
+    """Tracks each sensor once and fans parsed readings out to the controllers using it."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+        # entity_id -> callbacks of the controllers depending on it.
+        self._subscribers: dict[str, list[ReadingCallback]] = {}
+        self._remove_trackers: dict[str, Callable[[], None]] = {}
+        self._readings: dict[str, Reading | None] = {}
+
+    @callback
+    def async_subscribe(self, entity_ids: Iterable[str], on_reading: ReadingCallback) -> Callable[[], None]:
+        """Call `on_reading(entity_id, reading)` on every change of `entity_ids`; returns a remove callback."""
+        entity_ids = list(dict.fromkeys(entity_ids))
+        for entity_id in entity_ids:
+            subscribers = self._subscribers.setdefault(entity_id, [])
+            if not subscribers:
+                self._readings[entity_id] = parse_state(self._hass.states.get(entity_id))
+                self._remove_trackers[entity_id] = async_track_state_change_event(
+                    self._hass, [entity_id], self._async_state_changed
+                )
+            subscribers.append(on_reading)
+
+        @callback
+        def _remove() -> None:
+            for entity_id in entity_ids:
+                subscribers = self._subscribers[entity_id]
+                subscribers.remove(on_reading)
+                if not subscribers:
+                    del self._subscribers[entity_id]
+                    del self._readings[entity_id]
+                    self._remove_trackers.pop(entity_id)()
+
+        return _remove
+
+    @callback
+    def _async_state_changed(self, event: Event) -> None:
+        self.async_update(event.data["entity_id"], event.data["new_state"])
+
+    @callback
+    def async_update(self, entity_id: str, state: State | None) -> Reading | None:
+        """Parse a new state once, cache it and hand it to every subscriber."""
+        reading = self._readings[entity_id] = parse_state(state)
+        for on_reading in list(self._subscribers.get(entity_id, ())):
+            on_reading(entity_id, reading)
+        return reading
+
+    def reading(self, entity_id: str) -> Reading | None:
+        """Latest cached reading of a tracked sensor."""
+        return self._readings.get(entity_id)
+
+    def value(self, entity_id: str) -> float | None:
+        """Latest cached value of a tracked sensor, None while it isn't a number."""
+        reading = self._readings.get(entity_id)
+        return None if reading is None else reading[0]
+
+    def refresh(self, entity_id: str) -> Reading | None:
+        """Re-read a sensor from the state machine, e.g. to see a newer last_reported."""
+        reading = parse_state(self._hass.states.get(entity_id))
+        if entity_id in self._readings:
+            self._readings[entity_id] = reading
+        return reading
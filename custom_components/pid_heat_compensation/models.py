@@ -0,0 +1,169 @@
+import time
+from array import array
+from bisect import bisect_left
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import callback
+
+if TYPE_CHECKING:
+    from .climate import PIDClimateController
+    from .output import OutputPublisher
+
+PARAMETER_KEYS = ("kp", "ki", "kd", "weather_factor")
+TRIGGER_SOURCES = ("sensor", "gain", "setpoint", "mode", "sample")
+
+
+class UpdateStats:
+    """Cheap per-entry counters and duration histograms of the two update stages.
+
+    "queue" is the update loop: reading the sensors and queuing the PID step
+    (or publishing directly while OFF or autotuning). "step" is this entry's
+    share of the engine step plus applying its result, publishing T_comp and
+    writing the state.
+    """
+
+    # Upper bucket bounds in microseconds; the last bucket catches everything slower.
+    BUCKETS_US = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+    STAGES = ("queue", "step")
+
+    __slots__ = (
+        "triggers", "runs", "skipped_waiting", "state_writes", "histograms", "total_ns", "max_ns", "startup_s"
+    )
+
+    def __init__(self) -> None:
+        self.triggers = dict.fromkeys(TRIGGER_SOURCES, 0)
+        self.runs = dict.fromkeys(self.STAGES, 0)
+        self.skipped_waiting = 0
+        self.state_writes = 0
+        self.histograms = {stage: [0] * (len(self.BUCKETS_US) + 1) for stage in self.STAGES}
+        self.total_ns = dict.fromkeys(self.STAGES, 0)
+        self.max_ns = dict.fromkeys(self.STAGES, 0)
+        # Seconds from entry setup to the first valid T_comp.
+        self.startup_s = None
+
+    def record(self, stage: str, duration_ns: int) -> None:
+        """Account one run of an update stage ("queue" or "step")."""
+        self.runs[stage] += 1
+        self.total_ns[stage] += duration_ns
+        if duration_ns > self.max_ns[stage]:
+            self.max_ns[stage] = duration_ns
+        self.histograms[stage][bisect_left(self.BUCKETS_US, duration_ns / 1000)] += 1
+
+    def mean_us(self, stage: str) -> float | None:
+        """Mean duration of a stage in microseconds."""
+        runs = self.runs[stage]
+        return self.total_ns[stage] / runs / 1000 if runs else None
+
+    def stage_dict(self, stage: str) -> dict:
+        """Runs, mean, maximum and histogram of one stage."""
+        buckets = [f"<={bound}us" for bound in self.BUCKETS_US] + [f">{self.BUCKETS_US[-1]}us"]
+        return {
+            "runs": self.runs[stage],
+            "mean_us": self.mean_us(stage),
+            "max_us": self.max_ns[stage] / 1000,
+            "histogram": dict(zip(buckets, self.histograms[stage])),
+        }
+
+    def as_dict(self) -> dict:
+        """Snapshot for diagnostics and the dump_stats service."""
+        return {
+            "triggers": dict(self.triggers),
+            "skipped_waiting": self.skipped_waiting,
+            "state_writes": self.state_writes,
+            **{f"{stage}_duration": self.stage_dict(stage) for stage in self.STAGES},
+            "startup_s": self.startup_s,
+        }
+
+
+class StepHistory:
+    """Fixed-size ring buffer of the latest PID steps, packed in one float array."""
+
+    FIELDS = (
+        "timestamp", "indoor", "outdoor", "setpoint", "p_term", "i_term", "d_term",
+        "weather_factor", "feedforward", "t_comp", "freezing_clamp",
+    )
+
+    __slots__ = ("_size", "_values", "_count")
+
+    def __init__(self, size: int = 512) -> None:
+        self._size = size
+        self._values = array("d", bytes(8 * size * len(self.FIELDS)))
+        self._count = 0
+
+    def __len__(self) -> int:
+        return min(self._count, self._size)
+
+    def record(self, *values: float) -> None:
+        """Store one step; `values` are in FIELDS order."""
+        start = (self._count % self._size) * len(self.FIELDS)
+        self._values[start:start + len(self.FIELDS)] = array("d", values)
+        self._count += 1
+
+    def as_list(self) -> list[dict]:
+        """The recorded steps, oldest first, for diagnostics."""
+        width = len(self.FIELDS)
+        first = self._count - len(self)
+        steps = []
+        for index in range(first, self._count):
+            start = (index % self._size) * width
+            step = dict(zip(self.FIELDS, self._values[start:start + width]))
+            step["freezing_clamp"] = bool(step["freezing_clamp"])
+            steps.append(step)
+        return steps
+
+
+@dataclass
+class PIDParameters:
+    """Typed PID parameters of one entry, written by its number entities."""
+
+    kp: float | None = None
+    ki: float | None = None
+    kd: float | None = None
+    weather_factor: float | None = None
+    _listeners: list[Callable[[str, float], None]] = field(default_factory=list, repr=False)
+
+    @callback
+    def async_set(self, key: str, value: float) -> None:
+        """Store a parameter and push it to listeners if it changed."""
+        if getattr(self, key) == value:
+            return
+        setattr(self, key, value)
+        for listener in list(self._listeners):
+            listener(key, value)
+
+    @callback
+    def async_add_listener(self, listener: Callable[[str, float], None]) -> Callable[[], None]:
+        """Call `listener(key, value)` on every change; returns a remove callback."""
+        self._listeners.append(listener)
+
+        @callback
+        def _remove() -> None:
+            self._listeners.remove(listener)
+
+        return _remove
+
+
+@dataclass
+class PIDEntryData:
+    """Runtime data shared by the platforms of one config entry."""
+
+    entry: ConfigEntry
+    parameters: PIDParameters = field(default_factory=PIDParameters)
+    stats: UpdateStats = field(default_factory=UpdateStats)
+    # Monotonic time the entry started setting up, for the startup measurement.
+    setup_time: float = field(default_factory=time.monotonic)
+    # Latest T_comp published by the climate controller.
+    compensated_temp: float | None = None
+    # Error and P/I/D contributions of the latest published PID step.
+    pid_terms: dict[str, float] = field(default_factory=dict)
+    # Gains currently taken from the outdoor gain schedule, None while it is not used.
+    scheduled_gains: dict[str, float] | None = None
+    # Recent PID steps, served by the config entry diagnostics.
+    history: StepHistory = field(default_factory=StepHistory)
+    # The climate controller while it is added to hass, for services acting on many zones.
+    controller: "PIDClimateController | None" = None
+    # Direct T_comp output of the entry, if one is configured.
+    output: "OutputPublisher | None" = None
@@ -1,32 +1,34 @@
 from homeassistant.components.number import NumberEntity, NumberMode
+from homeassistant.core import callback
 from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.restore_state import RestoreEntity
-from .const import DOMAIN
+from .const import DOMAIN, PARAMETER_RANGES
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Set up the PID parameter numbers."""
     # Vi skapar en lista med de parametrar vi vill kunna styra
     entities = [
-        PIDParameterNumber(config_entry, "Kp", -2.0, -10.0, 10.0),
-        PIDParameterNumber(config_entry, "Ki", 0.0, -5.0, 5.0),
-        PIDParameterNumber(config_entry, "Kd", 0.0, -5.0, 5.0),
-        PIDParameterNumber(config_entry, "Weather Factor", 1.0, -2.0, 2.0),
+        PIDParameterNumber(config_entry, "Kp", *PARAMETER_RANGES["kp"]),
+        PIDParameterNumber(config_entry, "Ki", *PARAMETER_RANGES["ki"]),
+        PIDParameterNumber(config_entry, "Kd", *PARAMETER_RANGES["kd"]),
+        PIDParameterNumber(config_entry, "Weather Factor", *PARAMETER_RANGES["weather_factor"]),
     ]
     async_add_entities(entities)
 
 class PIDParameterNumber(NumberEntity, RestoreEntity):
     """En entitet som ersätter input_number för PID-inställningar."""
 
-    def __init__(self, config_entry, name, initial_value, min_val, max_val):
+    def __init__(self, config_entry, name, initial_value, min_val, max_val, step):
         self._config_entry = config_entry
         self._config_entry_id = config_entry.entry_id
         self._attr_name = f"{config_entry.title} {name}"
-        self._attr_unique_id = f"{config_entry.entry_id}_{name.lower().replace(' ', '_')}"
+        self._parameter_key = name.lower().replace(' ', '_')
+        self._attr_unique_id = f"{config_entry.entry_id}_{self._parameter_key}"
         self._attr_native_value = initial_value
         self._attr_native_min_value = min_val
         self._attr_native_max_value = max_val
-        self._attr_native_step = 0.01
+        self._attr_native_step = step
         self._attr_mode = NumberMode.BOX  # Gör att man kan skriva in värdet exakt
 
         # Vi kategoriserar dessa som 'config' så de inte skräpar ner vanliga vyer
@@ -47,17 +49,35 @@ class PIDParameterNumber(NumberEntity, RestoreEntity):
         """Uppdatera värdet när användaren ändrar i UI."""
         self._attr_native_value = value
         self.async_write_ha_state()
-        # Här kan du också trigga en omräkning i din PID-controller direkt!
+        # Pusha värdet direkt till PID-controllern via den delade parameterlagringen.
+        self._publish_parameter()
 
     async def async_added_to_hass(self) -> None:
         """Återställ senast sparat värde efter omstart."""
         await super().async_added_to_hass()
 
         last_state = await self.async_get_last_state()
-        if not last_state or last_state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN, None):
-            return
+        if last_state and last_state.state not in (STATE_UNAVAILABLE, STATE_UNKNOWN, None):
+            try:
+                self._attr_native_value = float(last_state.state)
+            except (TypeError, ValueError):
+                pass
+
+        self._publish_parameter()
+
+        # Följ ändringar som görs av andra (t.ex. autotune) i parameterlagringen.
+        parameters = self.hass.data[DOMAIN][self._config_entry_id].parameters
+        self.async_on_remove(parameters.async_add_listener(self._async_parameter_updated))
 
-        try:
-            self._attr_native_value = float(last_state.state)
-        except (TypeError, ValueError):
+    @callback
+    def _async_parameter_updated(self, key: str, value: float) -> None:
+        """Visa ett nytt värde som skrivits direkt till parameterlagringen."""
+        if key != self._parameter_key or value == self._attr_native_value:
             return
+        self._attr_native_value = value
+        self.async_write_ha_state()
+
+    def _publish_parameter(self) -> None:
+        """Skriv aktuellt värde till den typade parameterlagringen för denna entry."""
+        parameters = self.hass.data[DOMAIN][self._config_entry_id].parameters
+        parameters.async_set(self._parameter_key, float(self._attr_native_value))
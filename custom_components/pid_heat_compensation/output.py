@@ -0,0 +1,275 @@
+"""Direct output of T_comp to the heat pump over MQTT or Modbus TCP.
+
+The climate controller hands every published T_comp to an `OutputPublisher`,
+which writes it to one target: only when it changed, at most once per
+`min_interval` (the latest value is written when the interval has passed),
+and never with two writes to the same target in flight. MQTT goes through
+Home Assistant's MQTT integration and its broker connection. Modbus TCP
+connections are pooled per host and port and shared by every entry writing
+to that device. The MQTT integration and pymodbus (installed as a manifest
+requirement) are only imported once an output of that type is used.
+"""
+import asyncio
+import inspect
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from functools import partial
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_call_later
+
+from .const import (
+    CONF_OUTPUT_MIN_INTERVAL,
+    CONF_OUTPUT_MODBUS_HOST,
+    CONF_OUTPUT_MODBUS_PORT,
+    CONF_OUTPUT_MODBUS_REGISTER,
+    CONF_OUTPUT_MODBUS_SCALE,
+    CONF_OUTPUT_MODBUS_UNIT,
+    CONF_OUTPUT_MQTT_TOPIC,
+    CONF_OUTPUT_TYPE,
+    DATA_MODBUS_POOL,
+    DEFAULT_OUTPUT_MIN_INTERVAL,
+    DEFAULT_OUTPUT_MODBUS_PORT,
+    DEFAULT_OUTPUT_MODBUS_SCALE,
+    DEFAULT_OUTPUT_MODBUS_UNIT,
+    DOMAIN,
+    OUTPUT_MODBUS,
+    OUTPUT_MQTT,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+Writer = Callable[[float], Awaitable[None]]
+
+# Seconds to wait before retrying a failed write, if min_interval is shorter.
+RETRY_INTERVAL = 30
+
+
+def output_settings(config) -> tuple | None:
+    """The output target and rate limit, comparable between option changes; None without output."""
+    output_type = config.get(CONF_OUTPUT_TYPE)
+    if output_type == OUTPUT_MQTT:
+        target = (config[CONF_OUTPUT_MQTT_TOPIC],)
+    elif output_type == OUTPUT_MODBUS:
+        target = (
+            config[CONF_OUTPUT_MODBUS_HOST],
+            int(config.get(CONF_OUTPUT_MODBUS_PORT, DEFAULT_OUTPUT_MODBUS_PORT)),
+            int(config.get(CONF_OUTPUT_MODBUS_UNIT, DEFAULT_OUTPUT_MODBUS_UNIT)),
+            int(config[CONF_OUTPUT_MODBUS_REGISTER]),
+            config.get(CONF_OUTPUT_MODBUS_SCALE, DEFAULT_OUTPUT_MODBUS_SCALE),
+        )
+    else:
+        return None
+    return output_type, target, config.get(CONF_OUTPUT_MIN_INTERVAL, DEFAULT_OUTPUT_MIN_INTERVAL)
+
+
+@callback
+def async_create_output(hass: HomeAssistant, settings: tuple, name: str) -> "OutputPublisher":
+    """Create the publisher for `output_settings(...)`."""
+    output_type, target, min_interval = settings
+    if output_type == OUTPUT_MQTT:
+        (topic,) = target
+        # Only entries writing to MQTT need the MQTT integration loaded.
+        from homeassistant.components import mqtt
+
+        async def write(value: float) -> None:
+            await mqtt.async_publish(hass, topic, f"{value:.1f}", qos=1, retain=True)
+
+        description = f"mqtt:{topic}"
+        release = None
+    else:
+        host, port, unit, register, scale = target
+        pool = hass.data[DOMAIN].get(DATA_MODBUS_POOL)
+        if pool is None:
+            pool = hass.data[DOMAIN][DATA_MODBUS_POOL] = ModbusPool(hass)
+        connection = pool.acquire(host, port)
+
+        async def write(value: float) -> None:
+            await connection.async_write_register(unit, register, value * scale)
+
+        description = f"modbus://{host}:{port}/{unit}/{register}"
+        release = partial(pool.release, connection)
+    return OutputPublisher(hass, write, min_interval, f"{name} -> {description}", release)
+
+
+class OutputPublisher:
+    """Rate-limited, write-on-change delivery of T_comp to one target."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        write: Writer,
+        min_interval: float,
+        name: str,
+        release: Callable[[], None] | None = None,
+    ) -> None:
+        self._hass = hass
+        self._write = write
+        self._min_interval = min_interval
+        self._name = name
+        self._release = release
+        self._pending: float | None = None
+        self._written: float | None = None
+        self._last_write: float | None = None
+        self._writing = False
+        self._failing = False
+        self._closed = False
+        self._remove_timer = None
+        self.writes = 0
+        self.errors = 0
+
+    @callback
+    def async_publish(self, value: float) -> None:
+        """Write `value` as soon as the rate limit allows, replacing a value still waiting."""
+        self._pending = value
+        self._async_write_pending()
+
+    @callback
+    def _async_write_pending(self, _now=None) -> None:
+        if _now is not None:
+            self._remove_timer = None
+        if self._closed or self._writing or self._remove_timer is not None or self._pending is None:
+            return
+        if self._pending == self._written:
+            self._pending = None
+            return
+
+        if self._last_write is not None:
+            interval = max(self._min_interval, RETRY_INTERVAL) if self._failing else self._min_interval
+            wait = self._last_write + interval - time.monotonic()
+            if wait > 0:
+                self._remove_timer = async_call_later(self._hass, wait, self._async_write_pending)
+                return
+
+        value, self._pending = self._pending, None
+        self._writing = True
+        self._hass.async_create_background_task(self._async_write(value), f"{DOMAIN} output {self._name}")
+
+    async def _async_write(self, value: float) -> None:
+        try:
+            await self._write(value)
+        except (HomeAssistantError, OSError, asyncio.TimeoutError) as err:
+            if not self._failing:
+                _LOGGER.warning("Could not write T_comp %.1f to %s: %s", value, self._name, err)
+            self._failing = True
+            self.errors += 1
+            # Retry with the newest value after the retry interval.
+            if self._pending is None:
+                self._pending = value
+        else:
+            if self._failing:
+                _LOGGER.info("Writing T_comp to %s works again", self._name)
+            self._failing = False
+            self._written = value
+            self.writes += 1
+        finally:
+            self._last_write = time.monotonic()
+            self._writing = False
+        self._async_write_pending()
+
+    @callback
+    def async_close(self) -> None:
+        """Stop writing and give the pooled connection back."""
+        self._closed = True
+        if self._remove_timer is not None:
+            self._remove_timer()
+            self._remove_timer = None
+        self._pending = None
+        if self._release is not None:
+            self._release()
+            self._release = None
+
+    def as_dict(self) -> dict:
+        """Counters for diagnostics."""
+        return {
+            "target": self._name,
+            "written": self._written,
+            "writes": self.writes,
+            "errors": self.errors,
+            "failing": self._failing,
+            "waiting": self._pending,
+        }
+
+
+class ModbusPool:
+    """Persistent Modbus TCP connections, one per host and port, shared by all entries."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+        self._connections: dict[tuple[str, int], ModbusConnection] = {}
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, self._async_stop)
+
+    @callback
+    def acquire(self, host: str, port: int) -> "ModbusConnection":
+        """The shared connection to host:port; hand it back with `release(connection)`."""
+        connection = self._connections.get((host, port))
+        if connection is None:
+            connection = self._connections[host, port] = ModbusConnection(host, port)
+        connection.users += 1
+        return connection
+
+    @callback
+    def release(self, connection: "ModbusConnection") -> None:
+        """Drop one user of `connection`; it is closed when nobody uses it anymore."""
+        connection.users -= 1
+        if connection.users == 0:
+            del self._connections[connection.host, connection.port]
+            self._hass.async_create_task(connection.async_close())
+
+    async def _async_stop(self, _event: Event) -> None:
+        for connection in list(self._connections.values()):
+            await connection.async_close()
+
+
+class ModbusConnection:
+    """One lazily connected pymodbus client; writes are serialized."""
+
+    def __init__(self, host: str, port: int) -> None:
+        self.host = host
+        self.port = port
+        self.users = 0
+        self._client = None
+        self._device_keyword = None
+        self._client_errors = ()
+        self._lock = asyncio.Lock()
+
+    async def async_write_register(self, unit: int, register: int, value: float) -> None:
+        """Write `value`, rounded to a signed 16-bit integer, to a holding register."""
+        raw = round(value)
+        if not -0x8000 <= raw <= 0x7FFF:
+            raise HomeAssistantError(f"{value} does not fit in a 16-bit register")
+
+        async with self._lock:
+            client = await self._async_connect()
+            try:
+                result = await client.write_register(
+                    register, raw & 0xFFFF, **{self._device_keyword: unit}
+                )
+            except self._client_errors as err:
+                raise HomeAssistantError(f"Modbus write to {self.host}:{self.port} failed: {err}") from err
+            if result.isError():
+                raise HomeAssistantError(f"Modbus write to {self.host}:{self.port} failed: {result}")
+
+    async def _async_connect(self):
+        if self._client is None:
+            try:
+                from pymodbus.client import AsyncModbusTcpClient
+                from pymodbus.exceptions import ModbusException
+            except ImportError as err:
+                raise HomeAssistantError("The Modbus output needs the pymodbus package") from err
+            self._client_errors = (ModbusException,)
+            self._client = AsyncModbusTcpClient(self.host, port=self.port)
+            # pymodbus 3.10 renamed the unit id keyword from slave to device_id.
+            parameters = inspect.signature(self._client.write_register).parameters
+            self._device_keyword = "device_id" if "device_id" in parameters else "slave"
+        if not self._client.connected and not await self._client.connect():
+            raise HomeAssistantError(f"Could not connect to Modbus device {self.host}:{self.port}")
+        return self._client
+
+    async def async_close(self) -> None:
+        if self._client is not None:
+            self._client.close()
+            self._client = None
@@ -0,0 +1,281 @@
+"""Offline replay of recorded sensor history through the controller math.
+
+Streams indoor/outdoor states from the recorder's SQLite database or a
+history CSV export and feeds them through the same PIDEngine step the
+climate entity uses (PID, weather factor and freezing clamp), including the
+min_update_interval coalescing. Many gain sets are evaluated side by side in
+one engine, and large sweeps are spread over a process pool.
+
+It only needs NumPy: run it as a script, which loads engine.py and
+const.py by path instead of importing the integration (and Home Assistant).
+
+Example:
+    python custom_components/pid_heat_compensation/replay.py \\
+        --db home-assistant_v2.db --indoor sensor.indoor --outdoor sensor.outdoor \\
+        --gains=-2,0,0,1 --gains=-3,-0.01,0,1 > t_comp.csv
+"""
+import argparse
+import csv
+import heapq
+import importlib.util
+import os
+import sqlite3
+import sys
+from array import array
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+
+def _load_sibling(name):
+    """Import a module next to this file by path, so neither the package nor Home Assistant is imported.
+
+    The module is registered in sys.modules, so process pool workers can unpickle its classes.
+    """
+    module_name = f"pid_heat_compensation_{name}"
+    if module_name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(module_name, Path(__file__).with_name(f"{name}.py"))
+        module = sys.modules[module_name] = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    return sys.modules[module_name]
+
+
+_const = _load_sibling("const")
+DEFAULT_MIN_UPDATE_INTERVAL = _const.DEFAULT_MIN_UPDATE_INTERVAL
+MAX_TEMP_DIFFERENCE = _const.MAX_TEMP_DIFFERENCE
+PIDEngine = _load_sibling("engine").PIDEngine
+
+# Recorded states are yielded as (timestamp, entity_id, value); value is None when unavailable.
+Sample = tuple[float, str, float | None]
+
+_RECORDER_QUERY = """
+    SELECT states.last_updated_ts, states_meta.entity_id, states.state
+    FROM states
+    JOIN states_meta ON states.metadata_id = states_meta.metadata_id
+    WHERE states_meta.entity_id IN ({placeholders})
+      AND states.last_updated_ts >= ? AND states.last_updated_ts < ?
+    ORDER BY states.last_updated_ts
+"""
+
+
+@dataclass(frozen=True)
+class GainSet:
+    """One candidate tuning to replay."""
+
+    kp: float
+    ki: float
+    kd: float
+    weather_factor: float = 1.0
+
+
+@dataclass(frozen=True)
+class ReplaySource:
+    """Picklable description of where the history comes from."""
+
+    path: str
+    kind: str = "recorder"  # "recorder" or "csv"
+    start: float = float("-inf")
+    end: float = float("inf")
+
+    def iter_samples(self, entity_ids: Iterable[str]) -> Iterator[Sample]:
+        """Stream the samples of `entity_ids` in time order."""
+        if self.kind == "csv":
+            return iter_csv_states(self.path, entity_ids, self.start, self.end)
+        return iter_recorder_states(self.path, entity_ids, self.start, self.end)
+
+
+def _parse_value(state: str) -> float | None:
+    """Convert a recorded state to float like the sensor hub does."""
+    try:
+        return float(state)
+    except (TypeError, ValueError):
+        return None
+
+
+def iter_recorder_states(db_path, entity_ids, start=float("-inf"), end=float("inf")) -> Iterator[Sample]:
+    """Stream states from a recorder SQLite database without loading them all."""
+    entity_ids = list(entity_ids)
+    query = _RECORDER_QUERY.format(placeholders=", ".join("?" * len(entity_ids)))
+    connection = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        cursor = connection.execute(query, (*entity_ids, start, end))
+        while rows := cursor.fetchmany(10_000):
+            for timestamp, entity_id, state in rows:
+                yield timestamp, entity_id, _parse_value(state)
+    finally:
+        connection.close()
+
+
+def _iter_csv_entity(csv_path, entity_id, start, end) -> Iterator[Sample]:
+    """Stream one entity's rows from a history CSV (entity_id,state,last_changed)."""
+    with open(csv_path, newline="", encoding="utf-8") as csv_file:
+        for row in csv.DictReader(csv_file):
+            if row["entity_id"] != entity_id:
+                continue
+            timestamp = datetime.fromisoformat(row["last_changed"].replace("Z", "+00:00")).timestamp()
+            if start <= timestamp < end:
+                yield timestamp, entity_id, _parse_value(row["state"])
+
+
+def iter_csv_states(csv_path, entity_ids, start=float("-inf"), end=float("inf")) -> Iterator[Sample]:
+    """Stream states from a history CSV export in time order.
+
+    The History panel export groups rows per entity, so every entity is read
+    by its own pass over the file and the passes are merged lazily.
+    """
+    yield from heapq.merge(
+        *(_iter_csv_entity(csv_path, entity_id, start, end) for entity_id in entity_ids),
+        key=lambda sample: sample[0],
+    )
+
+
+def replay(
+    samples: Iterable[Sample],
+    indoor_entity: str,
+    outdoor_entity: str,
+    gain_sets: list[GainSet],
+    setpoint: float = 20.0,
+    min_update_interval: float = DEFAULT_MIN_UPDATE_INTERVAL,
+) -> Iterator[tuple[float, np.ndarray]]:
+    """Yield (timestamp, T_comp per gain set) for every PID evaluation.
+
+    Like the live controller, a sensor change runs the loop at once unless it
+    falls inside the min_update_interval window, in which case one trailing
+    run happens when the window closes.
+    """
+    engine = PIDEngine(capacity=len(gain_sets))
+    slots = np.array([engine.allocate((-MAX_TEMP_DIFFERENCE, MAX_TEMP_DIFFERENCE)) for _ in gain_sets])
+    for slot, gain_set in zip(slots, gain_sets):
+        engine.set_gains(slot, gain_set.kp, gain_set.ki, gain_set.kd)
+        engine.set_setpoint(slot, setpoint)
+    weather_factor = np.array([gain_set.weather_factor for gain_set in gain_sets])
+
+    values = {indoor_entity: None, outdoor_entity: None}
+    window_end = None
+    trailing = False
+    started = False
+
+    def run(now):
+        nonlocal started
+        indoor, outdoor = values[indoor_entity], values[outdoor_entity]
+        if indoor is None or outdoor is None:
+            return None
+        if not started:
+            # The live slot is allocated just before its first step; start the clock here.
+            engine.last_time[slots] = now
+            started = True
+        return engine.step(slots, indoor, outdoor, weather_factor, now=now)[1]
+
+    for timestamp, entity_id, value in samples:
+        if window_end is not None and timestamp >= window_end:
+            if trailing:
+                t_comp = run(window_end)
+                if t_comp is not None:
+                    yield window_end, t_comp
+                window_end += min_update_interval
+                trailing = False
+            if timestamp >= window_end:
+                window_end = None
+
+        values[entity_id] = value
+
+        if window_end is None:
+            t_comp = run(timestamp)
+            if t_comp is not None:
+                yield timestamp, t_comp
+            window_end = timestamp + min_update_interval
+        else:
+            trailing = True
+
+    if trailing:
+        t_comp = run(window_end)
+        if t_comp is not None:
+            yield window_end, t_comp
+
+
+def _replay_chunk(source, indoor_entity, outdoor_entity, gain_sets, setpoint, min_update_interval):
+    """Process pool worker: replay one chunk of gain sets into compact arrays."""
+    timestamps = array("d")
+    t_comp = array("d")
+    for timestamp, values in replay(
+        source.iter_samples((indoor_entity, outdoor_entity)),
+        indoor_entity,
+        outdoor_entity,
+        gain_sets,
+        setpoint,
+        min_update_interval,
+    ):
+        timestamps.append(timestamp)
+        t_comp.extend(values)
+    return np.frombuffer(timestamps), np.frombuffer(t_comp).reshape(-1, len(gain_sets))
+
+
+def replay_parallel(
+    source: ReplaySource,
+    indoor_entity: str,
+    outdoor_entity: str,
+    gain_sets: list[GainSet],
+    setpoint: float = 20.0,
+    min_update_interval: float = DEFAULT_MIN_UPDATE_INTERVAL,
+    workers: int | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Replay many gain sets over a process pool.
+
+    Returns the evaluation timestamps and a (len(timestamps), len(gain_sets))
+    array of T_comp values.
+    """
+    workers = max(1, min(workers or os.cpu_count() or 1, len(gain_sets)))
+    chunk_size = -(-len(gain_sets) // workers)
+    chunks = [gain_sets[i:i + chunk_size] for i in range(0, len(gain_sets), chunk_size)]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                _replay_chunk, source, indoor_entity, outdoor_entity, chunk, setpoint, min_update_interval
+            )
+            for chunk in chunks
+        ]
+        results = [future.result() for future in futures]
+
+    # Every chunk sees the same samples, so the timestamps are identical.
+    return results[0][0], np.hstack([result[1] for result in results])
+
+
+def _parse_gain_set(text: str) -> GainSet:
+    return GainSet(*(float(part) for part in text.split(",")))
+
+
+def main(argv=None) -> None:
+    """Command line entry point: writes timestamp plus one T_comp column per gain set as CSV."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    source_group = parser.add_mutually_exclusive_group(required=True)
+    source_group.add_argument("--db", help="Recorder SQLite database (home-assistant_v2.db)")
+    source_group.add_argument("--csv", help="History CSV export (entity_id,state,last_changed)")
+    parser.add_argument("--indoor", required=True, help="Indoor temperature entity_id")
+    parser.add_argument("--outdoor", required=True, help="Outdoor temperature entity_id")
+    parser.add_argument(
+        "--gains", action="append", required=True, type=_parse_gain_set,
+        help="kp,ki,kd[,weather_factor]; repeat for every gain set",
+    )
+    parser.add_argument("--setpoint", type=float, default=20.0)
+    parser.add_argument("--min-update-interval", type=float, default=DEFAULT_MIN_UPDATE_INTERVAL)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    source = ReplaySource(args.db or args.csv, "recorder" if args.db else "csv")
+    timestamps, t_comp = replay_parallel(
+        source, args.indoor, args.outdoor, args.gains, args.setpoint, args.min_update_interval, args.workers
+    )
+
+    writer = csv.writer(sys.stdout)
+    writer.writerow(["timestamp", *(f"{g.kp},{g.ki},{g.kd},{g.weather_factor}" for g in args.gains)])
+    for timestamp, row in zip(timestamps, t_comp):
+        writer.writerow([f"{timestamp:.3f}", *(f"{value:.2f}" for value in row)])
+
+
+if __name__ == "__main__":
+    main()
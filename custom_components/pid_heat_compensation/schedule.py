@@ -0,0 +1,69 @@
+"""Gain scheduling on the real outdoor temperature.
+
+The breakpoint table from the options flow is turned into sorted arrays
+once, when the options are applied. Each update only looks the outdoor
+temperature up in those arrays: one bisect and a linear interpolation
+between the two neighbouring breakpoints. Below the first and above the
+last breakpoint the end gains are held.
+"""
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterable
+
+GAIN_KEYS = ("kp", "ki", "kd")
+
+
+class GainSchedule:
+    """Piecewise linear Kp, Ki and Kd over the outdoor temperature."""
+
+    __slots__ = ("_outdoor", "_gains")
+
+    def __init__(self, breakpoints: Iterable[tuple[float, float, float, float]] = ()):
+        """`breakpoints` are (outdoor, kp, ki, kd) tuples; outdoor temperatures must be distinct."""
+        self._outdoor = array("d")
+        self._gains = tuple(array("d") for _ in GAIN_KEYS)
+        for outdoor, *gains in sorted(breakpoints):
+            if self._outdoor and outdoor == self._outdoor[-1]:
+                raise ValueError(f"Duplicate gain schedule breakpoint at {outdoor} °C")
+            self._outdoor.append(outdoor)
+            for column, gain in zip(self._gains, gains):
+                column.append(gain)
+
+    @classmethod
+    def from_config(cls, items: list[dict] | None) -> "GainSchedule":
+        """Build the schedule from the options flow list of {outdoor, kp, ki, kd} mappings.
+
+        Raises ValueError if an item is not a mapping with numbers for all four keys.
+        """
+        breakpoints = []
+        for item in items or ():
+            try:
+                breakpoints.append(tuple(float(item[key]) for key in ("outdoor", *GAIN_KEYS)))
+            except (KeyError, TypeError, ValueError) as err:
+                raise ValueError(f"Invalid gain schedule breakpoint {item!r}") from err
+        return cls(breakpoints)
+
+    def __len__(self):
+        return len(self._outdoor)
+
+    def at(self, outdoor: float) -> tuple[float, float, float]:
+        """(kp, ki, kd) at an outdoor temperature; the schedule must not be empty."""
+        temperatures = self._outdoor
+        index = bisect_right(temperatures, outdoor)
+        if index == 0:
+            return tuple(column[0] for column in self._gains)
+        if index == len(temperatures):
+            return tuple(column[-1] for column in self._gains)
+
+        start, end = temperatures[index - 1], temperatures[index]
+        fraction = (outdoor - start) / (end - start)
+        return tuple(
+            column[index - 1] + fraction * (column[index] - column[index - 1]) for column in self._gains
+        )
+
+    def as_list(self) -> list[dict]:
+        """The breakpoints, coldest first, for diagnostics."""
+        return [
+            {"outdoor": outdoor, **dict(zip(GAIN_KEYS, gains))}
+            for outdoor, *gains in zip(self._outdoor, *self._gains)
+        ]
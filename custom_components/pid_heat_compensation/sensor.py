@@ -1,12 +1,20 @@
 import logging
 from homeassistant.helpers import entity_registry as er
-from homeassistant.components.sensor import SensorEntity
-from homeassistant.const import UnitOfTemperature, STATE_UNAVAILABLE, STATE_UNKNOWN
-from homeassistant.helpers.event import async_track_state_change_event, async_call_later
+from homeassistant.components.sensor import SensorEntity, SensorStateClass
+from homeassistant.const import UnitOfTemperature, UnitOfTime
+from homeassistant.helpers.entity import EntityCategory
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 
-from .const import DOMAIN, ATTR_COMPENSATED_TEMP
+from .const import DOMAIN, SIGNAL_COMPENSATED_TEMP_UPDATED, SIGNAL_PID_TERMS_UPDATED
+
+PID_TERM_SENSORS = {
+    "error": "PID Error",
+    "p_term": "PID P Term",
+    "i_term": "PID I Term",
+    "d_term": "PID D Term",
+}
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -15,20 +23,65 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry, asyn
 
     # Attempt to use the friendly name from the Config Entry
     climate_name = config_entry.title if config_entry.title else "PID Heat Compensation"
-    climate_unique_id = f"{config_entry.entry_id}_pid_climate"
-    entity_registry = er.async_get(hass)
-    climate_entity_id = entity_registry.async_get_entity_id("climate", DOMAIN, climate_unique_id)
+    _async_migrate_unique_id(hass, config_entry)
+
+    async_add_entities([PIDCompensatedTempSensor(hass, config_entry, climate_name)], True)
+
+    # Error and per-term contributions, recorded as measurements for long-term statistics.
+    async_add_entities(
+        [PIDTermSensor(config_entry, key, name) for key, name in PID_TERM_SENSORS.items()]
+    )
 
+    # Diagnostic sensors for the controller's own runtime cost (disabled by default).
+    stats = hass.data[DOMAIN][config_entry.entry_id].stats
     async_add_entities(
         [
-            PIDCompensatedTempSensor(
-                hass, config_entry, climate_unique_id, climate_name, climate_entity_id
-            )
-        ],
-        True,
+            PIDStatsSensor(
+                config_entry, "queue_duration", "Queue Duration", lambda: stats.mean_us("queue"),
+                UnitOfTime.MICROSECONDS, SensorStateClass.MEASUREMENT,
+                lambda: {"max_us": stats.max_ns["queue"] / 1000, **stats.stage_dict("queue")["histogram"]},
+            ),
+            PIDStatsSensor(
+                config_entry, "step_duration", "Step Duration", lambda: stats.mean_us("step"),
+                UnitOfTime.MICROSECONDS, SensorStateClass.MEASUREMENT,
+                lambda: {"max_us": stats.max_ns["step"] / 1000, **stats.stage_dict("step")["histogram"]},
+            ),
+            PIDStatsSensor(
+                config_entry, "update_triggers", "Update Triggers", lambda: sum(stats.triggers.values()),
+                None, SensorStateClass.TOTAL_INCREASING, lambda: dict(stats.triggers),
+            ),
+            PIDStatsSensor(
+                config_entry, "skipped_updates", "Skipped Updates", lambda: stats.skipped_waiting,
+                None, SensorStateClass.TOTAL_INCREASING,
+            ),
+            PIDStatsSensor(
+                config_entry, "state_writes", "State Writes", lambda: stats.state_writes,
+                None, SensorStateClass.TOTAL_INCREASING,
+            ),
+        ]
     )
     return True
 
+@callback
+def _async_migrate_unique_id(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    """Moves a compensated sensor keyed by the climate entity_id over to the config entry.
+
+    Older versions used the climate entity_id in the unique_id when the climate
+    entity happened to be registered first, so the unique_id depended on the
+    order the platforms were set up in.
+    """
+    entity_registry = er.async_get(hass)
+    climate_entity_id = entity_registry.async_get_entity_id(
+        "climate", DOMAIN, f"{config_entry.entry_id}_pid_climate"
+    )
+    if climate_entity_id is None:
+        return
+    old_entity_id = entity_registry.async_get_entity_id("sensor", DOMAIN, f"pid_comp_temp_{climate_entity_id}")
+    unique_id = f"pid_comp_temp_{config_entry.entry_id}"
+    if old_entity_id is not None and entity_registry.async_get_entity_id("sensor", DOMAIN, unique_id) is None:
+        entity_registry.async_update_entity(old_entity_id, new_unique_id=unique_id)
+
+
 class PIDCompensatedTempSensor(SensorEntity):
     """Represents the Compensated Outdoor Temperature as a sensor."""
 
@@ -36,27 +89,18 @@ class PIDCompensatedTempSensor(SensorEntity):
     _attr_temperature_unit = UnitOfTemperature.CELSIUS
     _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
     _attr_icon = "mdi:thermometer-lines"
+    # Updated by the controller's publishing policy only, never by polling.
+    _attr_should_poll = False
 
     # Set the state class for long-term statistics (optional but recommended for temps)
     _attr_state_class = "measurement" 
 
-    def __init__(
-        self, hass, config_entry, climate_unique_id, climate_name, climate_entity_id=None
-    ):
+    def __init__(self, hass, config_entry, climate_name):
         """Initialize the sensor."""
         self.hass = hass
         self._config_entry = config_entry
-        self._climate_unique_id = climate_unique_id
-        self._climate_entity_id = climate_entity_id
         self._config_entry_id = config_entry.entry_id
-        self._remove_climate_listener = None
-        self._remove_retry_listener = None
-
-        # Keep backward-compatible unique_id when climate entity_id is available.
-        if climate_entity_id:
-            self._attr_unique_id = f"pid_comp_temp_{climate_entity_id}"
-        else:
-            self._attr_unique_id = f"pid_comp_temp_{self._config_entry_id}"
+        self._attr_unique_id = f"pid_comp_temp_{self._config_entry_id}"
 
         # Set a descriptive friendly name
         self._attr_name = f"{climate_name} Compensated Outdoor Temp"
@@ -79,73 +123,114 @@ class PIDCompensatedTempSensor(SensorEntity):
 
     async def async_added_to_hass(self):
         """Register callbacks when entity is added."""
-        await self._async_try_start_listening()
-
-    async def _async_try_start_listening(self) -> None:
-        """Try to find the climate entity and start listening."""
-        if self._remove_climate_listener is not None:
-            return
-
-        entity_registry = er.async_get(self.hass)
-        self._climate_entity_id = entity_registry.async_get_entity_id(
-            "climate", DOMAIN, self._climate_unique_id
+        # The climate controller publishes T_comp straight to this sensor; pick up
+        # the value it may already have published before we were added.
+        entry_data = self.hass.data[DOMAIN][self._config_entry_id]
+        self._attr_native_value = entry_data.compensated_temp
+
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_COMPENSATED_TEMP_UPDATED.format(self._config_entry_id),
+                self._async_compensated_temp_updated,
+            )
         )
 
-        if self._climate_entity_id is None:
-            self._schedule_retry()
-            return
-
-        # Listen for state changes (including attribute changes) on the Climate Entity
-        @callback
-        def async_climate_state_listener(event):
-            """Handles state changes from the Climate Entity."""
-            new_state = self._extract_new_state_from_event(event)
+    @callback
+    def _async_compensated_temp_updated(self, compensated_temp: float) -> None:
+        """Handles a new T_comp from the climate controller."""
+        self._attr_native_value = compensated_temp
+        self.async_write_ha_state()
 
-            if new_state is None or new_state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN):
-                return
 
-            # Get the value from the attribute exposed in climate.py
-            compensated_temp = new_state.attributes.get(ATTR_COMPENSATED_TEMP)
+class PIDTermSensor(SensorEntity):
+    """The PID error or one term's contribution to Delta T, pushed by the controller."""
 
-            if compensated_temp is not None and compensated_temp != 'N/A':
-                try:
-                    self._attr_native_value = float(compensated_temp)
-                    self.async_write_ha_state()
-                except (ValueError, TypeError):
-                    _LOGGER.warning(f"Failed to convert compensated temp attribute '{compensated_temp}' to float.")
+    _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 2
+    _attr_should_poll = False
+    _attr_icon = "mdi:chart-bell-curve-cumulative"
 
-        # Use the modern and correct method to track state changes
-        self._remove_climate_listener = async_track_state_change_event(
-            self.hass, [self._climate_entity_id], async_climate_state_listener
-        )
-        self.async_on_remove(self._remove_climate_listener)
+    def __init__(self, config_entry, key, name):
+        """Initialize the sensor."""
+        self._config_entry = config_entry
+        self._config_entry_id = config_entry.entry_id
+        self._key = key
+        self._attr_unique_id = f"{config_entry.entry_id}_{key}"
+        self._attr_name = f"{config_entry.title} {name}"
+        self._attr_native_value = None
+        # Shared per-entry data; set once the entity is added to hass.
+        self._entry_data = None
 
-        initial_event_data = {
-            'data': {
-                'entity_id': self._climate_entity_id,
-                'new_state': self.hass.states.get(self._climate_entity_id)
-            }
+    @property
+    def device_info(self):
+        """Kopplar entiteten till en gemensam enhet."""
+        return {
+            "identifiers": {(DOMAIN, self._config_entry_id)},
+            "name": self._config_entry.title,
+            "manufacturer": "tobiaso88",
+            "model": "PID Heat Compensation",
         }
 
-        # Perform an initial update on the event loop thread.
-        async_climate_state_listener(initial_event_data)
+    async def async_added_to_hass(self):
+        """Register callbacks when entity is added."""
+        self._entry_data = self.hass.data[DOMAIN][self._config_entry_id]
+        self._attr_native_value = self._entry_data.pid_terms.get(self._key)
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_PID_TERMS_UPDATED.format(self._config_entry_id),
+                self._async_pid_terms_updated,
+            )
+        )
 
-    def _schedule_retry(self) -> None:
-        """Schedule a retry when the climate entity is not yet available."""
-        if self._remove_retry_listener is not None:
+    @callback
+    def _async_pid_terms_updated(self) -> None:
+        """Write the new value if it changed since the last write."""
+        value = self._entry_data.pid_terms.get(self._key)
+        if value is None:
+            return
+        value = round(value, 4)
+        if value == self._attr_native_value:
             return
+        self._attr_native_value = value
+        self.async_write_ha_state()
+
+
+class PIDStatsSensor(SensorEntity):
+    """Diagnostic sensor exposing one of the controller's runtime counters."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_icon = "mdi:timer-cog-outline"
+
+    def __init__(self, config_entry, key, name, value_fn, unit, state_class, attributes_fn=None):
+        """Initialize the sensor."""
+        self._config_entry = config_entry
+        self._config_entry_id = config_entry.entry_id
+        self._value_fn = value_fn
+        self._attributes_fn = attributes_fn
+        self._attr_unique_id = f"{config_entry.entry_id}_{key}"
+        self._attr_name = f"{config_entry.title} {name}"
+        self._attr_native_unit_of_measurement = unit
+        self._attr_state_class = state_class
 
-        @callback
-        def _retry(_now):
-            self._remove_retry_listener = None
-            self.hass.add_job(self._async_try_start_listening())
+    @property
+    def native_value(self):
+        """Read the counter; the sensor is polled so the hot path never writes state for it."""
+        return self._value_fn()
 
-        self._remove_retry_listener = async_call_later(self.hass, 10, _retry)
-        self.async_on_remove(self._remove_retry_listener)
+    @property
+    def extra_state_attributes(self):
+        return self._attributes_fn() if self._attributes_fn else None
 
-    @staticmethod
-    def _extract_new_state_from_event(event):
-        """Handle HA event objects and dict-like initial payloads."""
-        if isinstance(event, dict):
-            return event.get("new_state") or event.get("data", {}).get("new_state")
-        return event.data.get("new_state")
+    @property
+    def device_info(self):
+        """Kopplar entiteten till en gemensam enhet."""
+        return {
+            "identifiers": {(DOMAIN, self._config_entry_id)},
+            "name": self._config_entry.title,
+            "manufacturer": "tobiaso88",
+            "model": "PID Heat Compensation",
+        }
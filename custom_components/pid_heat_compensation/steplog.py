@@ -0,0 +1,133 @@
+"""Streaming log of PID steps to a rotating line-delimited JSON file.
+
+One writer serves every entry. Steps are appended to an in-memory queue on
+the event loop and written in batches by an executor job, so the loop never
+waits for the disk. The queue is bounded: while it is full, new steps are
+dropped and counted. The file is rotated when it exceeds a size or has been
+open for longer than the rotation interval.
+"""
+import json
+import logging
+import os
+import time
+from datetime import timedelta
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import DATA_STEP_LOG, DOMAIN
+from .models import StepHistory
+
+_LOGGER = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = timedelta(seconds=10)
+MAX_QUEUE = 10_000  # steps; about 15 minutes of 10 zones stepping every 5 seconds
+MAX_BYTES = 10 * 1024 * 1024
+ROTATE_INTERVAL = timedelta(days=1)
+BACKUP_COUNT = 5
+
+
+@callback
+def async_get_step_log(hass: HomeAssistant) -> "StepLogWriter":
+    """Return the domain's step log writer, starting it on first use."""
+    writer = hass.data[DOMAIN].get(DATA_STEP_LOG)
+    if writer is None:
+        writer = hass.data[DOMAIN][DATA_STEP_LOG] = StepLogWriter(
+            hass, hass.config.path(DOMAIN, "steps.jsonl")
+        )
+        writer.async_start()
+    return writer
+
+
+class StepLogWriter:
+    """Batches PID steps of all entries into one rotating file."""
+
+    def __init__(self, hass: HomeAssistant, path: str) -> None:
+        self._hass = hass
+        self._path = path
+        self._queue: list[tuple[str, tuple[float, ...]]] = []
+        self._flushing = False
+        self._remove_timer = None
+        # Wall clock time the current file was started; set by the executor job.
+        self._opened: float | None = None
+        self.written = 0
+        self.dropped = 0
+
+    @callback
+    def async_start(self) -> None:
+        """Flush periodically and once more when Home Assistant stops."""
+        self._remove_timer = async_track_time_interval(self._hass, self.async_flush, FLUSH_INTERVAL)
+        self._hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, self._async_stop)
+
+    async def _async_stop(self, _event: Event) -> None:
+        if self._remove_timer is not None:
+            self._remove_timer()
+            self._remove_timer = None
+        await self.async_flush()
+
+    @callback
+    def append(self, entry_id: str, step: tuple[float, ...]) -> None:
+        """Queue one step (in StepHistory.FIELDS order); dropped while the queue is full."""
+        if len(self._queue) >= MAX_QUEUE:
+            if not self.dropped:
+                _LOGGER.warning("Step log queue full, dropping steps until %s catches up", self._path)
+            self.dropped += 1
+            return
+        self._queue.append((entry_id, step))
+
+    async def async_flush(self, _now=None) -> None:
+        """Hand the queued steps to the executor; one batch is written at a time."""
+        if self._flushing or not self._queue:
+            return
+        batch, self._queue = self._queue, []
+        self._flushing = True
+        try:
+            await self._hass.async_add_executor_job(self._write_batch, batch)
+        except OSError as err:
+            self.dropped += len(batch)
+            _LOGGER.error("Could not write the step log %s: %s", self._path, err)
+        else:
+            self.written += len(batch)
+        finally:
+            self._flushing = False
+
+    def _write_batch(self, batch: list[tuple[str, tuple[float, ...]]]) -> None:
+        """Serialize and append a batch, rotating first if needed. Runs in the executor."""
+        lines = "".join(
+            json.dumps({"entry_id": entry_id, **dict(zip(StepHistory.FIELDS, step))}) + "\n"
+            for entry_id, step in batch
+        )
+        os.makedirs(os.path.dirname(self._path), exist_ok=True)
+        self._maybe_rotate()
+        with open(self._path, "a", encoding="utf-8") as log_file:
+            log_file.write(lines)
+
+    def _maybe_rotate(self) -> None:
+        """Shift steps.jsonl -> steps.jsonl.1 -> ... when it is too big or too old."""
+        now = time.time()
+        try:
+            stat = os.stat(self._path)
+        except FileNotFoundError:
+            self._opened = now
+            return
+        if self._opened is None:
+            self._opened = stat.st_mtime
+        if stat.st_size < MAX_BYTES and now - self._opened < ROTATE_INTERVAL.total_seconds():
+            return
+
+        for index in range(BACKUP_COUNT - 1, 0, -1):
+            older = f"{self._path}.{index}"
+            if os.path.exists(older):
+                os.replace(older, f"{self._path}.{index + 1}")
+        os.replace(self._path, f"{self._path}.1")
+        self._opened = now
+
+    def as_dict(self) -> dict:
+        """Counters for diagnostics."""
+        return {
+            "path": self._path,
+            "queued": len(self._queue),
+            "written": self.written,
+            "dropped": self.dropped,
+        }
@@ -0,0 +1,240 @@
+"""Closed-loop tuning sweep against a simple thermal model of the house.
+
+Every candidate gain set controls a two-node RC house model (heat emitters
+lagging the heat pump, and the building itself) through the same PIDEngine
+step the climate entity uses, including the weather factor, the freezing
+clamp and the MAX_TEMP_DIFFERENCE limits. Each candidate is simulated over
+many synthetic winter weeks in accelerated time; all candidates and weeks
+of a worker run side by side in one engine, and candidates are spread over
+a process pool. Candidates are ranked by integrated absolute error,
+overshoot and settling time.
+
+Like replay.py it only needs NumPy and is run as a script.
+
+Example:
+    python custom_components/pid_heat_compensation/sweep.py \\
+        --kp=-1,-2,-3,-4 --ki=0,-0.0005,-0.001 --kd=0 --weather-factor=0.8,1 \\
+        --weeks 500 > ranking.csv
+"""
+import argparse
+import csv
+import importlib.util
+import itertools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+
+def _load_sibling(name):
+    """Import a module next to this file by path, so neither the package nor Home Assistant is imported.
+
+    The module is registered in sys.modules, so process pool workers can unpickle its classes.
+    """
+    module_name = f"pid_heat_compensation_{name}"
+    if module_name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(module_name, Path(__file__).with_name(f"{name}.py"))
+        module = sys.modules[module_name] = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    return sys.modules[module_name]
+
+
+MAX_TEMP_DIFFERENCE = _load_sibling("const").MAX_TEMP_DIFFERENCE
+PIDEngine = _load_sibling("engine").PIDEngine
+GainSet = _load_sibling("replay").GainSet
+
+WEEK = 7 * 24 * 3600
+METRICS = ("iae", "overshoot", "settling_h")
+
+
+@dataclass(frozen=True)
+class HouseModel:
+    """Two-node RC model of a heat pump heated house."""
+
+    tau_house: float = 40 * 3600  # seconds, building time constant
+    tau_emitter: float = 2 * 3600  # seconds, floor heating or radiators
+    curve_gain: float = 1.0  # indoor °C gained per °C the heat pump believes it is colder
+    design_indoor: float = 20.0  # indoor temperature the heating curve is made for
+    bias: float = -1.0  # °C the heating curve misses by (internal gains, curve mismatch)
+
+
+@dataclass(frozen=True)
+class SweepScenario:
+    """Synthetic winter weeks (a cold start, then weather disturbances) and an undisturbed step response."""
+
+    weeks: int = 100
+    seed: int = 0
+    sample_period: float = 300.0
+    setpoint: float = 21.0
+    start_indoor: float = 19.0
+    mean_outdoor: float = -3.0
+    diurnal_amplitude: float = 3.0
+    front_amplitude: float = 6.0  # standard deviation of the slow weather fronts (°C)
+    front_time: float = 2 * 24 * 3600  # correlation time of the fronts (seconds)
+    settling_band: float = 0.2  # °C
+    settling_window: float = 4 * 24 * 3600  # seconds of the undisturbed step response
+
+
+def outdoor_weeks(scenario: SweepScenario) -> np.ndarray:
+    """Outdoor temperature of every week at every sample, shape (steps, weeks)."""
+    steps = int(WEEK // scenario.sample_period)
+    rng = np.random.default_rng(scenario.seed)
+    t = np.arange(steps) * scenario.sample_period
+
+    # Ornstein-Uhlenbeck process for fronts, started from its stationary distribution.
+    decay = np.exp(-scenario.sample_period / scenario.front_time)
+    noise = rng.standard_normal((steps, scenario.weeks)) * scenario.front_amplitude * np.sqrt(1 - decay**2)
+    fronts = np.empty((steps, scenario.weeks))
+    fronts[0] = rng.standard_normal(scenario.weeks) * scenario.front_amplitude
+    for step in range(1, steps):
+        fronts[step] = decay * fronts[step - 1] + noise[step]
+
+    # Coldest around 05:00, warmest around 17:00.
+    diurnal = -scenario.diurnal_amplitude * np.cos(2 * np.pi * (t - 5 * 3600) / 86400)
+    return scenario.mean_outdoor + diurnal[:, None] + fronts
+
+
+def _closed_loop(gain_sets: list[GainSet], house: HouseModel, scenario: SweepScenario, outdoor: np.ndarray):
+    """Yield (step, indoor) after every sample; slot c * runs + r runs candidate c through outdoor[:, r]."""
+    runs = outdoor.shape[1]
+    candidates = len(gain_sets)
+    dt = scenario.sample_period
+
+    engine = PIDEngine(capacity=candidates * runs)
+    slots = np.array(
+        [engine.allocate((-MAX_TEMP_DIFFERENCE, MAX_TEMP_DIFFERENCE)) for _ in range(candidates * runs)]
+    )
+    for index, gain_set in enumerate(gain_sets):
+        for slot in slots[index * runs:(index + 1) * runs]:
+            engine.set_gains(slot, gain_set.kp, gain_set.ki, gain_set.kd)
+            engine.set_setpoint(slot, scenario.setpoint)
+    weather_factor = np.repeat([gain_set.weather_factor for gain_set in gain_sets], runs)
+
+    # Start in equilibrium at start_indoor with the heat pump on its plain heating curve.
+    indoor = np.full(candidates * runs, scenario.start_indoor)
+    heat = indoor - np.tile(outdoor[0], candidates) - house.bias
+
+    emitter_gain = 1 - np.exp(-dt / house.tau_emitter)
+    house_gain = 1 - np.exp(-dt / house.tau_house)
+    for step in range(outdoor.shape[0]):
+        T_out = np.tile(outdoor[step], candidates)
+        _, t_comp = engine.step(slots, indoor, T_out, weather_factor, now=step * dt, dt=dt)
+
+        heat += (house.curve_gain * (house.design_indoor - t_comp) - heat) * emitter_gain
+        indoor += (T_out + heat + house.bias - indoor) * house_gain
+        yield step, indoor
+
+
+def simulate(gain_sets: list[GainSet], house: HouseModel, scenario: SweepScenario) -> np.ndarray:
+    """Return a (len(gain_sets), len(METRICS)) array of metrics.
+
+    The integrated absolute error and the overshoot are averaged over the
+    weather weeks. The settling time comes from a separate step response at
+    a constant mean outdoor temperature, so weather fronts long after the
+    setpoint step don't count as not having settled.
+    """
+    candidates, weeks = len(gain_sets), scenario.weeks
+    dt = scenario.sample_period
+
+    iae = np.zeros(candidates * weeks)
+    overshoot = np.zeros(candidates * weeks)
+    for _, indoor in _closed_loop(gain_sets, house, scenario, outdoor_weeks(scenario)):
+        error = scenario.setpoint - indoor
+        iae += np.abs(error) * dt / 3600
+        np.maximum(overshoot, -error, out=overshoot)
+    weather = np.stack((iae, overshoot), axis=1).reshape(candidates, weeks, 2).mean(axis=1)
+
+    still_air = np.full((int(scenario.settling_window // dt), 1), scenario.mean_outdoor)
+    last_outside = np.zeros(candidates)
+    for step, indoor in _closed_loop(gain_sets, house, scenario, still_air):
+        outside = np.abs(scenario.setpoint - indoor) > scenario.settling_band
+        last_outside = np.where(outside, step + 1, last_outside)
+
+    return np.column_stack((weather, last_outside * dt / 3600))
+
+
+def sweep_parallel(
+    gain_sets: list[GainSet],
+    house: HouseModel = HouseModel(),
+    scenario: SweepScenario = SweepScenario(),
+    workers: int | None = None,
+) -> np.ndarray:
+    """Simulate many gain sets over a process pool; returns metrics like `simulate`."""
+    workers = max(1, min(workers or os.cpu_count() or 1, len(gain_sets)))
+    chunk_size = -(-len(gain_sets) // workers)
+    chunks = [gain_sets[i:i + chunk_size] for i in range(0, len(gain_sets), chunk_size)]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(simulate, chunk, house, scenario) for chunk in chunks]
+        return np.vstack([future.result() for future in futures])
+
+
+def grid(kp, ki, kd, weather_factor) -> list[GainSet]:
+    """Every combination of the given values."""
+    return [GainSet(*values) for values in itertools.product(kp, ki, kd, weather_factor)]
+
+
+def random_candidates(kp, ki, kd, weather_factor, count, seed=0) -> list[GainSet]:
+    """`count` candidates drawn uniformly between the smallest and largest given values."""
+    rng = np.random.default_rng(seed)
+    ranges = [(min(values), max(values)) for values in (kp, ki, kd, weather_factor)]
+    return [
+        GainSet(*(float(rng.uniform(low, high)) for low, high in ranges))
+        for _ in range(count)
+    ]
+
+
+def _parse_values(text: str) -> list[float]:
+    return [float(part) for part in text.split(",")]
+
+
+def main(argv=None) -> None:
+    """Command line entry point: writes the candidates as CSV, best first."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--kp", type=_parse_values, default=[-2.0])
+    parser.add_argument("--ki", type=_parse_values, default=[0.0])
+    parser.add_argument("--kd", type=_parse_values, default=[0.0])
+    parser.add_argument("--weather-factor", type=_parse_values, default=[1.0])
+    parser.add_argument(
+        "--random", type=int, default=0,
+        help="Draw this many random candidates within the value ranges instead of the full grid",
+    )
+    parser.add_argument("--weeks", type=int, default=SweepScenario.weeks)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sample-period", type=float, default=SweepScenario.sample_period)
+    parser.add_argument("--setpoint", type=float, default=SweepScenario.setpoint)
+    parser.add_argument("--tau-house", type=float, default=HouseModel.tau_house / 3600, help="Hours")
+    parser.add_argument("--tau-emitter", type=float, default=HouseModel.tau_emitter / 3600, help="Hours")
+    parser.add_argument("--bias", type=float, default=HouseModel.bias)
+    parser.add_argument("--sort", choices=METRICS, default="iae")
+    parser.add_argument("--top", type=int, default=None, help="Only write the best N candidates")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    values = (args.kp, args.ki, args.kd, args.weather_factor)
+    if args.random:
+        gain_sets = random_candidates(*values, args.random, args.seed)
+    else:
+        gain_sets = grid(*values)
+    house = HouseModel(tau_house=args.tau_house * 3600, tau_emitter=args.tau_emitter * 3600, bias=args.bias)
+    scenario = SweepScenario(
+        weeks=args.weeks, seed=args.seed, sample_period=args.sample_period, setpoint=args.setpoint
+    )
+
+    metrics = sweep_parallel(gain_sets, house, scenario, args.workers)
+    column = METRICS.index(args.sort)
+    # Ties (e.g. equal settling times) are broken by the integrated absolute error.
+    order = np.lexsort((metrics[:, 0], metrics[:, column]))[:args.top]
+
+    writer = csv.writer(sys.stdout)
+    writer.writerow(["kp", "ki", "kd", "weather_factor", *METRICS])
+    for index in order:
+        g = gain_sets[index]
+        writer.writerow([g.kp, g.ki, g.kd, g.weather_factor, *(f"{value:.3f}" for value in metrics[index])])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Benchmarks the PIDEngine control law against simple_pid.
+
+Measures the per-step cost of a single zone and of a batched step over many
+zones, and the output bump caused by a Kp change in the middle of a run on a
+simple first-order room model, for the positional and velocity forms of the
+engine and for simple_pid (if installed). Results are written as JSON.
+
+Only needs NumPy (and optionally simple_pid), not Home Assistant:
+    python tests/benchmark_pid_core.py --output bench_pid_core.json
+"""
+import argparse
+import importlib.util
+import json
+import platform
+import statistics
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Load engine.py on its own so the integration package (and Home Assistant) isn't imported.
+_spec = importlib.util.spec_from_file_location(
+    "pid_engine", ROOT / "custom_components/pid_heat_compensation/engine.py"
+)
+engine_module = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(engine_module)
+PIDEngine = engine_module.PIDEngine
+
+try:
+    from simple_pid import PID
+except ImportError:
+    PID = None
+
+LIMITS = (-10.0, 10.0)
+GAINS = (-2.0, -0.001, 0.0)
+SETPOINT = 21.0
+DT = 30.0
+
+
+def _summary(samples_ns):
+    samples_us = sorted(sample / 1000 for sample in samples_ns)
+    return {
+        "count": len(samples_us),
+        "mean_us": statistics.fmean(samples_us),
+        "p50_us": samples_us[len(samples_us) // 2],
+        "p95_us": samples_us[int(len(samples_us) * 0.95)],
+    }
+
+
+def _engine(zones=1, velocity=False):
+    engine = PIDEngine(capacity=zones)
+    slots = [engine.allocate(LIMITS) for _ in range(zones)]
+    for slot in slots:
+        engine.set_gains(slot, *GAINS)
+        engine.set_setpoint(slot, SETPOINT)
+        engine.set_form(slot, velocity)
+    return engine, slots
+
+
+def bench_step_cost(steps, zones):
+    """Per-step cost of one zone, and per-zone cost of one batched step over `zones`."""
+    results = {}
+    for name, velocity in (("positional", False), ("velocity", True)):
+        engine, slots = _engine(velocity=velocity)
+        samples = []
+        for i in range(steps):
+            start = time.perf_counter_ns()
+            engine.step(slots, 20.0 + (i % 20) / 10, -5.0, 1.0, dt=DT)
+            samples.append(time.perf_counter_ns() - start)
+        results[name] = _summary(samples)
+
+        engine, slots = _engine(zones, velocity)
+        samples = []
+        for i in range(steps // 10):
+            start = time.perf_counter_ns()
+            engine.step(slots, 20.0 + (i % 20) / 10, -5.0, 1.0, dt=DT)
+            samples.append((time.perf_counter_ns() - start) / zones)
+        results[f"{name}_batched_per_zone"] = _summary(samples)
+
+    if PID is not None:
+        pid = PID(*GAINS, setpoint=SETPOINT, sample_time=None, output_limits=LIMITS)
+        samples = []
+        for i in range(steps):
+            start = time.perf_counter_ns()
+            pid(20.0 + (i % 20) / 10, dt=DT)
+            samples.append(time.perf_counter_ns() - start)
+        results["simple_pid"] = _summary(samples)
+    return results
+
+
+# Time constant of the room model (seconds).
+ROOM_TAU = 3 * 3600
+
+
+def _room(indoor, delta_t):
+    """First-order room behind a heating curve that settles 1 °C below the setpoint.
+
+    Lowering T_comp by one degree raises the settled indoor temperature by one
+    degree, so the controller holds the setpoint with Delta T around -1, well
+    inside the output limits: a gain change is never hidden by saturation.
+    """
+    settled = SETPOINT - 1.0 - delta_t
+    return indoor + DT / ROOM_TAU * (settled - indoor)
+
+
+def bench_gain_change(steps, new_kp):
+    """Output jump at a Kp change after `steps` samples, and peak-to-peak over the next ten."""
+    controllers = {}
+    for name, velocity in (("positional", False), ("velocity", True)):
+        engine, slots = _engine(velocity=velocity)
+
+        def run(indoor, engine=engine, slots=slots):
+            return float(engine.step(slots, indoor, -5.0, 1.0, dt=DT)[0][0])
+
+        def retune(engine=engine, slots=slots):
+            engine.set_gain(slots[0], "kp", new_kp)
+
+        controllers[name] = run, retune
+
+    if PID is not None:
+        pid = PID(*GAINS, setpoint=SETPOINT, sample_time=None, output_limits=LIMITS)
+
+        def retune_simple_pid():
+            pid.tunings = (new_kp, GAINS[1], GAINS[2])
+
+        controllers["simple_pid"] = (lambda indoor: pid(indoor, dt=DT)), retune_simple_pid
+
+    results = {}
+    for name, (run, retune) in controllers.items():
+        indoor, output = 20.0, 0.0
+        for _ in range(steps):
+            output = run(indoor)
+            indoor = _room(indoor, output)
+        before = output
+        retune()
+        after = [run(indoor)]
+        for _ in range(9):
+            indoor = _room(indoor, after[-1])
+            after.append(run(indoor))
+        results[name] = {
+            "output_before": before,
+            "bump": abs(after[0] - before),
+            "peak_to_peak": max(after) - min(after),
+            "saturated": any(value in LIMITS for value in (before, *after)),
+        }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the PIDEngine control law against simple_pid.")
+    parser.add_argument("--steps", type=int, default=20000, help="Steps per cost benchmark")
+    parser.add_argument("--zones", type=int, default=100, help="Zones in the batched step")
+    parser.add_argument("--new-kp", type=float, default=-4.0, help="Kp after the gain change")
+    parser.add_argument("--output", default="bench_pid_core.json", help="Where to write the JSON results")
+    args = parser.parse_args(argv)
+
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "simple_pid": PID is not None,
+            "timestamp": time.time(),
+        },
+        "step_cost": bench_step_cost(args.steps, args.zones),
+        "gain_change": bench_gain_change(200, args.new_kp),
+    }
+    Path(args.output).write_text(json.dumps(results, indent=2))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
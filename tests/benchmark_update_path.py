@@ -0,0 +1,169 @@
+"""Benchmarks for the controller update path on a bare Home Assistant core.
+
+Measures per-event latency of the update loop (including the batched engine
+flush), the parameter push from the number entities, the compensated sensor
+callback, and how a tick over 1..500 config entries scales. The entities are
+set up by tests/harness.py and driven only through the sensor hub, the
+parameter store, the dispatcher signal and the controller's public methods.
+Results are written as JSON so they can be compared between releases.
+
+Requires Home Assistant and NumPy to be installed:
+    python tests/benchmark_update_path.py --output bench_results.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from harness import OUTDOOR, ROOT, Zone, async_create_hass
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+
+from custom_components.pid_heat_compensation.const import (
+    CONF_SAMPLE_PERIOD,
+    DATA_ENGINE,
+    DOMAIN,
+    SIGNAL_COMPENSATED_TEMP_UPDATED,
+)
+
+GAINS = {"kp": -2.0, "ki": -0.001, "kd": 0.0, "weather_factor": 1.0}
+# Zones sample at a fixed period far longer than any run, so sensor changes only feed
+# the indoor aggregate and every update is run by async_update_now(), like the
+# sampling timer and the set_zones service do. Nothing else runs the loop meanwhile.
+ZONE_OPTIONS = {CONF_SAMPLE_PERIOD: 3600}
+
+
+async def async_add_zones(hass, count):
+    """Adds `count` zones sharing the outdoor sensor, with their gains and first readings."""
+    zones = []
+    for index in range(count):
+        zone = Zone(hass, index, **ZONE_OPTIONS)
+        await zone.async_add(indoor=20.0, outdoor=-5.0, **GAINS)
+        zones.append(zone)
+    return zones
+
+
+def _summary(samples_ns):
+    samples_us = sorted(sample / 1000 for sample in samples_ns)
+    return {
+        "count": len(samples_us),
+        "mean_us": statistics.fmean(samples_us),
+        "p50_us": samples_us[len(samples_us) // 2],
+        "p95_us": samples_us[int(len(samples_us) * 0.95)],
+        "max_us": samples_us[-1],
+    }
+
+
+async def bench_update_loop(hass, zone, events):
+    """Latency from a sensor change to T_comp applied, for a single zone."""
+    engine = hass.data[DOMAIN][DATA_ENGINE]
+    samples = []
+    for i in range(events):
+        start = time.perf_counter_ns()
+        zone.set_sensor(zone.indoor, 19.0 + (i % 20) / 10)
+        await zone.climate.async_update_now()
+        engine.flush()
+        samples.append(time.perf_counter_ns() - start)
+    return _summary(samples)
+
+
+def bench_parameter_push(zone, events):
+    """Latency of a gain change pushed from a number entity into the engine slot."""
+    samples = []
+    for i in range(events):
+        start = time.perf_counter_ns()
+        zone.parameters.async_set("kp", -2.0 - (i % 50) / 100)
+        samples.append(time.perf_counter_ns() - start)
+    return _summary(samples)
+
+
+def bench_sensor_listener(hass, zone, events):
+    """Latency of the compensated sensor handling a published T_comp."""
+    signal = SIGNAL_COMPENSATED_TEMP_UPDATED.format(zone.entry_id)
+    samples = []
+    for i in range(events):
+        start = time.perf_counter_ns()
+        async_dispatcher_send(hass, signal, float(i % 30))
+        samples.append(time.perf_counter_ns() - start)
+    return _summary(samples)
+
+
+async def bench_scaling(zone_counts, ticks):
+    """Shared outdoor sensor change fanned out to N zones, stepped in one engine batch."""
+    results = []
+    for zones_count in zone_counts:
+        with tempfile.TemporaryDirectory() as config_dir:
+            hass = await async_create_hass(config_dir)
+            zones = await async_add_zones(hass, zones_count)
+            engine = hass.data[DOMAIN][DATA_ENGINE]
+            writes = sum(zone.writes for zone in zones)
+
+            samples = []
+            for tick in range(ticks):
+                start = time.perf_counter_ns()
+                # Parsed once by the hub, then read from its cache by every zone.
+                zones[0].set_sensor(OUTDOOR, -5.0 + (tick % 10) / 10)
+                for zone in zones:
+                    await zone.climate.async_update_now()
+                engine.flush()
+                samples.append(time.perf_counter_ns() - start)
+            writes = sum(zone.writes for zone in zones) - writes
+            await hass.async_stop(force=True)
+
+        tick_us = statistics.fmean(samples) / 1000
+        results.append(
+            {
+                "zones": zones_count,
+                "tick_mean_us": tick_us,
+                "per_zone_us": tick_us / zones_count,
+                "events_per_second_per_zone": 1e6 / (tick_us / zones_count),
+                "state_writes_per_tick": writes / ticks,
+            }
+        )
+    return results
+
+
+async def run(args):
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await async_create_hass(config_dir)
+        (zone,) = await async_add_zones(hass, 1)
+        latency = {
+            "update_loop": await bench_update_loop(hass, zone, args.events),
+            "parameter_push": bench_parameter_push(zone, args.events),
+            "sensor_listener": bench_sensor_listener(hass, zone, args.events),
+        }
+        await hass.async_stop(force=True)
+
+    manifest = json.loads((ROOT / "custom_components/pid_heat_compensation/manifest.json").read_text())
+    return {
+        "meta": {
+            "version": manifest["version"],
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "timestamp": time.time(),
+        },
+        **latency,
+        "scaling": await bench_scaling(args.zones, args.ticks),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the PID Heat Compensation update path.")
+    parser.add_argument("--events", type=int, default=5000, help="Events per latency benchmark")
+    parser.add_argument("--ticks", type=int, default=50, help="Ticks per scaling step")
+    parser.add_argument(
+        "--zones", type=int, nargs="+", default=[1, 10, 50, 100, 250, 500], help="Config entry counts to scale over"
+    )
+    parser.add_argument("--output", default="bench_results.json", help="Where to write the JSON results")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    Path(args.output).write_text(json.dumps(results, indent=2))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Drives the integration's entities on a bare Home Assistant core, without setting up any component.
+
+Sensor readings are handed to the domain's sensor hub as StubState objects,
+so the tests and benchmarks don't depend on which attributes the installed
+Home Assistant version has on its State class.
+"""
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant.helpers import restore_state  # noqa: E402
+
+from custom_components.pid_heat_compensation.climate import PIDClimateController  # noqa: E402
+from custom_components.pid_heat_compensation.const import (  # noqa: E402
+    CONF_INDOOR_SENSOR,
+    CONF_OUTDOOR_SENSOR,
+    DATA_ENGINE,
+    DATA_SENSOR_HUB,
+    DOMAIN,
+)
+from custom_components.pid_heat_compensation.engine import PIDEngine  # noqa: E402
+from custom_components.pid_heat_compensation.hub import SensorHub  # noqa: E402
+from custom_components.pid_heat_compensation.models import PIDEntryData  # noqa: E402
+from custom_components.pid_heat_compensation.sensor import PIDCompensatedTempSensor  # noqa: E402
+
+OUTDOOR = "sensor.outdoor_temperature"
+
+
+class StubState:
+    """The parts of a sensor State that the sensor hub reads."""
+
+    def __init__(self, entity_id, state, timestamp=None):
+        self.entity_id = entity_id
+        self.state = str(state)
+        self.last_updated_timestamp = self.last_reported_timestamp = (
+            time.time() if timestamp is None else timestamp
+        )
+
+
+async def async_create_hass(config_dir):
+    """A Home Assistant core with the domain's shared engine and sensor hub, like async_setup_entry."""
+    hass = HomeAssistant(str(config_dir))
+    await restore_state.async_load(hass)
+    hass.data[DOMAIN] = {DATA_ENGINE: PIDEngine(hass.loop), DATA_SENSOR_HUB: SensorHub(hass)}
+    return hass
+
+
+class Zone:
+    """One config entry: its climate controller and compensated sensor, fed through the sensor hub."""
+
+    def __init__(self, hass, index=0, outdoor=OUTDOOR, **options):
+        self.hass = hass
+        self.entry_id = f"zone_{index}"
+        self.indoor = f"sensor.indoor_{index}"
+        self.outdoor = outdoor
+        data = {"name": f"Zone {index}", CONF_INDOOR_SENSOR: self.indoor, CONF_OUTDOOR_SENSOR: outdoor}
+        # The options flow stores the complete form, so options always hold the sensors too.
+        self.entry = SimpleNamespace(
+            entry_id=self.entry_id,
+            title=f"Zone {index}",
+            options={**data, **options} if options else {},
+            data=data,
+        )
+        self.entry_data = hass.data[DOMAIN][self.entry_id] = PIDEntryData(self.entry)
+        self.parameters = self.entry_data.parameters
+        self.stats = self.entry_data.stats
+
+        self.climate = PIDClimateController(hass, self.entry)
+        self.climate.hass = hass
+        self.climate.entity_id = f"climate.zone_{index}"
+        self.sensor = PIDCompensatedTempSensor(hass, self.entry, self.entry.title)
+        self.sensor.hass = hass
+        self.sensor.entity_id = f"sensor.zone_{index}_compensated_temperature"
+
+    async def async_add(self, indoor=None, outdoor=None, **parameters):
+        """Publishes the number entities' parameters, feeds sensor readings and adds both entities."""
+        for key, value in parameters.items():
+            self.parameters.async_set(key, value)
+        await self.climate.async_added_to_hass()
+        await self.sensor.async_added_to_hass()
+        if outdoor is not None:
+            self.set_sensor(self.outdoor, outdoor)
+        if indoor is not None:
+            self.set_sensor(self.indoor, indoor)
+        await self.hass.async_block_till_done()
+
+    def set_sensor(self, entity_id, value):
+        """A state change of a sensor, as the hub's state listener would hand it over."""
+        self.hass.data[DOMAIN][DATA_SENSOR_HUB].async_update(entity_id, StubState(entity_id, value))
+
+    @property
+    def state(self):
+        """The climate entity's state as last written to the state machine."""
+        return self.hass.states.get(self.climate.entity_id)
+
+    @property
+    def writes(self):
+        """Number of state writes of the climate entity."""
+        return self.stats.state_writes
@@ -0,0 +1,90 @@
+"""Behavior of the incremental indoor sensor aggregate; needs neither NumPy nor Home Assistant."""
+import importlib.util
+from pathlib import Path
+import unittest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+_spec = importlib.util.spec_from_file_location(
+    "pid_aggregate", ROOT / "custom_components/pid_heat_compensation/aggregate.py"
+)
+aggregate = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(aggregate)
+IndoorAggregate = aggregate.IndoorAggregate
+
+
+class IndoorAggregateTests(unittest.TestCase):
+    def test_mean_is_weighted_and_follows_updates(self):
+        indoor = IndoorAggregate(aggregate.AGGREGATE_MEAN, {"sensor.living": 3})
+        indoor.update("sensor.living", 21.0, 0)
+        indoor.update("sensor.bedroom", 17.0, 0)
+        self.assertAlmostEqual(indoor.value, (3 * 21.0 + 17.0) / 4)
+
+        indoor.update("sensor.bedroom", 19.0, 1)
+        self.assertAlmostEqual(indoor.value, (3 * 21.0 + 19.0) / 4)
+        self.assertEqual(len(indoor), 2)
+
+    def test_unavailable_sensor_is_removed(self):
+        indoor = IndoorAggregate()
+        indoor.update("sensor.living", 21.0, 0)
+        indoor.update("sensor.bedroom", 17.0, 0)
+        indoor.update("sensor.bedroom", None, 1)
+        self.assertEqual(indoor.value, 21.0)
+        indoor.update("sensor.living", None, 1)
+        self.assertIsNone(indoor.value)
+
+    def test_minimum(self):
+        indoor = IndoorAggregate(aggregate.AGGREGATE_MIN, {"sensor.bedroom": 0.1})
+        for entity_id, value in (("sensor.living", 21.0), ("sensor.bedroom", 17.5), ("sensor.hall", 19.0)):
+            indoor.update(entity_id, value, 0)
+        self.assertEqual(indoor.value, 17.5)
+
+    def test_weighted_median(self):
+        indoor = IndoorAggregate(aggregate.AGGREGATE_MEDIAN, {"sensor.living": 3})
+        for entity_id, value in (("sensor.living", 21.0), ("sensor.bedroom", 17.0), ("sensor.hall", 19.0)):
+            indoor.update(entity_id, value, 0)
+        # Living room weighs 3 of 5: the median is its reading.
+        self.assertEqual(indoor.value, 21.0)
+
+        unweighted = IndoorAggregate(aggregate.AGGREGATE_MEDIAN)
+        unweighted.update("sensor.living", 21.0, 0)
+        unweighted.update("sensor.bedroom", 17.0, 0)
+        # An exact split averages the two middle readings.
+        self.assertEqual(unweighted.value, 19.0)
+
+    def test_zero_weights_have_no_mean(self):
+        indoor = IndoorAggregate(aggregate.AGGREGATE_MEAN, {"sensor.living": 0})
+        indoor.update("sensor.living", 21.0, 0)
+        self.assertIsNone(indoor.value)
+
+    def test_expire_drops_stale_sensors_and_refreshes_live_ones(self):
+        indoor = IndoorAggregate(stale_after=600)
+        indoor.update("sensor.living", 21.0, 0)
+        indoor.update("sensor.bedroom", 17.0, 100)
+        indoor.update("sensor.hall", 19.0, 500)
+        # The living room sensor still reports the same value (no state change), the bedroom is gone.
+        current = {"sensor.living": (21.0, 650), "sensor.bedroom": None}
+        asked = []
+
+        def refresh(entity_id):
+            asked.append(entity_id)
+            return current[entity_id]
+
+        indoor.expire(700, refresh)
+        self.assertEqual(asked, ["sensor.living", "sensor.bedroom"])
+        self.assertEqual(len(indoor), 2)
+        self.assertAlmostEqual(indoor.value, 20.0)
+
+        # Nothing is stale yet: refresh is not asked again.
+        indoor.expire(1000, refresh)
+        self.assertEqual(len(asked), 2)
+
+    def test_expire_is_disabled_without_stale_after(self):
+        indoor = IndoorAggregate()
+        indoor.update("sensor.living", 21.0, 0)
+        indoor.expire(10**9, lambda entity_id: None)
+        self.assertEqual(indoor.value, 21.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+"""Behavior of the relay autotuner on a simulated house; needs neither NumPy nor Home Assistant."""
+from collections import deque
+import importlib.util
+from pathlib import Path
+import unittest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _load(name):
+    spec = importlib.util.spec_from_file_location(
+        f"pid_{name}", ROOT / f"custom_components/pid_heat_compensation/{name}.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+autotune = _load("autotune")
+const = _load("const")
+
+SETPOINT = 20.0
+DT = 60.0  # seconds between indoor readings
+GAIN_LIMITS = {key: const.PARAMETER_RANGES[key][1:3] for key in ("kp", "ki", "kd")}
+
+
+def _run_relay(tuner, time_constant=4 * 3600, dead_time=30 * 60, max_steps=20000):
+    """First order plus dead time house: a relay offset of -1 °C on T_comp heats it towards +1 °C.
+
+    Returns the times the relay switched to cooling, to compare the measured period with.
+    """
+    indoor = SETPOINT - 0.5
+    delayed = deque([0.0] * int(dead_time / DT))
+    cooling_switches = []
+    offset = None
+    for step in range(max_steps):
+        now = step * DT
+        previous, offset = offset, tuner.update(now, indoor)
+        if previous is not None and previous < 0 < offset:
+            cooling_switches.append(now)
+        if tuner.done:
+            break
+        delayed.append(-offset)
+        indoor += DT / time_constant * (SETPOINT + delayed.popleft() - indoor)
+    return cooling_switches
+
+
+class RelayAutotunerTests(unittest.TestCase):
+    def test_pi_gains_from_a_sustained_oscillation(self):
+        tuner = autotune.RelayAutotuner(SETPOINT, 3.0, hysteresis=0.1, cycles=3, rule="pi", gain_limits=GAIN_LIMITS)
+        cooling_switches = _run_relay(tuner)
+
+        self.assertIsNone(tuner.error)
+        result = tuner.result
+        self.assertIsNotNone(result)
+        # The relay switches every dead time plus the time to cross the hysteresis band.
+        period = (cooling_switches[-1] - cooling_switches[-4]) / 3
+        self.assertAlmostEqual(result.ultimate_period, period)
+        self.assertGreater(result.ultimate_period, 2 * 30 * 60)
+        self.assertAlmostEqual(result.kp, -0.45 * result.ultimate_gain)
+        self.assertAlmostEqual(result.ki, 1.2 * result.kp / result.ultimate_period)
+        self.assertEqual(result.kd, 0.0)
+
+    def test_pid_gains_fit_the_parameter_ranges(self):
+        tuner = autotune.RelayAutotuner(SETPOINT, 3.0, cycles=3, rule="pid", gain_limits=GAIN_LIMITS)
+        _run_relay(tuner)
+
+        result = tuner.result
+        self.assertIsNotNone(result, tuner.error)
+        self.assertAlmostEqual(result.kd, result.kp * result.ultimate_period / 8)
+        # Hours-long periods give a tiny Ki and a Kd in the thousands, within the number entities' ranges.
+        self.assertLess(abs(result.ki), 0.01)
+        self.assertGreater(abs(result.kd), 1000)
+        for key in ("kp", "ki", "kd"):
+            _initial, low, high, step = const.PARAMETER_RANGES[key]
+            value = getattr(result, key)
+            self.assertTrue(low <= value <= high, f"{key}={value}")
+            self.assertNotEqual(round(value / step), 0, f"{key}={value} is below the step {step}")
+
+    def test_gains_outside_the_limits_fail_the_experiment(self):
+        tuner = autotune.RelayAutotuner(SETPOINT, 3.0, cycles=3, rule="pid", gain_limits={"kd": (-5.0, 5.0)})
+        _run_relay(tuner)
+
+        self.assertIsNone(tuner.result)
+        self.assertIn("kd", tuner.error)
+        self.assertTrue(tuner.done)
+
+    def test_too_slow_oscillation_fails(self):
+        tuner = autotune.RelayAutotuner(SETPOINT, 3.0, cycles=3, buffer_size=16)
+        _run_relay(tuner)
+
+        self.assertIsNone(tuner.result)
+        self.assertEqual(tuner.error, "Oscillation is too slow for the reading buffer")
+
+
+if __name__ == "__main__":
+    unittest.main()
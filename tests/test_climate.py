@@ -0,0 +1,561 @@
+"""Behavior of the climate controller on a bare Home Assistant core; needs Home Assistant and NumPy."""
+import asyncio
+from datetime import timedelta
+import logging
+import tempfile
+import time
+from types import SimpleNamespace
+import unittest
+from unittest import mock
+
+try:
+    from harness import Zone, async_create_hass
+    from homeassistant.components.climate import HVACMode
+    from homeassistant.core import State, SupportsResponse
+    from homeassistant.exceptions import HomeAssistantError
+    from homeassistant.helpers import restore_state
+    from homeassistant.util import dt as dt_util
+
+    from custom_components.pid_heat_compensation import async_options_updated, async_setup, climate
+    from custom_components.pid_heat_compensation.climate import PIDClimateController
+    from custom_components.pid_heat_compensation.const import (
+        CONF_FORECAST_ENTITY,
+        CONF_GAIN_SCHEDULE,
+        CONF_INDOOR_SENSOR,
+        CONF_INDOOR_WEIGHTS,
+        CONF_MIN_UPDATE_INTERVAL,
+        CONF_OUTDOOR_SENSOR,
+        CONF_OUTPUT_LIMIT,
+        CONF_PUBLISH_DEADBAND,
+        CONF_PUBLISH_HEARTBEAT,
+        CONF_SAMPLE_PERIOD,
+        DATA_ENGINE,
+        DATA_FORECASTS,
+        DOMAIN,
+        PARAMETER_RANGES,
+        SERVICE_DUMP_STATS,
+        SERVICE_SET_ZONES,
+        WARM_START_MAX_AGE,
+    )
+    from custom_components.pid_heat_compensation.forecast import ForecastTable
+except ImportError:
+    HVACMode = None
+
+GAINS = {"kp": -2.0, "ki": 0.0, "kd": 0.0, "weather_factor": 1.0}
+
+
+@unittest.skipIf(HVACMode is None, "Home Assistant or NumPy is not installed")
+class ControllerTestCase(unittest.IsolatedAsyncioTestCase):
+    """One zone at 19 °C indoors and -5 °C outdoors, heating to 20 °C."""
+
+    zone_options = {}
+
+    async def asyncSetUp(self):
+        self._config_dir = tempfile.TemporaryDirectory()
+        self.hass = await async_create_hass(self._config_dir.name)
+        self.zone = Zone(self.hass, **self.zone_options)
+
+    async def asyncTearDown(self):
+        await self.hass.async_stop(force=True)
+        self._config_dir.cleanup()
+
+    async def async_add_zone(self):
+        await self.zone.async_add(indoor=19.0, outdoor=-5.0, **GAINS)
+
+
+class CoalescingTests(ControllerTestCase):
+    zone_options = {CONF_MIN_UPDATE_INTERVAL: 0.05}
+
+    async def test_sensor_burst_runs_the_update_loop_twice(self):
+        await self.async_add_zone()
+        await asyncio.sleep(0.1)
+        triggers, runs = self.zone.stats.triggers["sensor"], self.zone.stats.runs["queue"]
+
+        # The first change runs at once, the rest wait for the cooldown.
+        self.zone.set_sensor(self.zone.outdoor, -5.5)
+        await self.hass.async_block_till_done()
+        for outdoor in (-6.0, -6.5, -7.0, -7.5):
+            self.zone.set_sensor(self.zone.outdoor, outdoor)
+            await self.hass.async_block_till_done()
+        self.assertEqual(self.zone.stats.runs["queue"], runs + 1)
+        self.assertEqual(self.zone.entry_data.compensated_temp, -7.5)
+
+        # One more run after the cooldown uses the latest reading.
+        await asyncio.sleep(0.1)
+        await self.hass.async_block_till_done()
+        self.assertEqual(self.zone.stats.triggers["sensor"], triggers + 5)
+        self.assertEqual(self.zone.stats.runs["queue"], runs + 2)
+        self.assertEqual(self.zone.entry_data.compensated_temp, -9.5)
+
+
+class FixedRateSamplingTests(ControllerTestCase):
+    zone_options = {CONF_SAMPLE_PERIOD: 0.05}
+
+    async def test_steps_run_on_the_timer_with_the_fixed_dt(self):
+        # Integral only: every step adds Ki * error * dt to Delta T.
+        await self.zone.async_add(indoor=19.0, outdoor=5.0, kp=0.0, ki=-1.0, kd=0.0, weather_factor=1.0)
+        for indoor in (19.2, 18.8, 19.0):
+            self.zone.set_sensor(self.zone.indoor, indoor)
+        await self.hass.async_block_till_done()
+        self.assertEqual(self.zone.stats.triggers["sensor"], 0)
+
+        await asyncio.sleep(0.22)
+        await self.hass.async_block_till_done()
+
+        steps = self.zone.stats.runs["step"]
+        self.assertGreaterEqual(self.zone.stats.triggers["sample"], 3)
+        self.assertGreaterEqual(steps, 3)
+        integral = self.zone.climate.extra_restore_state_data.as_dict()["integral"]
+        self.assertAlmostEqual(integral, -1.0 * 1.0 * 0.05 * steps)
+
+
+class BatchedStepTests(ControllerTestCase):
+    zone_options = {CONF_MIN_UPDATE_INTERVAL: 0}
+
+    async def test_zones_updating_together_share_one_engine_step(self):
+        other = Zone(self.hass, 1, **self.zone_options)
+        await self.async_add_zone()
+        await other.async_add(indoor=18.0, outdoor=-5.0, **GAINS)
+        engine = self.hass.data[DOMAIN][DATA_ENGINE]
+
+        with mock.patch.object(engine, "step", wraps=engine.step) as step:
+            # One outdoor change reaches both zones in the same loop iteration.
+            self.zone.set_sensor(self.zone.outdoor, -6.0)
+            await self.hass.async_block_till_done()
+
+        step.assert_called_once()
+        self.assertEqual(len(step.call_args.args[0]), 2)
+        # Each zone reads back its own slot.
+        self.assertEqual(self.zone.entry_data.compensated_temp, -8.0)
+        self.assertEqual(other.entry_data.compensated_temp, -10.0)
+
+
+class StatsTests(ControllerTestCase):
+    zone_options = {CONF_MIN_UPDATE_INTERVAL: 0}
+
+    async def test_runs_are_counted_by_trigger_and_stage(self):
+        # Without an indoor reading every run is skipped before queuing a step.
+        await self.zone.async_add(outdoor=-5.0, **GAINS)
+        skipped = self.zone.stats.skipped_waiting
+        self.assertGreater(skipped, 0)
+        self.assertEqual(self.zone.stats.runs, {"queue": skipped, "step": 0})
+        sensor_triggers = self.zone.stats.triggers["sensor"]
+
+        for indoor in (19.0, 19.5):
+            self.zone.set_sensor(self.zone.indoor, indoor)
+            await self.hass.async_block_till_done()
+
+        stats = self.zone.stats.as_dict()
+        self.assertEqual(stats["skipped_waiting"], skipped)
+        self.assertEqual(stats["triggers"]["sensor"], sensor_triggers + 2)
+        self.assertEqual(stats["queue_duration"]["runs"], skipped + 2)
+        self.assertEqual(stats["step_duration"]["runs"], 2)
+        self.assertEqual(sum(stats["step_duration"]["histogram"].values()), 2)
+        self.assertEqual(stats["state_writes"], self.zone.writes)
+        self.assertIsNotNone(stats["startup_s"])
+
+    async def test_dump_stats_returns_every_entry(self):
+        await self.async_add_zone()
+        await async_setup(self.hass, {})
+
+        response = await self.hass.services.async_call(
+            DOMAIN, SERVICE_DUMP_STATS, blocking=True, return_response=True
+        )
+
+        self.assertEqual(list(response), [self.zone.entry_id])
+        self.assertEqual(response[self.zone.entry_id]["title"], self.zone.entry.title)
+        self.assertEqual(response[self.zone.entry_id]["state_writes"], self.zone.writes)
+
+    async def test_step_is_logged_lazily(self):
+        await self.async_add_zone()
+        with self.assertLogs(climate.__name__, logging.DEBUG) as logs:
+            self.zone.set_sensor(self.zone.indoor, 19.5)
+            await self.hass.async_block_till_done()
+
+        # The messages are formatted by the logging handler, not on every step.
+        self.assertTrue(logs.records)
+        for record in logs.records:
+            self.assertTrue(record.args, record.msg)
+
+
+class IndoorAggregationTests(ControllerTestCase):
+    zone_options = {
+        CONF_INDOOR_SENSOR: ["sensor.indoor_0", "sensor.bedroom"],
+        CONF_INDOOR_WEIGHTS: {"sensor.bedroom": 3},
+        CONF_MIN_UPDATE_INTERVAL: 0,
+    }
+
+    async def async_set_sensor(self, entity_id, value):
+        self.zone.set_sensor(entity_id, value)
+        await self.hass.async_block_till_done()
+
+    async def test_controller_follows_the_weighted_mean_of_the_live_sensors(self):
+        await self.async_add_zone()
+        self.assertEqual(self.zone.entry_data.compensated_temp, -7.0)
+
+        # 19 °C weighing 1 and 21 °C weighing 3: 20.5 °C, half a degree too warm.
+        await self.async_set_sensor("sensor.bedroom", 21.0)
+        self.assertEqual(self.zone.state.attributes["current_temperature"], 20.5)
+        self.assertEqual(self.zone.state.attributes["indoor_sensors_used"], 2)
+        self.assertEqual(self.zone.entry_data.compensated_temp, -4.0)
+
+        # An unavailable sensor drops out of the mean instead of stopping the controller.
+        await self.async_set_sensor("sensor.indoor_0", "unavailable")
+        self.assertEqual(self.zone.state.attributes["indoor_sensors_used"], 1)
+        self.assertEqual(self.zone.entry_data.compensated_temp, -3.0)
+
+
+class GainScheduleTests(ControllerTestCase):
+    zone_options = {
+        CONF_GAIN_SCHEDULE: [
+            {"outdoor": -10, "kp": -4.0, "ki": 0.0, "kd": 0.0},
+            {"outdoor": 0, "kp": -2.0, "ki": 0.0, "kd": 0.0},
+        ],
+        CONF_MIN_UPDATE_INTERVAL: 0,
+    }
+
+    async def test_gains_follow_the_outdoor_temperature(self):
+        await self.zone.async_add(indoor=19.0, outdoor=-5.0, kp=-1.0, ki=0.0, kd=0.0, weather_factor=1.0)
+        self.assertEqual(self.zone.entry_data.scheduled_gains, {"kp": -3.0, "ki": 0.0, "kd": 0.0})
+        self.assertEqual(self.zone.state.attributes["PID_Kp"], -3.0)
+        self.assertEqual(self.zone.entry_data.compensated_temp, -8.0)
+
+        self.zone.set_sensor(self.zone.outdoor, -10.0)
+        await self.hass.async_block_till_done()
+        self.assertEqual(self.zone.state.attributes["PID_Kp"], -4.0)
+
+        # The schedule owns the gains: a number entity change is not applied.
+        self.zone.parameters.async_set("kp", -1.5)
+        await self.hass.async_block_till_done()
+        self.assertEqual(self.zone.state.attributes["PID_Kp"], -4.0)
+
+
+class OptionsTests(ControllerTestCase):
+    zone_options = {CONF_MIN_UPDATE_INTERVAL: 0}
+
+    async def test_options_are_applied_to_the_running_controller(self):
+        await self.async_add_zone()
+        controller = self.zone.entry_data.controller
+        skipped = self.zone.stats.skipped_waiting
+
+        self.zone.entry.options = {
+            **self.zone.entry.options, CONF_OUTDOOR_SENSOR: "sensor.outdoor_north", CONF_OUTPUT_LIMIT: 1.0
+        }
+        await async_options_updated(self.hass, self.zone.entry)
+        await self.hass.async_block_till_done()
+        # Same controller, now waiting for the new outdoor sensor.
+        self.assertIs(self.zone.entry_data.controller, controller)
+        self.assertEqual(self.zone.stats.skipped_waiting, skipped + 1)
+
+        # Delta T is clamped to the new output limit. The sensors were re-subscribed, and
+        # the stub readings never reached the state machine, so feed the indoor one again.
+        self.zone.set_sensor(self.zone.indoor, 19.0)
+        self.zone.set_sensor("sensor.outdoor_north", -10.0)
+        await self.hass.async_block_till_done()
+        self.assertEqual(self.zone.entry_data.compensated_temp, -11.0)
+
+        # The old outdoor sensor is no longer followed.
+        triggers = self.zone.stats.triggers["sensor"]
+        self.zone.set_sensor(self.zone.outdoor, 3.0)
+        await self.hass.async_block_till_done()
+        self.assertEqual(self.zone.stats.triggers["sensor"], triggers)
+        self.assertEqual(self.zone.entry_data.compensated_temp, -11.0)
+
+
+class OffModeTests(ControllerTestCase):
+    async def test_switching_off_publishes_the_outdoor_temperature(self):
+        await self.async_add_zone()
+        self.assertNotEqual(self.zone.entry_data.compensated_temp, -5.0)
+
+        await self.zone.climate.async_set_hvac_mode(HVACMode.OFF)
+        await self.hass.async_block_till_done()
+
+        self.assertEqual(self.zone.entry_data.compensated_temp, -5.0)
+        self.assertEqual(self.zone.state.state, HVACMode.OFF)
+        self.assertEqual(self.zone.state.attributes["compensated_outdoor_temperature"], -5.0)
+
+    async def test_switching_off_while_a_step_is_queued(self):
+        await self.async_add_zone()
+        writes = self.zone.writes
+
+        # Both calls run before the engine flushes the step the setpoint change queued.
+        await self.zone.climate.async_set_temperature(temperature=22.0)
+        await self.zone.climate.async_set_hvac_mode(HVACMode.OFF)
+        await self.hass.async_block_till_done()
+
+        self.assertEqual(self.zone.entry_data.compensated_temp, -5.0)
+        self.assertEqual(self.zone.state.state, HVACMode.OFF)
+        self.assertEqual(self.zone.state.attributes["temperature"], 22.0)
+        self.assertEqual(self.zone.state.attributes["compensated_outdoor_temperature"], -5.0)
+        self.assertEqual(self.zone.writes, writes + 1)
+
+    async def test_switching_off_writes_while_waiting_for_sensors(self):
+        await self.zone.async_add(outdoor=-5.0, **GAINS)
+        writes = self.zone.writes
+
+        await self.zone.climate.async_set_hvac_mode(HVACMode.OFF)
+        await self.hass.async_block_till_done()
+
+        self.assertEqual(self.zone.state.state, HVACMode.OFF)
+        self.assertEqual(self.zone.writes, writes + 1)
+
+
+class WarmStartTests(ControllerTestCase):
+    def store_state(self, age, integral=1.5):
+        """Puts a saved controller state, last stepped `age` ago, in the restore cache."""
+        last_step = dt_util.utcnow() - age
+        restore_state.async_get(self.hass).last_states[self.zone.climate.entity_id] = restore_state.StoredState(
+            State(self.zone.climate.entity_id, HVACMode.HEAT, {"temperature": 20.0}),
+            restore_state.RestoredExtraData(
+                {"integral": integral, "last_error": 0.5, "last_output": integral, "last_step": last_step.isoformat()}
+            ),
+            last_step,
+        )
+
+    async def async_add_zone(self):
+        # At the setpoint with P and D off, T_comp is the outdoor temperature plus the integral.
+        await self.zone.async_add(indoor=20.0, outdoor=5.0, kp=0.0, ki=0.0, kd=0.0, weather_factor=1.0)
+
+    async def test_fresh_state_restores_the_integral(self):
+        self.store_state(timedelta(minutes=10))
+        await self.async_add_zone()
+        self.assertAlmostEqual(self.zone.climate.extra_restore_state_data.as_dict()["integral"], 1.5)
+        self.assertEqual(self.zone.entry_data.compensated_temp, 6.5)
+
+    async def test_stale_state_starts_cold(self):
+        self.store_state(WARM_START_MAX_AGE + timedelta(minutes=1))
+        await self.async_add_zone()
+        self.assertEqual(self.zone.climate.extra_restore_state_data.as_dict()["integral"], 0.0)
+        self.assertEqual(self.zone.entry_data.compensated_temp, 5.0)
+
+    async def test_restored_integral_is_clamped_to_the_output_limits(self):
+        self.store_state(timedelta(minutes=10), integral=100.0)
+        await self.async_add_zone()
+        integral = self.zone.climate.extra_restore_state_data.as_dict()["integral"]
+        self.assertLess(integral, 100.0)
+        self.assertEqual(self.zone.entry_data.compensated_temp, round(5.0 + integral, 1))
+
+
+class PublishingPolicyTests(ControllerTestCase):
+    zone_options = {CONF_PUBLISH_DEADBAND: 0.5, CONF_MIN_UPDATE_INTERVAL: 0}
+
+    async def async_set_outdoor(self, value):
+        self.zone.set_sensor(self.zone.outdoor, value)
+        await self.hass.async_block_till_done()
+
+    async def test_changes_inside_the_deadband_are_not_written(self):
+        await self.async_add_zone()
+        self.assertEqual(self.zone.entry_data.compensated_temp, -7.0)
+        writes = self.zone.writes
+
+        for outdoor in (-5.2, -4.9, -5.1):
+            await self.async_set_outdoor(outdoor)
+        self.assertEqual(self.zone.stats.runs["step"], 4)
+        self.assertEqual(self.zone.writes, writes)
+        self.assertEqual(self.zone.entry_data.compensated_temp, -7.0)
+        self.assertEqual(self.zone.state.attributes["compensated_outdoor_temperature"], -7.0)
+
+    async def test_changes_beyond_the_deadband_are_written_once(self):
+        await self.async_add_zone()
+        writes = self.zone.writes
+
+        await self.async_set_outdoor(-6.0)
+        self.assertEqual(self.zone.writes, writes + 1)
+        self.assertEqual(self.zone.entry_data.compensated_temp, -8.0)
+        self.assertEqual(self.zone.state.attributes["compensated_outdoor_temperature"], -8.0)
+
+    async def test_heartbeat_writes_unchanged_values(self):
+        self.zone = Zone(self.hass, **self.zone_options, **{CONF_PUBLISH_HEARTBEAT: 0})
+        await self.async_add_zone()
+        writes = self.zone.writes
+
+        await self.async_set_outdoor(-5.1)
+        self.assertEqual(self.zone.writes, writes + 1)
+        # The heartbeat writes the current readings, T_comp stays inside the deadband.
+        self.assertEqual(self.zone.state.attributes["real_outdoor_temperature"], -5.1)
+        self.assertEqual(self.zone.entry_data.compensated_temp, -7.0)
+
+
+class AttributeTests(ControllerTestCase):
+    zone_options = {CONF_FORECAST_ENTITY: "weather.home", CONF_PUBLISH_DEADBAND: 5.0, CONF_MIN_UPDATE_INTERVAL: 0}
+
+    def set_forecast(self, temperature):
+        now = time.time()
+        self.hass.data[DOMAIN].setdefault(DATA_FORECASTS, {})["weather.home"] = ForecastTable(
+            [(now - 3600, temperature), (now + 48 * 3600, temperature)], fetched=now
+        )
+
+    async def test_tuning_and_diagnostic_attributes_are_not_recorded(self):
+        await self.async_add_zone()
+        unrecorded = {
+            "PID_Kp", "PID_Ki", "PID_Kd", "PID_setpoint", "weather_factor",
+            "forecast_feedforward", "indoor_sensors_used",
+        }
+        self.assertLessEqual(unrecorded, PIDClimateController._unrecorded_attributes)
+        self.assertLessEqual(unrecorded, set(self.zone.state.attributes))
+
+    async def test_feedforward_change_is_written_inside_the_deadband(self):
+        self.set_forecast(-5.0)
+        await self.async_add_zone()
+        self.assertEqual(self.zone.state.attributes["forecast_feedforward"], 0.0)
+        writes = self.zone.writes
+
+        # The forecast turns 2 °C colder: T_comp moves by less than the deadband.
+        self.set_forecast(-7.0)
+        self.zone.set_sensor(self.zone.outdoor, -5.0)
+        await self.hass.async_block_till_done()
+
+        self.assertEqual(self.zone.writes, writes + 1)
+        self.assertEqual(self.zone.state.attributes["forecast_feedforward"], -1.0)
+
+    async def test_updates_read_the_fetched_forecast_without_calling_the_weather_service(self):
+        calls = []
+
+        async def get_forecasts(call):
+            calls.append(call.data)
+            hour = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+            forecast = [
+                {"datetime": (hour + timedelta(hours=offset)).isoformat(), "temperature": -8.0}
+                for offset in range(-1, 48)
+            ]
+            return {"weather.home": {"forecast": forecast}}
+
+        self.hass.services.async_register(
+            "weather", "get_forecasts", get_forecasts, supports_response=SupportsResponse.ONLY
+        )
+        await self.async_add_zone()
+        await self.hass.async_block_till_done()
+        self.assertEqual(len(calls), 1)
+
+        for outdoor in (-5.5, -6.0, -6.5):
+            self.zone.set_sensor(self.zone.outdoor, outdoor)
+            await self.hass.async_block_till_done()
+
+        # Every update interpolated in the table fetched at setup: half of the -1.5 °C change ahead.
+        self.assertEqual(calls, [{"entity_id": "weather.home", "type": "hourly"}])
+        self.assertEqual(self.zone.state.attributes["forecast_feedforward"], -0.75)
+
+
+class FakeAutotuner:
+    """Switches the relay on the indoor temperature and finishes after three readings."""
+
+    instances = []
+
+    def __init__(self, setpoint, relay_amplitude, hysteresis, cycles, rule, gain_limits=None):
+        self.setpoint = setpoint
+        self.relay_amplitude = relay_amplitude
+        self.gain_limits = gain_limits
+        self.readings = []
+        self.result = self.error = None
+        self.instances.append(self)
+
+    def update(self, now, indoor):
+        self.readings.append(indoor)
+        if len(self.readings) == 3:
+            self.result = SimpleNamespace(ultimate_gain=3.0, ultimate_period=7200.0, kp=-1.5, ki=-0.0002, kd=0.0)
+        return -self.relay_amplitude if indoor < self.setpoint else self.relay_amplitude
+
+
+class AutotuneTests(ControllerTestCase):
+    zone_options = {CONF_MIN_UPDATE_INTERVAL: 0}
+
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        FakeAutotuner.instances = []
+        patcher = mock.patch.object(climate, "RelayAutotuner", FakeAutotuner)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        await self.zone.async_add(indoor=19.0, outdoor=5.0, **GAINS)
+
+    async def async_set_indoor(self, value):
+        self.zone.set_sensor(self.zone.indoor, value)
+        await self.hass.async_block_till_done()
+
+    async def test_relay_drives_t_comp_and_the_result_is_written_to_the_parameters(self):
+        await self.zone.climate.async_autotune(2.0, 0.1, 3, "pi", timedelta(hours=1))
+        await self.hass.async_block_till_done()
+        (tuner,) = FakeAutotuner.instances
+        self.assertEqual(tuner.gain_limits["kd"], PARAMETER_RANGES["kd"][1:3])
+        self.assertEqual(self.zone.entry_data.compensated_temp, 3.0)
+
+        await self.async_set_indoor(21.0)
+        self.assertEqual(self.zone.entry_data.compensated_temp, 7.0)
+
+        # The third reading finishes the experiment; PID control resumes with the new gains.
+        await self.async_set_indoor(20.5)
+        self.assertEqual((self.zone.parameters.kp, self.zone.parameters.ki), (-1.5, -0.0002))
+        self.assertEqual(self.zone.state.attributes["PID_Kp"], -1.5)
+        self.assertAlmostEqual(self.zone.entry_data.compensated_temp, 5.8, places=1)
+
+        await self.async_set_indoor(21.0)
+        self.assertEqual(len(tuner.readings), 3)
+
+    async def test_experiment_is_aborted_after_the_maximum_duration(self):
+        await self.zone.climate.async_autotune(2.0, 0.1, 3, "pi", timedelta(0))
+        await self.hass.async_block_till_done()
+        # The relay would publish 7 °C; the PID is back in control instead.
+        await self.async_set_indoor(20.5)
+
+        self.assertEqual(self.zone.parameters.kp, GAINS["kp"])
+        self.assertEqual(self.zone.entry_data.compensated_temp, 6.0)
+        self.assertEqual(len(FakeAutotuner.instances[0].readings), 1)
+
+    async def test_autotune_needs_heat_mode(self):
+        await self.zone.climate.async_set_hvac_mode(HVACMode.OFF)
+        with self.assertRaises(HomeAssistantError):
+            await self.zone.climate.async_autotune(2.0, 0.1, 3, "pi", timedelta(hours=1))
+        self.assertEqual(FakeAutotuner.instances, [])
+
+
+class SetZonesTests(ControllerTestCase):
+    async def test_zones_are_applied_and_written_once(self):
+        await self.async_add_zone()
+        other = Zone(self.hass, 1)
+        await other.async_add(indoor=19.0, outdoor=-5.0, **GAINS)
+        await async_setup(self.hass, {})
+        writes = (self.zone.writes, other.writes)
+
+        await self.hass.services.async_call(
+            DOMAIN,
+            SERVICE_SET_ZONES,
+            {"zones": [
+                {"entity_id": "climate.zone_*", "temperature": 21.0},
+                {"entity_id": "climate.zone_1", "hvac_mode": HVACMode.OFF},
+            ]},
+            blocking=True,
+        )
+        await self.hass.async_block_till_done()
+
+        self.assertEqual(self.zone.state.attributes["temperature"], 21.0)
+        self.assertEqual(self.zone.state.state, HVACMode.HEAT)
+        self.assertEqual(other.state.state, HVACMode.OFF)
+        self.assertEqual(other.entry_data.compensated_temp, -5.0)
+        self.assertEqual((self.zone.writes, other.writes), (writes[0] + 1, writes[1] + 1))
+
+    async def test_all_targets_are_applied_before_one_batched_step(self):
+        await self.async_add_zone()
+        other = Zone(self.hass, 1)
+        await other.async_add(indoor=19.0, outdoor=-5.0, **GAINS)
+        await async_setup(self.hass, {})
+        engine = self.hass.data[DOMAIN][DATA_ENGINE]
+
+        with mock.patch.object(engine, "step", wraps=engine.step) as step:
+            await self.hass.services.async_call(
+                DOMAIN,
+                SERVICE_SET_ZONES,
+                {"zones": [
+                    {"entity_id": "climate.zone_0", "temperature": 21.0},
+                    {"entity_id": "climate.zone_1", "temperature": 22.0},
+                ]},
+                blocking=True,
+            )
+            await self.hass.async_block_till_done()
+
+        step.assert_called_once()
+        self.assertEqual(len(step.call_args.args[0]), 2)
+        self.assertEqual(self.zone.entry_data.compensated_temp, -9.0)
+        self.assertEqual(other.entry_data.compensated_temp, -11.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+"""Schemas and validation of the config and options flows; needs Home Assistant and NumPy."""
+import unittest
+
+try:
+    from homeassistant.const import CONF_NAME
+    import voluptuous as vol
+
+    from custom_components.pid_heat_compensation import config_flow
+    from custom_components.pid_heat_compensation.const import (
+        CONF_GAIN_SCHEDULE,
+        CONF_INDOOR_SENSOR,
+        CONF_INDOOR_WEIGHTS,
+        CONF_OUTDOOR_SENSOR,
+        CONF_OUTPUT_MODBUS_HOST,
+        CONF_OUTPUT_MODBUS_REGISTER,
+        CONF_OUTPUT_TYPE,
+        DEFAULT_OUTPUT_LIMIT,
+        OUTPUT_MODBUS,
+    )
+except ImportError:
+    config_flow = None
+
+SENSORS = {CONF_INDOOR_SENSOR: ["sensor.living_room"], CONF_OUTDOOR_SENSOR: "sensor.outdoor"}
+
+
+@unittest.skipIf(config_flow is None, "Home Assistant or NumPy is not installed")
+class ConfigFlowSchemaTests(unittest.TestCase):
+    def test_user_step_only_asks_for_the_name_and_sensors(self):
+        self.assertEqual(
+            {str(key) for key in config_flow.STEP_USER_DATA_SCHEMA.schema},
+            {CONF_NAME, CONF_INDOOR_SENSOR, CONF_OUTDOOR_SENSOR},
+        )
+        with self.assertRaises(vol.Invalid):
+            config_flow.STEP_USER_DATA_SCHEMA({**SENSORS, CONF_GAIN_SCHEDULE: []})
+
+    def test_options_flow_fills_in_the_defaults(self):
+        options = config_flow.CONTROLLER_SCHEMA(dict(SENSORS))
+        self.assertEqual(options["output_limit"], DEFAULT_OUTPUT_LIMIT)
+        self.assertEqual(config_flow._validate_controller_input(options), {})
+
+    def test_options_that_the_selectors_cannot_check_are_validated(self):
+        errors = config_flow._validate_controller_input({
+            **SENSORS,
+            CONF_INDOOR_WEIGHTS: {"sensor.living_room": -1},
+            CONF_GAIN_SCHEDULE: [{"outdoor": 0, "kp": -2}],
+            CONF_OUTPUT_TYPE: OUTPUT_MODBUS,
+            CONF_OUTPUT_MODBUS_HOST: "heatpump.local",
+        })
+        self.assertEqual(errors, {
+            CONF_INDOOR_WEIGHTS: "invalid_indoor_weights",
+            CONF_GAIN_SCHEDULE: "invalid_gain_schedule",
+            CONF_OUTPUT_MODBUS_REGISTER: "output_target_required",
+        })
+
+
+if __name__ == "__main__":
+    unittest.main()
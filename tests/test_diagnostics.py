@@ -0,0 +1,58 @@
+"""Diagnostics of a running zone on a bare Home Assistant core; needs Home Assistant and NumPy."""
+import tempfile
+import unittest
+
+try:
+    from harness import Zone, async_create_hass
+
+    from custom_components.pid_heat_compensation import diagnostics
+    from custom_components.pid_heat_compensation.const import CONF_MIN_UPDATE_INTERVAL
+    from custom_components.pid_heat_compensation.models import StepHistory
+except ImportError:
+    diagnostics = None
+
+
+@unittest.skipIf(diagnostics is None, "Home Assistant or NumPy is not installed")
+class StepHistoryTests(unittest.TestCase):
+    def test_oldest_steps_are_overwritten(self):
+        history = StepHistory(size=3)
+        for index in range(5):
+            history.record(*(float(index),) * len(StepHistory.FIELDS))
+
+        steps = history.as_list()
+        self.assertEqual(len(history), 3)
+        self.assertEqual([step["t_comp"] for step in steps], [2.0, 3.0, 4.0])
+        self.assertIs(steps[0]["freezing_clamp"], True)
+
+
+@unittest.skipIf(diagnostics is None, "Home Assistant or NumPy is not installed")
+class DiagnosticsTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self._config_dir = tempfile.TemporaryDirectory()
+        self.hass = await async_create_hass(self._config_dir.name)
+        self.zone = Zone(self.hass, **{CONF_MIN_UPDATE_INTERVAL: 0})
+
+    async def asyncTearDown(self):
+        await self.hass.async_stop(force=True)
+        self._config_dir.cleanup()
+
+    async def test_recent_steps_are_served_oldest_first(self):
+        await self.zone.async_add(indoor=19.0, outdoor=-5.0, kp=-2.0, ki=0.0, kd=0.0, weather_factor=1.0)
+        for outdoor in (-6.0, -7.0):
+            self.zone.set_sensor(self.zone.outdoor, outdoor)
+            await self.hass.async_block_till_done()
+
+        result = await diagnostics.async_get_config_entry_diagnostics(self.hass, self.zone.entry)
+
+        steps = result["steps"]
+        self.assertEqual(len(steps), self.zone.stats.runs["step"])
+        self.assertEqual(set(steps[-1]), set(StepHistory.FIELDS))
+        self.assertEqual([step["outdoor"] for step in steps[-2:]], [-6.0, -7.0])
+        self.assertEqual([step["t_comp"] for step in steps[-2:]], [-8.0, -9.0])
+        self.assertEqual(steps[-1]["p_term"], -2.0)
+        self.assertEqual(result["compensated_temp"], -9.0)
+        self.assertEqual(result["parameters"]["kp"], -2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
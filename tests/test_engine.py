@@ -0,0 +1,200 @@
+"""Behavior of the batched PID engine; needs NumPy, not Home Assistant."""
+import importlib.util
+from pathlib import Path
+import unittest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from simple_pid import PID
+except ImportError:
+    PID = None
+
+LIMITS = (-10.0, 10.0)
+GAINS = (-2.0, -0.001, -50.0)
+
+
+def _load(name):
+    """Load one module of the integration without importing the package (and Home Assistant)."""
+    spec = importlib.util.spec_from_file_location(
+        f"pid_{name}", ROOT / f"custom_components/pid_heat_compensation/{name}.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class PIDEngineTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = _load("engine").PIDEngine(capacity=2)
+        self.slot = self.engine.allocate(LIMITS)
+        self.engine.set_setpoint(self.slot, 21.0)
+
+    def test_feedforward_does_not_lift_the_freezing_clamp(self):
+        # Real outdoor -2 °C, a +3 K forecast shift and no PID output: without the
+        # clamp T_comp would be +1 °C although it is freezing.
+        _, t_comp = self.engine.step([self.slot], 21.0, -2.0, 1.0, now=0.0, dt=60.0, feedforward=3.0)
+        self.assertEqual(t_comp[0], 0.0)
+        self.assertTrue(self.engine.freezing_clamp[self.slot])
+
+    def test_feedforward_shifts_t_comp_above_freezing(self):
+        _, t_comp = self.engine.step([self.slot], 21.0, 2.0, 1.0, now=0.0, dt=60.0, feedforward=-1.5)
+        self.assertAlmostEqual(t_comp[0], 0.5)
+        self.assertFalse(self.engine.freezing_clamp[self.slot])
+
+    def test_single_slot_path_matches_the_batched_step(self):
+        for velocity in (False, True):
+            engine = _load("engine").PIDEngine(capacity=3)
+            single, *batch = (engine.allocate((-3.0, 3.0)) for _ in range(3))
+            for slot in (single, *batch):
+                engine.set_gains(slot, -2.0, -0.01, -5.0)
+                engine.set_setpoint(slot, 21.0)
+                engine.set_form(slot, velocity)
+
+            rng = np.random.default_rng(1)
+            for index in range(300):
+                indoor, outdoor, feedforward = 20 + rng.normal(), 5 * rng.normal(), rng.normal()
+                now = index * 30.0
+                one = engine.step([single], indoor, outdoor, 1.2, now=now, dt=30.0, feedforward=feedforward)
+                many = engine.step(
+                    batch, [indoor] * 2, [outdoor] * 2, [1.2] * 2, now=now, dt=30.0, feedforward=[feedforward] * 2
+                )
+                np.testing.assert_allclose(np.repeat(one, 2, axis=1), many, rtol=0, atol=1e-12)
+            for field in engine._FIELDS:
+                self.assertAlmostEqual(getattr(engine, field)[single], getattr(engine, field)[batch[0]], places=12)
+
+    def test_state_is_kept_when_the_engine_grows(self):
+        engine = self.engine
+        engine.set_gains(self.slot, -2.0, -0.001, 0.0)
+        engine.step([self.slot], 20.0, 5.0, 1.0, now=0.0, dt=60.0)
+        integral = engine.integral[self.slot]
+
+        slots = [engine.allocate(LIMITS) for _ in range(4)]
+        self.assertEqual(len(set(slots) | {self.slot}), 5)
+        self.assertEqual(engine.integral[self.slot], integral)
+        self.assertEqual(engine.kp[self.slot], -2.0)
+        self.assertEqual(engine.kp[slots[-1]], 0.0)
+
+        # The field arrays and the single-slot path see the same, grown state.
+        engine.step([self.slot], 20.0, 5.0, 1.0, now=60.0, dt=60.0)
+        self.assertAlmostEqual(engine.integral[self.slot], 2 * integral)
+        self.assertEqual(engine.last_time[self.slot], 60.0)
+
+    @unittest.skipIf(PID is None, "simple_pid is not installed")
+    def test_positional_form_matches_simple_pid_while_unsaturated(self):
+        # One zone takes the scalar path, two zones the batched one; both must match.
+        engine = _load("engine").PIDEngine(capacity=3)
+        slots = [engine.allocate(LIMITS) for _ in range(3)]
+        for slot in slots:
+            engine.set_gains(slot, *GAINS)
+            engine.set_setpoint(slot, 21.0)
+        pid = PID(*GAINS, setpoint=21.0, sample_time=None, output_limits=LIMITS)
+
+        rng = np.random.default_rng(2)
+        for index in range(500):
+            indoor = 21.0 + 0.5 * np.sin(index / 20) + 0.05 * rng.normal()
+            expected = pid(indoor, dt=60.0)
+            (single,), _ = engine.step(slots[:1], indoor, 5.0, 1.0, now=index * 60.0, dt=60.0)
+            batched, _ = engine.step(slots[1:], [indoor] * 2, [5.0] * 2, [1.0] * 2, now=index * 60.0, dt=60.0)
+            self.assertLess(abs(expected), LIMITS[1])
+            self.assertAlmostEqual(single, expected, places=9)
+            np.testing.assert_allclose(batched, expected, rtol=0, atol=1e-9)
+
+    def test_t_comp_is_outdoor_plus_weighted_delta_t(self):
+        engine = self.engine
+        engine.set_gains(self.slot, -2.0, 0.0, 0.0)
+        delta_t, t_comp = engine.step([self.slot], 20.0, 5.0, 0.5, now=0.0, dt=60.0)
+        # One degree too cold: Delta T = -2, weighted by 0.5, so the heat pump believes it is 1 °C colder.
+        self.assertEqual(delta_t[0], -2.0)
+        self.assertEqual(t_comp[0], 4.0)
+
+    def test_gain_changes_are_bumpless_in_the_positional_form(self):
+        engines = [_load("engine").PIDEngine(capacity=1) for _ in range(2)]
+        for engine in engines:
+            engine.allocate(LIMITS)
+            engine.set_gains(0, *GAINS)
+            engine.set_setpoint(0, 21.0)
+        retuned, reference = engines
+        for index in range(50):
+            for engine in engines:
+                engine.step([0], 20.0 + index / 100, 5.0, 1.0, now=index * 60.0, dt=60.0)
+
+        def held_output(engine):
+            return engine.kp[0] * engine.last_error[0] + engine.integral[0] + engine.d_term[0]
+
+        # A Kp change is absorbed by the integrator: at an unchanged input the next
+        # output is exactly what the old gains would have given.
+        retuned.set_gain(0, "kp", -4.0)
+        self.assertAlmostEqual(held_output(retuned), retuned.delta_t[0])
+        (after,), _ = retuned.step([0], 20.49, 5.0, 1.0, now=50 * 60.0, dt=60.0)
+        (unchanged,), _ = reference.step([0], 20.49, 5.0, 1.0, now=50 * 60.0, dt=60.0)
+        self.assertAlmostEqual(after, unchanged)
+
+        # A Kd change rescales the held D term and moves the difference into the integrator.
+        retuned.step([0], 20.6, 5.0, 1.0, now=51 * 60.0, dt=60.0)
+        d_term, before = retuned.d_term[0], retuned.delta_t[0]
+        retuned.set_gain(0, "kd", -20.0)
+        self.assertAlmostEqual(retuned.d_term[0], d_term * 20.0 / 50.0)
+        self.assertAlmostEqual(held_output(retuned), before)
+
+    def test_switching_forms_is_bumpless_while_unsaturated(self):
+        engine = _load("engine").PIDEngine(capacity=3)
+        positional, velocity, switched = (engine.allocate(LIMITS) for _ in range(3))
+        for slot in (positional, velocity, switched):
+            engine.set_gains(slot, *GAINS)
+            engine.set_setpoint(slot, 21.0)
+        engine.set_form(velocity, True)
+
+        for index in range(300):
+            # The switched slot changes form every 50 steps.
+            engine.set_form(switched, index // 50 % 2)
+            indoor = 21.0 + 0.5 * np.sin(index / 20)
+            for slot in (positional, velocity, switched):
+                (delta_t,), _ = engine.step([slot], indoor, 5.0, 1.0, now=index * 60.0, dt=60.0)
+            self.assertLess(abs(engine.delta_t[positional]), LIMITS[1])
+            # Unsaturated, both forms give the same output, so a switch causes no bump.
+            self.assertAlmostEqual(engine.delta_t[velocity], engine.delta_t[positional], places=9)
+            self.assertAlmostEqual(delta_t, engine.delta_t[positional], places=9)
+            self.assertAlmostEqual(engine.integral[switched], engine.integral[positional], places=9)
+
+    def test_back_calculation_limits_windup_while_saturated(self):
+        engine = self.engine
+        engine.set_gains(self.slot, -2.0, -0.001, 0.0)
+        engine.set_output_limits(self.slot, (-3.0, 3.0))
+        for index in range(200):
+            (delta_t,), _ = engine.step([self.slot], 17.0, 0.0, 1.0, now=index * 300.0, dt=300.0)
+            self.assertEqual(delta_t, -3.0)
+        # Clamping alone would leave the integral at the limit; tracking pulls it back inside.
+        self.assertGreater(engine.integral[self.slot], -3.0 + 1.0)
+
+        # Once the room overshoots, the output leaves saturation at once instead of unwinding slowly.
+        (delta_t,), _ = engine.step([self.slot], 21.5, 0.0, 1.0, now=200 * 300.0, dt=300.0)
+        self.assertGreater(delta_t, -1.0)
+
+    def test_velocity_form_cannot_wind_up(self):
+        engine = self.engine
+        engine.set_form(self.slot, True)
+        engine.set_gains(self.slot, -2.0, -0.001, 0.0)
+        engine.set_output_limits(self.slot, (-3.0, 3.0))
+        for index in range(200):
+            engine.step([self.slot], 17.0, 0.0, 1.0, now=index * 300.0, dt=300.0)
+        (delta_t,), _ = engine.step([self.slot], 21.5, 0.0, 1.0, now=200 * 300.0, dt=300.0)
+        # Saturated output plus one increment: -2 * (-0.5 - 4) - 0.001 * -0.5 * 300.
+        self.assertAlmostEqual(delta_t, min(-3.0 + 9.0 + 0.15, 3.0))
+
+    def test_sample_period_overrides_the_measured_dt(self):
+        engine = self.engine
+        engine.set_gains(self.slot, 0.0, -0.001, 0.0)
+        engine.set_sample_period(self.slot, 60.0)
+        engine.step([self.slot], 20.0, 5.0, 1.0, now=0.0, dt=5000.0)
+        self.assertAlmostEqual(engine.integral[self.slot], -0.001 * 1.0 * 60.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
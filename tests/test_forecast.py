@@ -0,0 +1,57 @@
+"""Behavior of the forecast lookup table; needs neither NumPy nor Home Assistant."""
+from datetime import datetime, timedelta, timezone
+import importlib.util
+from pathlib import Path
+import unittest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+_spec = importlib.util.spec_from_file_location(
+    "pid_forecast", ROOT / "custom_components/pid_heat_compensation/forecast.py"
+)
+forecast = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(forecast)
+ForecastTable = forecast.ForecastTable
+
+START = datetime(2026, 1, 15, 12, tzinfo=timezone.utc)
+
+
+def _hourly(*temperatures):
+    """A weather.get_forecasts style hourly forecast starting at START."""
+    return [
+        {"datetime": (START + timedelta(hours=hour)).isoformat(), "temperature": temperature}
+        for hour, temperature in enumerate(temperatures)
+    ]
+
+
+class ForecastTableTests(unittest.TestCase):
+    def setUp(self):
+        self.start = START.timestamp()
+        self.table = ForecastTable.from_forecast(_hourly(2.0, -1.0, -4.0), fetched=self.start)
+
+    def test_lookup_at_forecast_points(self):
+        self.assertEqual(self.table.at(self.start), 2.0)
+        self.assertEqual(self.table.at(self.start + 3600), -1.0)
+        self.assertEqual(self.table.at(self.start + 7200), -4.0)
+
+    def test_lookup_interpolates_between_points(self):
+        self.assertAlmostEqual(self.table.at(self.start + 1800), 0.5)
+        self.assertAlmostEqual(self.table.at(self.start + 3600 + 900), -1.75)
+
+    def test_no_value_outside_the_forecast(self):
+        self.assertIsNone(self.table.at(self.start - 1))
+        self.assertIsNone(self.table.at(self.start + 7201))
+        self.assertIsNone(ForecastTable([], fetched=self.start).at(self.start))
+
+    def test_incomplete_items_are_skipped_and_points_sorted(self):
+        items = list(reversed(_hourly(2.0, -1.0)))
+        items += [{"datetime": "not a date", "temperature": 5.0}, {"temperature": 5.0}, {"datetime": None}]
+        items.append({"datetime": START.isoformat(), "temperature": None})
+        table = ForecastTable.from_forecast(items, fetched=self.start)
+        self.assertEqual(len(table), 2)
+        self.assertAlmostEqual(table.at(self.start + 1800), 0.5)
+        self.assertEqual(table.fetched, self.start)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+"""Behavior of the domain-wide sensor hub on a bare Home Assistant core; needs Home Assistant and NumPy."""
+import tempfile
+import unittest
+from unittest import mock
+
+try:
+    from harness import StubState, async_create_hass
+    from homeassistant.const import EVENT_STATE_CHANGED
+
+    from custom_components.pid_heat_compensation import hub
+except ImportError:
+    hub = None
+
+OUTDOOR = "sensor.outdoor_temperature"
+INDOOR = "sensor.living_room_temperature"
+
+
+@unittest.skipIf(hub is None, "Home Assistant or NumPy is not installed")
+class ParseStateTests(unittest.TestCase):
+    def test_numbers_are_parsed(self):
+        self.assertEqual(hub.parse_state(StubState(OUTDOOR, "-4.5", 100.0)), (-4.5, 100.0))
+
+    def test_non_numbers_have_no_value(self):
+        for state in ("unavailable", "unknown", "", "nan", "NaN", "inf", "-inf", "infinity"):
+            with self.subTest(state=state):
+                self.assertEqual(hub.parse_state(StubState(OUTDOOR, state, 100.0)), (None, 100.0))
+
+    def test_missing_state(self):
+        self.assertIsNone(hub.parse_state(None))
+
+
+@unittest.skipIf(hub is None, "Home Assistant or NumPy is not installed")
+class SensorHubTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self._config_dir = tempfile.TemporaryDirectory()
+        self.hass = await async_create_hass(self._config_dir.name)
+        self.hub = hub.SensorHub(self.hass)
+        self.received = []
+
+    async def asyncTearDown(self):
+        await self.hass.async_stop(force=True)
+        self._config_dir.cleanup()
+
+    def subscriber(self, name):
+        """A reading callback recording (name, entity_id, reading)."""
+        return lambda entity_id, reading: self.received.append((name, entity_id, reading))
+
+    async def async_change(self, entity_id, value):
+        """Fires a state change the way the state machine does."""
+        self.hass.bus.async_fire(
+            EVENT_STATE_CHANGED, {"entity_id": entity_id, "old_state": None, "new_state": StubState(entity_id, value)}
+        )
+        await self.hass.async_block_till_done()
+
+    def state_listeners(self):
+        return self.hass.bus.async_listeners().get(EVENT_STATE_CHANGED, 0)
+
+    async def test_change_is_parsed_once_and_fanned_out(self):
+        self.hub.async_subscribe([OUTDOOR], self.subscriber("zone_1"))
+        self.hub.async_subscribe([INDOOR, OUTDOOR], self.subscriber("zone_2"))
+
+        with mock.patch.object(hub, "parse_state", wraps=hub.parse_state) as parse_state:
+            await self.async_change(OUTDOOR, "-3.5")
+        parse_state.assert_called_once()
+
+        self.assertEqual([(name, entity_id) for name, entity_id, _ in self.received], [
+            ("zone_1", OUTDOOR), ("zone_2", OUTDOOR),
+        ])
+        # Both zones get the very same parsed reading, which is also cached.
+        self.assertIs(self.received[0][2], self.received[1][2])
+        self.assertEqual(self.received[0][2][0], -3.5)
+        self.assertIs(self.hub.reading(OUTDOOR), self.received[0][2])
+        self.assertEqual(self.hub.value(OUTDOOR), -3.5)
+
+    async def test_each_sensor_is_tracked_once(self):
+        self.hub.async_subscribe([OUTDOOR, OUTDOOR], self.subscriber("zone_1"))
+        self.hub.async_subscribe([OUTDOOR], self.subscriber("zone_2"))
+
+        await self.async_change(OUTDOOR, "1.0")
+        self.assertEqual([name for name, _, _ in self.received], ["zone_1", "zone_2"])
+
+    async def test_non_finite_states_reach_subscribers_without_value(self):
+        self.hub.async_subscribe([OUTDOOR], self.subscriber("zone_1"))
+
+        await self.async_change(OUTDOOR, "nan")
+        self.assertIsNone(self.received[-1][2][0])
+        self.assertIsNone(self.hub.value(OUTDOOR))
+
+    async def test_unsubscribe_stops_tracking_once_unused(self):
+        listeners = self.state_listeners()
+        remove_zone_1 = self.hub.async_subscribe([OUTDOOR], self.subscriber("zone_1"))
+        remove_zone_2 = self.hub.async_subscribe([INDOOR, OUTDOOR], self.subscriber("zone_2"))
+        self.assertGreater(self.state_listeners(), listeners)
+        await self.async_change(OUTDOOR, "2.0")
+
+        remove_zone_1()
+        await self.async_change(OUTDOOR, "3.0")
+        self.assertEqual([name for name, _, _ in self.received], ["zone_1", "zone_2", "zone_2"])
+        self.assertEqual(self.hub.value(OUTDOOR), 3.0)
+
+        remove_zone_2()
+        self.assertIsNone(self.hub.reading(OUTDOOR))
+        self.assertIsNone(self.hub.reading(INDOOR))
+        self.assertEqual(self.state_listeners(), listeners)
+
+        await self.async_change(OUTDOOR, "4.0")
+        self.assertEqual(len(self.received), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+"""Behavior of the PID parameter number entities on a bare Home Assistant core; needs Home Assistant and NumPy."""
+import tempfile
+import unittest
+
+try:
+    from harness import Zone, async_create_hass
+    from homeassistant.const import STATE_UNAVAILABLE
+    from homeassistant.core import State
+    from homeassistant.helpers import restore_state
+    from homeassistant.util import dt as dt_util
+
+    from custom_components.pid_heat_compensation import number
+    from custom_components.pid_heat_compensation.const import CONF_MIN_UPDATE_INTERVAL, PARAMETER_RANGES
+except ImportError:
+    number = None
+
+
+@unittest.skipIf(number is None, "Home Assistant or NumPy is not installed")
+class ParameterNumberTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self._config_dir = tempfile.TemporaryDirectory()
+        self.hass = await async_create_hass(self._config_dir.name)
+        self.zone = Zone(self.hass, **{CONF_MIN_UPDATE_INTERVAL: 0})
+        self.kp = self.create_number("Kp", "kp")
+
+    async def asyncTearDown(self):
+        await self.hass.async_stop(force=True)
+        self._config_dir.cleanup()
+
+    def create_number(self, name, key):
+        entity = number.PIDParameterNumber(self.zone.entry, name, *PARAMETER_RANGES[key])
+        entity.hass = self.hass
+        entity.entity_id = f"number.zone_0_{key}"
+        return entity
+
+    def store_state(self, entity_id, state):
+        """Puts a saved number state in the restore cache."""
+        restore_state.async_get(self.hass).last_states[entity_id] = restore_state.StoredState(
+            State(entity_id, state), None, dt_util.utcnow()
+        )
+
+    async def test_value_is_restored_and_published_on_restart(self):
+        self.store_state(self.kp.entity_id, "-3.5")
+        await self.kp.async_added_to_hass()
+        self.assertEqual(self.kp.native_value, -3.5)
+        self.assertEqual(self.zone.parameters.kp, -3.5)
+
+    async def test_unavailable_state_keeps_the_initial_value(self):
+        self.store_state(self.kp.entity_id, STATE_UNAVAILABLE)
+        await self.kp.async_added_to_hass()
+        self.assertEqual(self.kp.native_value, PARAMETER_RANGES["kp"][0])
+        self.assertEqual(self.zone.parameters.kp, PARAMETER_RANGES["kp"][0])
+
+    async def test_new_value_is_pushed_to_the_running_controller(self):
+        await self.kp.async_added_to_hass()
+        await self.zone.async_add(indoor=19.0, outdoor=-5.0, ki=0.0, kd=0.0, weather_factor=1.0)
+        self.assertEqual(self.zone.entry_data.compensated_temp, -7.0)
+        gain_triggers = self.zone.stats.triggers["gain"]
+
+        await self.kp.async_set_native_value(-4.0)
+        await self.hass.async_block_till_done()
+
+        self.assertEqual(self.zone.parameters.kp, -4.0)
+        self.assertEqual(self.zone.stats.triggers["gain"], gain_triggers + 1)
+        self.assertEqual(self.zone.state.attributes["PID_Kp"], -4.0)
+        # The change is bumpless; the new gain acts on the next change of the error.
+        self.assertEqual(self.zone.entry_data.compensated_temp, -7.0)
+        self.zone.set_sensor(self.zone.indoor, 18.0)
+        await self.hass.async_block_till_done()
+        self.assertEqual(self.zone.entry_data.compensated_temp, -11.0)
+
+    async def test_values_written_by_others_are_shown(self):
+        await self.kp.async_added_to_hass()
+        self.zone.parameters.async_set("kp", -1.25)
+        self.assertEqual(self.kp.native_value, -1.25)
+        self.assertEqual(self.hass.states.get(self.kp.entity_id).state, "-1.25")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,212 @@
+"""Behavior of the direct T_comp output with fake writers and a fake pymodbus; needs Home Assistant and NumPy."""
+import asyncio
+import sys
+import tempfile
+import unittest
+from types import ModuleType
+from unittest import mock
+
+try:
+    from harness import async_create_hass
+    from homeassistant.exceptions import HomeAssistantError
+
+    from custom_components.pid_heat_compensation import output
+    from custom_components.pid_heat_compensation.const import (
+        CONF_OUTPUT_MIN_INTERVAL,
+        CONF_OUTPUT_MODBUS_HOST,
+        CONF_OUTPUT_MODBUS_REGISTER,
+        CONF_OUTPUT_MODBUS_SCALE,
+        CONF_OUTPUT_TYPE,
+        OUTPUT_MODBUS,
+    )
+except ImportError:
+    output = None
+
+INTERVAL = 0.05
+
+
+class FakeModbusClient:
+    """Records the register writes of pymodbus' AsyncModbusTcpClient."""
+
+    instances = []
+
+    def __init__(self, host, port=502):
+        self.host = host
+        self.port = port
+        self.connected = False
+        self.closed = False
+        self.writes = []
+        self.instances.append(self)
+
+    async def connect(self):
+        self.connected = True
+        return True
+
+    async def write_register(self, address, value, device_id=1):
+        self.writes.append((device_id, address, value))
+        return mock.Mock(isError=lambda: False)
+
+    def close(self):
+        self.closed = True
+        self.connected = False
+
+
+def _fake_pymodbus():
+    """sys.modules entries standing in for pymodbus.client and pymodbus.exceptions."""
+    client, exceptions = ModuleType("pymodbus.client"), ModuleType("pymodbus.exceptions")
+    client.AsyncModbusTcpClient = FakeModbusClient
+    exceptions.ModbusException = type("ModbusException", (Exception,), {})
+    return {"pymodbus": ModuleType("pymodbus"), "pymodbus.client": client, "pymodbus.exceptions": exceptions}
+
+
+@unittest.skipIf(output is None, "Home Assistant or NumPy is not installed")
+class OutputTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self._config_dir = tempfile.TemporaryDirectory()
+        self.hass = await async_create_hass(self._config_dir.name)
+
+    async def asyncTearDown(self):
+        await self.hass.async_stop(force=True)
+        self._config_dir.cleanup()
+
+    async def async_wait(self, seconds=0.0):
+        await asyncio.sleep(seconds)
+        await self.hass.async_block_till_done()
+
+
+class OutputPublisherTests(OutputTestCase):
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.written = []
+        self.failures = []
+        self.publisher = output.OutputPublisher(self.hass, self.write, INTERVAL, "test")
+
+    async def write(self, value):
+        if self.failures:
+            raise self.failures.pop(0)
+        self.written.append(value)
+
+    async def test_writes_are_rate_limited_to_the_latest_value(self):
+        self.publisher.async_publish(-5.0)
+        await self.async_wait()
+        for value in (-5.5, -6.0, -6.5):
+            self.publisher.async_publish(value)
+        await self.async_wait()
+        self.assertEqual(self.written, [-5.0])
+        self.assertEqual(self.publisher.as_dict()["waiting"], -6.5)
+
+        await self.async_wait(INTERVAL * 2)
+        self.assertEqual(self.written, [-5.0, -6.5])
+        self.assertEqual(self.publisher.writes, 2)
+
+    async def test_unchanged_values_are_not_written(self):
+        self.publisher.async_publish(-5.0)
+        await self.async_wait(INTERVAL * 2)
+        self.publisher.async_publish(-5.0)
+        await self.async_wait(INTERVAL * 2)
+        self.assertEqual(self.written, [-5.0])
+        self.assertIsNone(self.publisher.as_dict()["waiting"])
+
+    async def test_failed_write_is_retried(self):
+        self.failures.append(HomeAssistantError("broker down"))
+        with mock.patch.object(output, "RETRY_INTERVAL", INTERVAL):
+            self.publisher.async_publish(-5.0)
+            await self.async_wait()
+            self.assertEqual(self.publisher.as_dict()["failing"], True)
+            await self.async_wait(INTERVAL * 2)
+        self.assertEqual(self.written, [-5.0])
+        self.assertEqual((self.publisher.errors, self.publisher.writes), (1, 1))
+
+    async def test_nothing_is_written_after_close(self):
+        self.publisher.async_publish(-5.0)
+        await self.async_wait()
+        self.publisher.async_publish(-6.0)
+        self.publisher.async_close()
+        await self.async_wait(INTERVAL * 2)
+        self.assertEqual(self.written, [-5.0])
+
+
+class ModbusOutputTests(OutputTestCase):
+    settings = {
+        CONF_OUTPUT_TYPE: OUTPUT_MODBUS,
+        CONF_OUTPUT_MODBUS_HOST: "heatpump.local",
+        CONF_OUTPUT_MODBUS_REGISTER: 40,
+        CONF_OUTPUT_MIN_INTERVAL: 0,
+    }
+
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        FakeModbusClient.instances = []
+        patcher = mock.patch.dict(sys.modules, _fake_pymodbus())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_output(self, name, **settings):
+        return output.async_create_output(self.hass, output.output_settings({**self.settings, **settings}), name)
+
+    async def test_scaled_value_is_written_as_signed_16_bit(self):
+        publisher = self.create_output("zone_1")
+        publisher.async_publish(-5.3)
+        await self.async_wait()
+        publisher.async_publish(21.5)
+        await self.async_wait()
+
+        (client,) = FakeModbusClient.instances
+        self.assertEqual((client.host, client.port), ("heatpump.local", 502))
+        self.assertEqual(client.writes, [(1, 40, 0x10000 - 53), (1, 40, 215)])
+
+    async def test_connections_are_pooled_per_host_and_port(self):
+        zone_1 = self.create_output("zone_1")
+        zone_2 = self.create_output("zone_2", **{CONF_OUTPUT_MODBUS_REGISTER: 41})
+        other_device = self.create_output("zone_3", **{CONF_OUTPUT_MODBUS_HOST: "boiler.local"})
+        for publisher in (zone_1, zone_2, other_device):
+            publisher.async_publish(-5.0)
+        await self.async_wait()
+
+        heat_pump, boiler = FakeModbusClient.instances
+        self.assertEqual(sorted(heat_pump.writes), [(1, 40, 0x10000 - 50), (1, 41, 0x10000 - 50)])
+        self.assertEqual(boiler.writes, [(1, 40, 0x10000 - 50)])
+
+        # The connection stays open while another entry still writes to the device.
+        zone_1.async_close()
+        await self.async_wait()
+        self.assertFalse(heat_pump.closed)
+
+        zone_2.async_close()
+        await self.async_wait()
+        self.assertTrue(heat_pump.closed)
+        self.assertFalse(boiler.closed)
+
+        # A released device gets a new connection on the next acquire.
+        self.create_output("zone_1").async_publish(-5.0)
+        await self.async_wait()
+        self.assertEqual(len(FakeModbusClient.instances), 3)
+
+    async def test_pymodbus_is_imported_on_the_first_write(self):
+        publisher = self.create_output("zone_1")
+        self.assertEqual(FakeModbusClient.instances, [])
+        with mock.patch.dict(sys.modules):
+            del sys.modules["pymodbus.client"]
+            self.create_output("zone_2")
+            self.assertNotIn("pymodbus.client", sys.modules)
+        publisher.async_publish(-5.0)
+        await self.async_wait()
+        self.assertEqual(len(FakeModbusClient.instances), 1)
+
+    async def test_out_of_range_value_is_an_error(self):
+        publisher = self.create_output("zone_1", **{CONF_OUTPUT_MODBUS_SCALE: 1000})
+        publisher.async_publish(40.0)
+        await self.async_wait()
+        self.assertEqual(publisher.errors, 1)
+        self.assertEqual(FakeModbusClient.instances, [])
+
+    async def test_missing_pymodbus_is_an_error(self):
+        publisher = self.create_output("zone_1")
+        with mock.patch.dict(sys.modules, {"pymodbus.client": None}):
+            publisher.async_publish(-5.0)
+            await self.async_wait()
+        self.assertEqual((publisher.errors, publisher.writes), (1, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
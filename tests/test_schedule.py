@@ -0,0 +1,67 @@
+"""Behavior of the outdoor temperature gain schedule; needs neither NumPy nor Home Assistant."""
+import importlib.util
+from pathlib import Path
+import unittest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+_spec = importlib.util.spec_from_file_location(
+    "pid_schedule", ROOT / "custom_components/pid_heat_compensation/schedule.py"
+)
+schedule = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(schedule)
+GainSchedule = schedule.GainSchedule
+
+BREAKPOINTS = [
+    {"outdoor": 10, "kp": -1.0, "ki": -0.0005, "kd": 0.0},
+    {"outdoor": -10, "kp": -3.0, "ki": -0.0015, "kd": -20.0},
+    {"outdoor": 0, "kp": -2.0, "ki": -0.001, "kd": -10.0},
+]
+
+
+class GainScheduleTests(unittest.TestCase):
+    def setUp(self):
+        self.schedule = GainSchedule.from_config(BREAKPOINTS)
+
+    def assertGains(self, actual, expected):
+        for value, wanted in zip(actual, expected, strict=True):
+            self.assertAlmostEqual(value, wanted)
+
+    def test_breakpoints_are_sorted_coldest_first(self):
+        self.assertEqual([point["outdoor"] for point in self.schedule.as_list()], [-10.0, 0.0, 10.0])
+        self.assertEqual(len(self.schedule), 3)
+
+    def test_gains_at_a_breakpoint(self):
+        self.assertGains(self.schedule.at(0.0), (-2.0, -0.001, -10.0))
+
+    def test_gains_are_interpolated_between_breakpoints(self):
+        self.assertGains(self.schedule.at(-2.5), (-2.25, -0.001125, -12.5))
+        self.assertGains(self.schedule.at(7.5), (-1.25, -0.000625, -2.5))
+
+    def test_end_gains_are_held_outside_the_table(self):
+        self.assertGains(self.schedule.at(-30.0), (-3.0, -0.0015, -20.0))
+        self.assertGains(self.schedule.at(10.0), (-1.0, -0.0005, 0.0))
+        self.assertGains(self.schedule.at(25.0), (-1.0, -0.0005, 0.0))
+
+    def test_single_breakpoint_is_constant(self):
+        single = GainSchedule.from_config(BREAKPOINTS[:1])
+        for outdoor in (-20.0, 10.0, 20.0):
+            self.assertGains(single.at(outdoor), (-1.0, -0.0005, 0.0))
+
+    def test_empty_config_gives_an_empty_schedule(self):
+        self.assertFalse(GainSchedule.from_config(None))
+        self.assertFalse(GainSchedule.from_config([]))
+
+    def test_invalid_breakpoints_are_rejected(self):
+        for items in (
+            [{"outdoor": 0, "kp": -2.0, "ki": 0.0}],
+            [{"outdoor": "cold", "kp": -2.0, "ki": 0.0, "kd": 0.0}],
+            ["0, -2, 0, 0"],
+            [BREAKPOINTS[0], dict(BREAKPOINTS[0], kp=-5.0)],
+        ):
+            with self.subTest(items=items), self.assertRaises(ValueError):
+                GainSchedule.from_config(items)
+
+
+if __name__ == "__main__":
+    unittest.main()
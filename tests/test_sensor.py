@@ -0,0 +1,83 @@
+"""Behavior of the compensated sensor on a bare Home Assistant core; needs Home Assistant and NumPy."""
+import tempfile
+import unittest
+
+try:
+    from harness import Zone, async_create_hass
+    from homeassistant.helpers import entity_registry as er
+
+    from custom_components.pid_heat_compensation import sensor
+    from custom_components.pid_heat_compensation.const import CONF_MIN_UPDATE_INTERVAL, DOMAIN
+except ImportError:
+    sensor = None
+
+
+@unittest.skipIf(sensor is None, "Home Assistant or NumPy is not installed")
+class CompensatedSensorTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self._config_dir = tempfile.TemporaryDirectory()
+        self.hass = await async_create_hass(self._config_dir.name)
+        await er.async_load(self.hass)
+        self.registry = er.async_get(self.hass)
+        self.zone = Zone(self.hass)
+
+    async def asyncTearDown(self):
+        await self.hass.async_stop(force=True)
+        self._config_dir.cleanup()
+
+    async def async_setup_platform(self):
+        """Runs the sensor platform setup and returns the compensated sensor it adds."""
+        added = []
+        await sensor.async_setup_entry(self.hass, self.zone.entry, lambda entities, *_: added.extend(entities))
+        return added[0]
+
+    async def test_unique_id_does_not_depend_on_the_climate_entity(self):
+        without_climate = await self.async_setup_platform()
+        self.registry.async_get_or_create("climate", DOMAIN, f"{self.zone.entry_id}_pid_climate")
+        with_climate = await self.async_setup_platform()
+
+        self.assertEqual(without_climate.unique_id, f"pid_comp_temp_{self.zone.entry_id}")
+        self.assertEqual(with_climate.unique_id, without_climate.unique_id)
+        self.assertIsNone(with_climate.extra_state_attributes)
+
+    async def test_sensor_keyed_by_the_climate_entity_is_migrated(self):
+        climate = self.registry.async_get_or_create(
+            "climate", DOMAIN, f"{self.zone.entry_id}_pid_climate", suggested_object_id="living_room"
+        )
+        old = self.registry.async_get_or_create(
+            "sensor", DOMAIN, f"pid_comp_temp_{climate.entity_id}", suggested_object_id="living_room_compensated"
+        )
+
+        compensated = await self.async_setup_platform()
+
+        self.assertEqual(
+            self.registry.async_get_entity_id("sensor", DOMAIN, compensated.unique_id), old.entity_id
+        )
+        self.assertIsNone(self.registry.async_get_entity_id("sensor", DOMAIN, f"pid_comp_temp_{climate.entity_id}"))
+
+    async def test_first_value_is_shown_whichever_entity_is_added_first(self):
+        await self.zone.async_add(indoor=19.0, outdoor=-5.0, kp=-2.0, ki=0.0, kd=0.0, weather_factor=1.0)
+        self.assertEqual(self.zone.sensor.native_value, -7.0)
+        self.assertIsNotNone(self.zone.stats.startup_s)
+
+        # A sensor added after the controller published picks up the latest value.
+        late = sensor.PIDCompensatedTempSensor(self.hass, self.zone.entry, self.zone.entry.title)
+        late.entity_id = "sensor.late_compensated_temperature"
+        await late.async_added_to_hass()
+        self.assertEqual(late.native_value, -7.0)
+
+    async def test_sensor_follows_each_published_value(self):
+        self.zone = Zone(self.hass, **{CONF_MIN_UPDATE_INTERVAL: 0})
+        await self.zone.async_add(indoor=19.0, outdoor=-5.0, kp=-2.0, ki=0.0, kd=0.0, weather_factor=1.0)
+
+        self.zone.set_sensor(self.zone.outdoor, -6.0)
+        await self.hass.async_block_till_done()
+
+        # Written in the same step as the climate entity, without polling its state.
+        self.assertEqual(self.zone.sensor.native_value, -8.0)
+        self.assertEqual(self.hass.states.get(self.zone.sensor.entity_id).state, "-8.0")
+        self.assertEqual(self.zone.state.attributes["compensated_outdoor_temperature"], -8.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+"""Behavior of the rotating step log writer on a bare Home Assistant core; needs Home Assistant and NumPy."""
+import json
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+try:
+    from harness import async_create_hass
+
+    from custom_components.pid_heat_compensation import steplog
+    from custom_components.pid_heat_compensation.models import StepHistory
+except ImportError:
+    steplog = None
+
+
+def _step(value):
+    """A step with every field set to `value`."""
+    return (float(value),) * len(StepHistory.FIELDS)
+
+
+@unittest.skipIf(steplog is None, "Home Assistant or NumPy is not installed")
+class StepLogWriterTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self._config_dir = tempfile.TemporaryDirectory()
+        self.hass = await async_create_hass(self._config_dir.name)
+        self.path = Path(self._config_dir.name) / "pid_heat_compensation" / "steps.jsonl"
+        self.writer = steplog.StepLogWriter(self.hass, str(self.path))
+
+    async def asyncTearDown(self):
+        await self.hass.async_stop(force=True)
+        self._config_dir.cleanup()
+
+    async def async_write(self, entry_id, count=1, writer=None):
+        writer = writer or self.writer
+        for index in range(count):
+            writer.append(entry_id, _step(index))
+        await writer.async_flush()
+
+    def entry_ids(self, path):
+        return {json.loads(line)["entry_id"] for line in path.read_text().splitlines()}
+
+    async def test_batches_are_written_as_json_lines(self):
+        await self.async_write("zone_1", 3)
+        lines = [json.loads(line) for line in self.path.read_text().splitlines()]
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(set(lines[0]), {"entry_id", *StepHistory.FIELDS})
+        self.assertEqual(lines[2]["t_comp"], 2.0)
+        self.assertEqual(self.writer.as_dict()["written"], 3)
+
+    async def test_rotates_when_the_file_is_too_big(self):
+        with mock.patch.object(steplog, "MAX_BYTES", 200):
+            await self.async_write("first", 2)
+            await self.async_write("second")
+
+        self.assertEqual(self.entry_ids(self.path), {"second"})
+        self.assertEqual(self.entry_ids(self.path.with_name("steps.jsonl.1")), {"first"})
+
+    async def test_rotates_when_the_file_is_a_day_old(self):
+        await self.async_write("yesterday")
+        day_ago = time.time() - steplog.ROTATE_INTERVAL.total_seconds() - 60
+        os.utime(self.path, (day_ago, day_ago))
+
+        # A restarted writer takes the age of the existing file from its mtime.
+        await self.async_write("today", writer=steplog.StepLogWriter(self.hass, str(self.path)))
+
+        self.assertEqual(self.entry_ids(self.path), {"today"})
+        self.assertEqual(self.entry_ids(self.path.with_name("steps.jsonl.1")), {"yesterday"})
+
+    async def test_keeps_at_most_backup_count_files(self):
+        with mock.patch.object(steplog, "MAX_BYTES", 1):
+            for batch in range(steplog.BACKUP_COUNT + 3):
+                await self.async_write(f"batch_{batch}")
+
+        count = steplog.BACKUP_COUNT
+        backups = sorted(path.name for path in self.path.parent.iterdir())
+        self.assertEqual(backups, ["steps.jsonl", *(f"steps.jsonl.{index}" for index in range(1, count + 1))])
+        last = count + 2
+        self.assertEqual(self.entry_ids(self.path), {f"batch_{last}"})
+        self.assertEqual(self.entry_ids(self.path.with_name("steps.jsonl.1")), {f"batch_{last - 1}"})
+        self.assertEqual(self.entry_ids(self.path.with_name(f"steps.jsonl.{count}")), {f"batch_{last - count}"})
+
+    async def test_steps_are_dropped_and_counted_while_the_queue_is_full(self):
+        with mock.patch.object(steplog, "MAX_QUEUE", 3):
+            for index in range(5):
+                self.writer.append("zone_1", _step(index))
+            self.assertEqual(self.writer.as_dict()["queued"], 3)
+            self.assertEqual(self.writer.dropped, 2)
+
+            await self.writer.async_flush()
+            self.writer.append("zone_1", _step(5))
+            await self.writer.async_flush()
+
+        self.assertEqual(len(self.path.read_text().splitlines()), 4)
+        self.assertEqual(self.writer.as_dict()["written"], 4)
+        self.assertEqual(self.writer.as_dict()["dropped"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
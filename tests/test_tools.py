@@ -0,0 +1,115 @@
+"""The offline replay and sweep scripts run with NumPy alone, without Home Assistant."""
+import csv
+import io
+import runpy
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+PACKAGE = ROOT / "custom_components/pid_heat_compensation"
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def _run(*args):
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, check=True, cwd=ROOT).stdout
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+class OfflineToolTests(unittest.TestCase):
+    def test_tools_do_not_import_the_integration(self):
+        loaded = _run(
+            "-c",
+            "import runpy, sys;"
+            f"runpy.run_path({str(PACKAGE / 'sweep.py')!r});"
+            "print(sorted(name for name in sys.modules"
+            " if name.split('.')[0] in ('homeassistant', 'voluptuous', 'custom_components')))",
+        )
+        self.assertEqual(loaded.strip(), "[]")
+
+    def test_sweep_ranks_candidates_over_a_process_pool(self):
+        output = _run(
+            str(PACKAGE / "sweep.py"), "--kp=-2,-3", "--ki=0,-0.001", "--weeks", "2", "--workers", "2"
+        )
+        rows = list(csv.DictReader(io.StringIO(output)))
+        self.assertEqual(len(rows), 4)
+        iae = [float(row["iae"]) for row in rows]
+        self.assertEqual(iae, sorted(iae))
+
+    def test_settling_is_measured_on_the_undisturbed_step_response(self):
+        sweep = runpy.run_path(str(PACKAGE / "sweep.py"))
+        scenario = sweep["SweepScenario"](weeks=2)
+        gain_set = sweep["GainSet"]
+        metrics = sweep["simulate"](
+            [gain_set(-4.0, -0.0001, 0.0), gain_set(-2.0, 0.0, 0.0)], sweep["HouseModel"](), scenario
+        )
+        settling = metrics[:, sweep["METRICS"].index("settling_h")]
+        window_h = scenario.settling_window / 3600
+        # PI settles well inside the window; P alone keeps an offset and never does.
+        self.assertLess(settling[0], window_h / 2)
+        self.assertEqual(settling[1], window_h)
+
+    def test_sweep_steps_the_engine_within_the_output_limits(self):
+        sweep = runpy.run_path(str(PACKAGE / "sweep.py"))
+        engine_step = sweep["PIDEngine"].step
+        deltas = []
+
+        def step(engine, *args, **kwargs):
+            delta_t, t_comp = engine_step(engine, *args, **kwargs)
+            deltas.append(delta_t.copy())
+            return delta_t, t_comp
+
+        candidates = [sweep["GainSet"](-100.0, 0.0, 0.0)]
+        with mock.patch.object(sweep["PIDEngine"], "step", autospec=True, side_effect=step):
+            metrics = sweep["simulate"](candidates, sweep["HouseModel"](), sweep["SweepScenario"](weeks=1))
+
+        # The 2 °C cold start saturates a huge Kp at the limit the controller uses.
+        self.assertTrue(numpy.isfinite(metrics).all())
+        self.assertEqual(numpy.abs(numpy.concatenate(deltas)).max(), sweep["MAX_TEMP_DIFFERENCE"])
+
+    def test_replay_coalesces_like_the_controller(self):
+        replay = runpy.run_path(str(PACKAGE / "replay.py"))
+        samples = [
+            (0.0, "sensor.outdoor", -5.0),  # runs, but has no indoor value yet
+            (1.0, "sensor.indoor", 19.0),  # inside the window: trailing run at 10 s
+            (12.0, "sensor.indoor", 18.0),  # inside the next window: trailing run at 20 s
+            (35.0, "sensor.indoor", 19.5),  # after the window: runs at once
+        ]
+        runs = list(replay["replay"](
+            samples, "sensor.indoor", "sensor.outdoor",
+            [replay["GainSet"](-2.0, 0.0, 0.0), replay["GainSet"](-1.0, 0.0, 0.0, 2.0)],
+            setpoint=20.0, min_update_interval=10.0,
+        ))
+
+        self.assertEqual([timestamp for timestamp, _ in runs], [10.0, 20.0, 35.0])
+        self.assertEqual([list(t_comp) for _, t_comp in runs], [[-7.0, -7.0], [-9.0, -9.0], [-6.0, -6.0]])
+
+    def test_replay_script_evaluates_gain_sets_over_a_process_pool(self):
+        with tempfile.TemporaryDirectory() as directory:
+            history = Path(directory) / "history.csv"
+            history.write_text(
+                "entity_id,state,last_changed\n"
+                "sensor.indoor,19.0,2024-01-01T00:00:01Z\n"
+                "sensor.indoor,unavailable,2024-01-01T00:10:00Z\n"
+                "sensor.outdoor,-5.0,2024-01-01T00:00:00Z\n"
+            )
+            output = _run(
+                str(PACKAGE / "replay.py"), "--csv", str(history), "--indoor", "sensor.indoor",
+                "--outdoor", "sensor.outdoor", "--gains=-2,0,0", "--gains=-3,0,0", "--workers", "2",
+            )
+        rows = list(csv.reader(io.StringIO(output)))
+        self.assertEqual(rows[0], ["timestamp", "-2.0,0.0,0.0,1.0", "-3.0,0.0,0.0,1.0"])
+        # The outdoor reading alone runs nothing; the indoor one falls in its window.
+        self.assertEqual(rows[1][1:], ["-7.00", "-8.00"])
+        self.assertEqual(len(rows), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()